@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Benchmarks of every stage of terminology extraction on synthetic corpora.
+
+Corpora are generated with word frequencies following Zipf's law. Every
+stage is timed and its peak memory is measured with tracemalloc, results
+are written as JSON.
+
+Run `benchmark.py -h` for options.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from evaluation import Evaluation
+from preprocess import Preprocess
+from terminology import Terminology
+
+# Settings of corpora for every scale.
+SCALES = {"small": {"documents": 20, "tokens": 20000, "vocabulary": 2000},
+          "medium": {"documents": 200, "tokens": 500000,
+                     "vocabulary": 20000},
+          "large": {"documents": 1000, "tokens": 5000000,
+                    "vocabulary": 100000}}
+
+
+def _word(rank):
+    """Returns a lowercase alphabetic word for a rank."""
+    letters = []
+    rank += 1
+    while rank:
+        rank, rest = divmod(rank - 1, 26)
+        letters.append(string.ascii_lowercase[rest])
+    return "".join(reversed(letters))
+
+
+def generate_corpus(directory, documents, tokens, vocabulary, exponent=1.1,
+                    seed=0):
+    """Writes a corpus of text files with Zipf distributed words.
+
+    The same arguments always give the same corpus.
+
+    Args:
+        directory (str):
+            Directory for the text files, is created if it doesn't exist.
+        documents (int):
+            Number of files.
+        tokens (int):
+            Number of words in all files.
+        vocabulary (int):
+            Number of different words.
+        exponent (float):
+            Exponent of Zipf's law, the probability of the word with rank
+            r is proportional to 1 / r ** exponent. Default is 1.1.
+        seed (int):
+            Seed of the random number generator. Default is 0.
+
+    Returns:
+        list:
+            Names of the written files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    probabilities = 1 / np.arange(1, vocabulary + 1) ** exponent
+    probabilities /= probabilities.sum()
+    words = np.array([_word(rank) for rank in range(vocabulary)])
+    per_document = max(1, tokens // max(1, documents))
+    filenames = []
+    for document in range(documents):
+        ranks = rng.choice(vocabulary, size=per_document, p=probabilities)
+        # A sentence ends after 5 to 29 words.
+        ends = set(np.cumsum(rng.integers(5, 30, size=per_document)).tolist())
+        text = []
+        for position, word in enumerate(words[ranks].tolist()):
+            text.append(word)
+            if position + 1 in ends:
+                text.append(".")
+        filename = os.path.join(directory, "doc{:06d}.txt".format(document))
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write(" ".join(text))
+        filenames.append(filename)
+    return filenames
+
+
+def measure(function, repeat=1, memory=True):
+    """Measures time and peak memory of a function.
+
+    Args:
+        function:
+            Function without arguments.
+        repeat (int):
+            Number of timed calls, the fastest counts. Default is 1.
+        memory (bool):
+            Whether peak memory is measured in one more call with
+            tracemalloc, which is slower. Default is True.
+
+    Returns:
+        tuple:
+            dict with "seconds" and "peak_bytes" (None if memory isn't
+            measured) and the result of the last call.
+    """
+    seconds = []
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            result = function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"seconds": min(seconds), "peak_bytes": peak}, result
+
+
+def run_scale(directory, settings, exponent=1.1, seed=0, repeat=1,
+              memory=True, min_count=2, tags=("NN", "NNS", "NNP"),
+              alpha=0.5, theta=1.0, backend="freqdist"):
+    """Benchmarks every stage on a domain and a reference corpus.
+
+    Args:
+        directory (str):
+            Directory where corpora and output files are written.
+        settings (dict):
+            Keys "documents", "tokens" and "vocabulary" for the domain
+            corpus, see generate_corpus. The reference corpus has the same
+            size.
+        exponent (float):
+            Exponent of Zipf's law. Default is 1.1.
+        seed (int):
+            Seed of the domain corpus, the reference corpus uses seed + 1.
+            Default is 0.
+        repeat (int):
+            Number of timed runs of every stage. Default is 1.
+        memory (bool):
+            Whether peak memory is measured. Default is True.
+        min_count (int):
+            Minimum count of candidates. Default is 2.
+        tags:
+            Relevant tags of candidates. Default is NN, NNS and NNP.
+        alpha (float):
+            Alpha for weighing candidates. Default is 0.5.
+        theta (float):
+            Theta for extracting terms. Default is 1.0.
+        backend (str):
+            How bigrams are stored, see Preprocess. Default is "freqdist".
+
+    Returns:
+        dict:
+            Keys are names of stages, values are dicts with "seconds",
+            "peak_bytes" and "items" (number of processed items).
+    """
+    domain = os.path.join(directory, "domain")
+    reference = os.path.join(directory, "reference")
+    generate_corpus(domain, exponent=exponent, seed=seed, **settings)
+    generate_corpus(reference, exponent=exponent, seed=seed + 1, **settings)
+    stages = dict()
+
+    def record(name, function, items=None):
+        stats, result = measure(function, repeat, memory)
+        stats["items"] = items(result) if items else None
+        stages[name] = stats
+        return result
+
+    process = record("Preprocess._count",
+                     lambda: Preprocess(domain, backend=backend),
+                     lambda process: len(process.bigrams()))
+    candidates = record("candidates",
+                        lambda: process.candidates(min_count, tags=tags),
+                        len)
+    recount = Preprocess(domain, per_file=False, backend=backend)
+    record("bigrams(fileid)",
+           lambda: [recount.bigrams(fileid) for fileid in recount.fileids()],
+           len)
+    term = Terminology(process, reference, candidates, backend=backend)
+    record("_domain_relevance", term._domain_relevance, len)
+    record("_domain_consensus", term._domain_consensus, len)
+    record("weigh_candidates", lambda: term.weigh_candidates(alpha), len)
+    out = os.path.join(directory, "terms.csv")
+    record("write_csv", lambda: term.write_csv(alpha, theta, out))
+    gold = os.path.join(directory, "gold.txt")
+    with open(gold, "w", encoding="utf-8") as file:
+        # Every tenth candidate, gold standard can't be empty.
+        for wordi, wordj in sorted(candidates)[::10] or [("no", "gold")]:
+            file.write("{} {}\n".format(wordi, wordj))
+    record("Evaluation.from_file",
+           lambda: Evaluation.from_file(gold, out),
+           lambda evaluation: len(evaluation.terms))
+    return stages
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark every stage of "
+                                     "terminology extraction on synthetic "
+                                     "corpora")
+    parser.add_argument("--scales", nargs="+", default=["small"],
+                        choices=sorted(SCALES),
+                        help="Sizes of corpora. Default is small")
+    parser.add_argument("--documents", type=int,
+                        help="Number of documents, overrides the scales")
+    parser.add_argument("--tokens", type=int,
+                        help="Number of tokens of the whole corpus, "
+                        "overrides the scales")
+    parser.add_argument("--vocabulary", type=int,
+                        help="Number of distinct words, overrides the "
+                        "scales")
+    parser.add_argument("--exponent", type=float, default=1.1,
+                        help="Exponent of Zipf's law")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the corpus generator")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Number of timed runs of every stage")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Don't measure peak memory")
+    parser.add_argument("--backend", default="freqdist",
+                        choices=Preprocess.BACKENDS,
+                        help="How bigrams are stored")
+    parser.add_argument("--tags", nargs="*", default=["NN", "NNS", "NNP"],
+                        help="Relevant tags of candidates")
+    parser.add_argument("--out", default="benchmark.json",
+                        help="Name of the JSON file with results")
+    args = parser.parse_args(args)
+    overrides = {name: getattr(args, name)
+                 for name in ("documents", "tokens", "vocabulary")
+                 if getattr(args, name) is not None}
+    if any(value < 1 for value in overrides.values()):
+        parser.error("--documents, --tokens and --vocabulary should be "
+                     "positive")
+    results = {"python": platform.python_version(),
+               "numpy": np.__version__,
+               "exponent": args.exponent,
+               "seed": args.seed,
+               "backend": args.backend,
+               "scales": []}
+    for scale in args.scales:
+        settings = dict(SCALES[scale], **overrides)
+        directory = tempfile.mkdtemp()
+        try:
+            print("Running scale '{}'...".format(scale))
+            # Progress messages of the stages are left out.
+            with contextlib.redirect_stdout(io.StringIO()):
+                stages = run_scale(directory, settings,
+                                   exponent=args.exponent, seed=args.seed,
+                                   repeat=args.repeat,
+                                   memory=not args.no_memory,
+                                   tags=args.tags,
+                                   backend=args.backend)
+        finally:
+            shutil.rmtree(directory)
+        results["scales"].append({"scale": scale,
+                                  "settings": settings,
+                                  "stages": stages})
+        for name, stats in stages.items():
+            print("{:<24}{:>10.3f} s".format(name, stats["seconds"]))
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print("Success: Results written to '{}'".format(args.out))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Compact bigram counts backed by numpy arrays.
+"""
+from itertools import islice
+
+import numpy as np
+
+# Lower 32 bits of a packed bigram key.
+_LOW = (1 << 32) - 1
+
+
+def pack(ids_i, ids_j):
+    """Packs two arrays of word ids into one array of int64 keys."""
+    return (np.asarray(ids_i, dtype=np.int64) << 32) | np.asarray(ids_j,
+                                                                  np.int64)
+
+
+def unpack(keys):
+    """Splits an array of int64 keys into two arrays of word ids."""
+    return keys >> 32, keys & _LOW
+
+
+def _reduce(keys, counts):
+    """Sorts keys and sums up counts of equal keys.
+
+    Returns:
+        tuple:
+            Array of unique, sorted keys and array of their summed counts.
+    """
+    order = np.argsort(keys, kind="mergesort")
+    keys = keys[order]
+    counts = counts[order]
+    if len(keys) == 0:
+        return keys, counts
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(counts, starts)
+
+
+class Vocabulary:
+
+    """
+    A class that maps words to integer ids and back.
+
+    Ids are assigned in the order words are first seen.
+
+    Attributes:
+        ids (dict):
+            Keys are words, values are their ids.
+
+    Methods:
+        encode(words, add=True):
+            Get an array of ids for words.
+        word(word_id):
+            Get the word of an id.
+    """
+
+    def __init__(self):
+        """Construct an empty Vocabulary instance."""
+        self.ids = dict()
+        self._words = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def encode(self, words, add=True):
+        """Get ids of words.
+
+        Args:
+            words:
+                Iterable of strings.
+            add (bool):
+                If True, unknown words get a new id. If False, their id
+                is -1. Default is True.
+
+        Returns:
+            numpy.ndarray:
+                int32 array of ids.
+        """
+        ids = self.ids
+        if add:
+            # Value is only evaluated for a new word, len(ids) is its id.
+            encoded = (ids.setdefault(word, len(ids)) for word in words)
+        else:
+            encoded = (ids.get(word, -1) for word in words)
+        return np.fromiter(encoded, dtype=np.int32)
+
+    def word(self, word_id):
+        """Returns the word with id word_id."""
+        if word_id >= len(self._words):
+            # Dicts keep insertion order, which is the order of ids.
+            self._words.extend(islice(self.ids, len(self._words), None))
+        return self._words[word_id]
+
+    def words(self):
+        """Returns a list of all words, indexed by their id."""
+        if len(self._words) < len(self.ids):
+            self.word(len(self.ids) - 1)
+        return self._words
+
+    def __getstate__(self):
+        return {"ids": self.ids}
+
+    def __setstate__(self, state):
+        self.ids = state["ids"]
+        self._words = []
+
+
+class BigramTable:
+
+    """
+    A class for counts of bigrams, stored in two numpy arrays.
+
+    Each bigram is stored as one int64 key, the id of the first word
+    in the upper and the id of the second word in the lower 32 bits.
+    Keys are sorted, so a bigram is found by binary search. Can be used
+    like a nltk FreqDist for looking up and iterating over bigrams.
+
+    Attributes:
+        keys (numpy.ndarray):
+            Sorted array of unique int64 keys.
+        counts (numpy.ndarray):
+            Array of counts, counts[i] is the count of keys[i].
+        vocabulary (Vocabulary):
+            Vocabulary used to encode words.
+
+    Methods:
+        from_ids(ids, vocabulary):
+            Count bigrams in an array of word ids.
+        frequencies(bigram_list):
+            Get counts of a list of bigrams.
+        most_common(n=None):
+            Get bigrams sorted by their counts.
+        N():
+            Total count of all bigrams.
+        merge(other):
+            Add the counts of a (small) table.
+    """
+
+    def __init__(self, keys, counts, vocabulary):
+        """Construct a BigramTable instance.
+
+        Args:
+            keys (numpy.ndarray):
+                Sorted array of unique int64 keys.
+            counts (numpy.ndarray):
+                Array of counts for keys.
+            vocabulary (Vocabulary):
+                Vocabulary used to encode words.
+
+        Returns:
+            None.
+        """
+        self.keys = keys
+        self.counts = counts
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def empty(cls, vocabulary):
+        """Returns a table without bigrams."""
+        return cls(np.zeros(0, np.int64), np.zeros(0, np.int64), vocabulary)
+
+    @classmethod
+    def from_keys(cls, keys, vocabulary):
+        """Count keys, which may be unsorted and repeated."""
+        keys, counts = np.unique(keys, return_counts=True)
+        return cls(keys, counts.astype(np.int64), vocabulary)
+
+    @classmethod
+    def from_ids(cls, ids, vocabulary):
+        """Count bigrams in an array of word ids.
+
+        Args:
+            ids (numpy.ndarray):
+                Array of consecutive word ids.
+            vocabulary (Vocabulary):
+                Vocabulary used to encode words.
+
+        Returns:
+            BigramTable
+        """
+        return cls.from_keys(pack(ids[:-1], ids[1:]), vocabulary)
+
+    def _key(self, bigram):
+        """Returns the key of a bigram, None for unknown words."""
+        ids = self.vocabulary.ids
+        word_i, word_j = bigram
+        if word_i not in ids or word_j not in ids:
+            return None
+        return (ids[word_i] << 32) | ids[word_j]
+
+    def _index(self, bigram):
+        """Returns position of bigram in keys or None."""
+        try:
+            key = self._key(bigram)
+        except (TypeError, ValueError):
+            return None
+        if key is None:
+            return None
+        index = int(np.searchsorted(self.keys, key))
+        if index < len(self.keys) and self.keys[index] == key:
+            return index
+        return None
+
+    def __getitem__(self, bigram):
+        index = self._index(bigram)
+        if index is None:
+            return 0
+        return int(self.counts[index])
+
+    def get(self, bigram, default=None):
+        index = self._index(bigram)
+        if index is None:
+            return default
+        return int(self.counts[index])
+
+    def __contains__(self, bigram):
+        return self._index(bigram) is not None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _decode(self, keys):
+        """Returns a list of bigrams for an array of keys."""
+        words = self.vocabulary.words()
+        ids_i, ids_j = unpack(keys)
+        return [(words[i], words[j])
+                for i, j in zip(ids_i.tolist(), ids_j.tolist())]
+
+    def __iter__(self):
+        return iter(self._decode(self.keys))
+
+    def items(self):
+        """Returns list of (bigram, count) tuples."""
+        return list(zip(self._decode(self.keys), self.counts.tolist()))
+
+    def __eq__(self, other):
+        if not hasattr(other, "items"):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def N(self):
+        """Returns the total count of all bigrams."""
+        return int(self.counts.sum())
+
+    def most_common(self, n=None):
+        """Get bigrams sorted by their count in descending order.
+
+        Args:
+            n (int):
+                Number of bigrams that should be returned at most. If
+                default is used, all bigrams are returned.
+
+        Returns:
+            list:
+                (bigram, count) tuples.
+        """
+        order = np.argsort(-self.counts, kind="mergesort")[:n]
+        return list(zip(self._decode(self.keys[order]),
+                        self.counts[order].tolist()))
+
+    def frequent(self, min_count, allowed=None):
+        """Get bigrams with a minimum count, most frequent first.
+
+        Counts and words are filtered on the arrays, only bigrams that
+        pass are sorted and decoded.
+
+        Args:
+            min_count (int):
+                Minimum count of returned bigrams.
+            allowed (numpy.ndarray):
+                Boolean array, allowed[i] is True if the word with id i
+                may be part of a returned bigram. If default is used,
+                all words are allowed.
+
+        Returns:
+            list:
+                (bigram, count) tuples.
+        """
+        keep = self.counts >= min_count
+        if allowed is not None:
+            ids_i, ids_j = unpack(self.keys)
+            keep &= allowed[ids_i] & allowed[ids_j]
+        index = np.flatnonzero(keep)
+        index = index[np.argsort(-self.counts[index], kind="mergesort")]
+        return list(zip(self._decode(self.keys[index]),
+                        self.counts[index].tolist()))
+
+    def frequencies(self, bigram_list):
+        """Get counts of bigrams with one vectorized lookup.
+
+        Args:
+            bigram_list:
+                Iterable of two-tuples of strings.
+
+        Returns:
+            dict:
+                Keys are bigrams that occur in table, values are counts.
+        """
+        bigram_list = list(bigram_list)
+        if not bigram_list or not len(self.keys):
+            return dict()
+        ids_i = self.vocabulary.encode((b[0] for b in bigram_list), add=False)
+        ids_j = self.vocabulary.encode((b[1] for b in bigram_list), add=False)
+        known = (ids_i >= 0) & (ids_j >= 0)
+        keys = pack(np.where(known, ids_i, 0), np.where(known, ids_j, 0))
+        index = np.minimum(np.searchsorted(self.keys, keys),
+                           len(self.keys) - 1)
+        found = known & (self.keys[index] == keys)
+        counts = self.counts[index]
+        return {bigram_list[i]: int(counts[i])
+                for i in np.flatnonzero(found).tolist()}
+
+    def remap(self, mapping, vocabulary):
+        """Returns the table with ids translated to another vocabulary.
+
+        Args:
+            mapping (numpy.ndarray):
+                mapping[i] is the new id of the word with id i.
+            vocabulary (Vocabulary):
+                The new vocabulary.
+
+        Returns:
+            BigramTable
+        """
+        ids_i, ids_j = unpack(self.keys)
+        keys = pack(mapping[ids_i], mapping[ids_j])
+        return BigramTable(*_reduce(keys, self.counts), vocabulary)
+
+    def merge(self, other):
+        """Returns a table with the counts of other added.
+
+        Keys of other are found by binary search and inserted into the
+        sorted keys, so merging a small table doesn't sort all keys again.
+        Counts of other may be negative, bigrams whose count becomes zero
+        are left out.
+
+        Args:
+            other (BigramTable):
+                A table with the same vocabulary.
+
+        Returns:
+            BigramTable
+        """
+        if len(self.keys) == 0:
+            keys, counts = other.keys, other.counts
+        else:
+            pos = np.searchsorted(self.keys, other.keys)
+            last = len(self.keys) - 1
+            found = self.keys[np.minimum(pos, last)] == other.keys
+            counts = self.counts.copy()
+            counts[pos[found]] += other.counts[found]
+            new = ~found
+            keys = np.insert(self.keys, pos[new], other.keys[new])
+            counts = np.insert(counts, pos[new], other.counts[new])
+        nonzero = counts != 0
+        return BigramTable(keys[nonzero], counts[nonzero], self.vocabulary)
+
+
+class TableBuilder:
+
+    LIMIT = 1 << 22
+
+    """
+    A class that sums up many BigramTables into one.
+
+    Tables are buffered and merged with a single sort once the buffer
+    holds more than LIMIT keys, instead of merging every table on its own.
+    After a merge, the next one waits until the buffer holds twice as many
+    keys as the merged table, so the number of merges grows only
+    logarithmically with the number of distinct bigrams.
+
+    Attributes:
+        vocabulary (Vocabulary):
+            Vocabulary shared by all tables.
+
+    Methods:
+        update(bigrams):
+            Add a table or a dict of bigram counts.
+        subtract(bigrams):
+            Subtract a table or a dict of bigram counts.
+        table():
+            Get the sum of all added counts.
+    """
+
+    def __init__(self, vocabulary):
+        """Construct an empty TableBuilder instance."""
+        self.vocabulary = vocabulary
+        self._keys = []
+        self._counts = []
+        self._size = 0
+        # Number of buffered keys that causes the next compaction.
+        self._limit = self.LIMIT
+
+    def update(self, bigrams, sign=1):
+        """Add counts of a BigramTable or a dict of bigram counts.
+
+        Args:
+            bigrams:
+                A BigramTable or a dict with bigrams as keys and counts
+                as values.
+            sign (int):
+                1 to add, -1 to subtract counts. Default is 1.
+
+        Returns:
+            None.
+        """
+        if isinstance(bigrams, BigramTable):
+            keys, counts = bigrams.keys, bigrams.counts
+        else:
+            bigram_list = list(bigrams)
+            ids_i = self.vocabulary.encode(b[0] for b in bigram_list)
+            ids_j = self.vocabulary.encode(b[1] for b in bigram_list)
+            keys = pack(ids_i, ids_j)
+            counts = np.fromiter((bigrams[b] for b in bigram_list),
+                                 dtype=np.int64, count=len(bigram_list))
+        self._keys.append(keys)
+        self._counts.append(counts if sign > 0 else -counts)
+        self._size += len(keys)
+        if self._size > self._limit:
+            self._compact()
+
+    def subtract(self, bigrams):
+        """Subtract counts of a BigramTable or a dict of bigram counts."""
+        self.update(bigrams, sign=-1)
+
+    def _compact(self):
+        """Merges buffered keys and counts."""
+        if len(self._keys) > 1:
+            keys, counts = _reduce(np.concatenate(self._keys),
+                                   np.concatenate(self._counts))
+            self._keys, self._counts = [keys], [counts]
+            self._size = len(keys)
+            self._limit = max(self.LIMIT, 2 * self._size)
+
+    def table(self):
+        """Returns the sum of all added counts as a BigramTable.
+
+        Bigrams whose counts sum up to zero are left out.
+        """
+        if not self._keys:
+            return BigramTable.empty(self.vocabulary)
+        if len(self._keys) == 1:
+            keys, counts = _reduce(self._keys[0], self._counts[0])
+        else:
+            self._compact()
+            keys, counts = self._keys[0], self._counts[0]
+        nonzero = counts != 0
+        return BigramTable(keys[nonzero], counts[nonzero], self.vocabulary)
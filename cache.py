@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Caching counted corpora on disk.
+"""
+import hashlib
+import os
+import pickle
+import zipfile
+from collections import OrderedDict
+
+
+def signature(pointer, hash_contents=False):
+    """Returns a string that changes whenever a file changes.
+
+    Args:
+        pointer:
+            Path of a file, a nltk FileSystemPathPointer or
+            ZipFilePathPointer.
+        hash_contents (bool):
+            If True, the signature is a digest of the content of the file
+            instead of its path, size and modification time.
+            Default is False.
+
+    Returns:
+        str
+    """
+    if hasattr(pointer, "zipfile"):
+        # ZipFilePathPointer, entries are identified by size and crc.
+        info = pointer.zipfile.getinfo(pointer.entry)
+        return "{}:{}".format(info.file_size, info.CRC)
+    # FileSystemPathPointer is a subclass of str.
+    path = str(pointer)
+    if hash_contents:
+        digest = hashlib.sha1()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    stat = os.stat(path)
+    return "{}:{}:{}".format(os.path.abspath(path),
+                             stat.st_size,
+                             stat.st_mtime_ns)
+
+
+def fingerprint(corpus, hash_contents=False, **settings):
+    """Compute a digest that changes whenever a corpus changes.
+
+    Args:
+        corpus:
+            A nltk corpus object that implements fileids() and abspath().
+        hash_contents (bool):
+            Whether files are identified by their content, see signature.
+            Default is False.
+        **settings:
+            Settings used for processing the corpus. Different settings
+            give different digests.
+
+    Returns:
+        str:
+            Hexadecimal digest or None if corpus can't be fingerprinted.
+    """
+    if not hasattr(corpus, "abspath"):
+        return None
+    digest = hashlib.sha256()
+    for name in sorted(settings):
+        digest.update("{}={!r}\n".format(name,
+                                         settings[name]).encode("utf-8"))
+    for fileid in corpus.fileids():
+        try:
+            file_signature = signature(corpus.abspath(fileid), hash_contents)
+        except (AttributeError, KeyError, zipfile.BadZipFile):
+            return None
+        digest.update("{}\t{}\n".format(fileid,
+                                        file_signature).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CountCache:
+
+    VERSION = 2
+
+    """
+    A class that stores the counted state of a corpus on disk, so
+    unchanged corpora don't have to be counted again.
+
+    An entry is identified by a key that is computed from the fileids of
+    a corpus, the size and modification time (or the content) of every
+    file and the settings used for counting. If a file changes, the key
+    changes as well and the old entry isn't used anymore.
+
+    Attributes:
+        directory (str):
+            Name of the directory where entries are stored.
+        hash_contents (bool):
+            If True, keys are computed from the content of files instead
+            of their path, size and modification time.
+
+    Methods:
+        key(corpus, **settings):
+            Compute the key of a corpus.
+        load(key):
+            Load an entry from the cache.
+        save(key, state):
+            Store an entry in the cache.
+        clear():
+            Remove all entries from the cache.
+    """
+
+    def __init__(self, directory, hash_contents=False):
+        """Construct a CountCache instance.
+
+        Args:
+            directory (str):
+                Name of a directory where entries are stored. Is created
+                if it doesn't exist yet.
+            hash_contents (bool):
+                Whether to compute keys from file contents. Slower, but
+                entries stay valid when a corpus is moved or copied.
+                Default is False.
+
+        Returns:
+            None.
+        """
+        self.directory = os.path.join(directory)
+        self.hash_contents = hash_contents
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, corpus, **settings):
+        """Compute the key of a corpus.
+
+        Args:
+            corpus:
+                A nltk corpus object that implements fileids() and
+                abspath().
+            **settings:
+                Settings used for counting, e.g. case folding. Entries
+                counted with different settings have different keys.
+
+        Returns:
+            str:
+                Hexadecimal digest or None if corpus can't be
+                fingerprinted.
+        """
+        return fingerprint(corpus, self.hash_contents,
+                           cache_version=self.VERSION, **settings)
+
+    def _path(self, key):
+        """Returns the name of the file for an entry."""
+        return os.path.join(self.directory, "{}.pickle".format(key))
+
+    def load(self, key):
+        """Load an entry from the cache.
+
+        Args:
+            key (str):
+                Key of the entry, see key().
+
+        Returns:
+            The stored state or None if there is no (readable) entry
+            for the key.
+        """
+        if key is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def save(self, key, state):
+        """Store an entry in the cache.
+
+        The entry is written to a temporary file first, so other processes
+        never read an incomplete entry.
+
+        Args:
+            key (str):
+                Key of the entry, see key().
+            state:
+                A picklable object.
+
+        Returns:
+            None.
+        """
+        if key is None:
+            return
+        path = self._path(key)
+        temp = "{}.{}.tmp".format(path, os.getpid())
+        with open(temp, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".pickle"):
+                os.remove(os.path.join(self.directory, name))
+
+
+class LRUDict(OrderedDict):
+
+    """
+    A dict that holds at most a fixed number of items. When a new item
+    is added to a full dict, the least recently used item is removed.
+
+    Attributes:
+        maxsize (int):
+            Maximum number of items.
+    """
+
+    def __init__(self, maxsize):
+        """Construct a LRUDict instance.
+
+        Args:
+            maxsize (int):
+                Maximum number of items, should be positive.
+
+        Raises:
+            ValueError:
+                If maxsize isn't positive.
+
+        Returns:
+            None.
+        """
+        if maxsize < 1:
+            raise ValueError("Maximum size should be positive.")
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self.move_to_end(key)
+        super().__setitem__(key, value)
+        if len(self) > self.maxsize:
+            # Remove least recently used item.
+            self.popitem(last=False)
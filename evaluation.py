@@ -5,11 +5,15 @@
 Evaluation of a set of extracted terms.
 """
 import csv
+import heapq
 import os
 
+from profiling import stage
+
 
 class Evaluation:
 
+    CHUNK_SIZE = 1 << 20
     DEMO = {"terms": {('machine', 'translation'): 0.8,
                       ('computational', 'linguistics'): 0.6,
                       ('use', 'machine'): 0.5},
@@ -27,6 +31,8 @@ class Evaluation:
             A set of gold standard bigrams (two-tuples of strings)
         correct_terms (set):
             Intersection of terms and golds.
+        n_terms (int):
+            Number of extracted terms.
 
     Methods:
         precision():
@@ -45,7 +51,7 @@ class Evaluation:
             Get a demo of important methods.
     """
 
-    def __init__(self, terms, golds):
+    def __init__(self, terms, golds, n_terms=None):
         """
         Construct an instance of Evaluation class.
 
@@ -56,15 +62,24 @@ class Evaluation:
             golds:
                 Iterable of bigrams (two-tuples of strings) that are
                 considered the standard.
+            n_terms (int):
+                Number of extracted terms, if terms only contains some of
+                them. If default is used, len(terms) is used.
 
         Returns:
             None.
         """
         self.terms = terms
+        if n_terms is None:
+            n_terms = len(terms)
+        self.n_terms = n_terms
         self.golds = set(golds)
         if not self.golds:
             raise ValueError("Gold standard must contain at least one element")
         self.correct_terms = set(self.terms).intersection(self.golds)
+        # Terms sorted by ascending score, computed on demand.
+        self._order = None
+        self._queried = False
 
     def precision(self):
         """Compute precision by dividing number of correct terms by
@@ -73,9 +88,9 @@ class Evaluation:
         Returns:
             Precision value (float)
         """
-        if len(self.terms) == 0:
+        if self.n_terms == 0:
             return 0
-        return len(self.correct_terms) / len(self.terms)
+        return len(self.correct_terms) / self.n_terms
 
     def recall(self):
         """Compute recall by dividing number of correct terms by
@@ -98,6 +113,8 @@ class Evaluation:
         """Returns n highest scored terms according to
         self.terms values of bigrams.
 
+        Terms with equal values keep the order of self.terms.
+
         Args:
             n (int):
                 Number of terms that should be returned at most.
@@ -107,15 +124,14 @@ class Evaluation:
                 list of max. n terms sorted by their decision value in
                 descending order.
         """
-        sorted_terms = sorted(self.terms,
-                              key=lambda x: self.terms[x],
-                              reverse=True)
-        return sorted_terms[:n]
+        return self._scored(n, reverse=True)
 
     def lowest_scored(self, n=100):
         """Returns n lowest scored terms according to
         self.terms values of bigrams.
 
+        Terms with equal values keep the order of self.terms.
+
         Args:
             n (int):
                 Number of terms that should be returned at most.
@@ -125,9 +141,50 @@ class Evaluation:
                 list of max. n terms sorted by their decision value in
                 ascending order.
         """
-        sorted_terms = sorted(self.terms,
-                              key=lambda x: self.terms[x])
-        return sorted_terms[:n]
+        return self._scored(n, reverse=False)
+
+    def _scored(self, n, reverse):
+        """Returns n highest or lowest scored terms.
+
+        The first query selects terms with a heap, which only keeps n
+        terms. Further queries sort all terms once and reuse the order.
+        """
+        if (self._order is None and not self._queried
+                and 0 <= n < len(self.terms)):
+            self._queried = True
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            # Same result as sorted(...)[:n], including order of ties.
+            return select(n, self.terms, key=self.terms.__getitem__)
+        order = self._ascending()
+        if not reverse:
+            return order[:n]
+        if n < 0:
+            return self._descending(order, len(order))[:n]
+        return self._descending(order, n)
+
+    def _ascending(self):
+        """Returns terms sorted by their value in ascending order."""
+        if self._order is None or len(self._order) != len(self.terms):
+            self._order = sorted(self.terms, key=self.terms.__getitem__)
+        return self._order
+
+    def _descending(self, order, n):
+        """Returns first n terms of order in descending order.
+
+        Runs of equal values are taken from the end of order, each run
+        keeps its own order, like sorted(..., reverse=True) does.
+        """
+        terms = self.terms
+        top = []
+        end = len(order)
+        while end > 0 and len(top) < n:
+            start = end - 1
+            value = terms[order[start]]
+            while start > 0 and terms[order[start - 1]] == value:
+                start -= 1
+            top.extend(order[start:end])
+            end = start
+        return top[:n]
 
     @classmethod
     def demo(cls):
@@ -150,12 +207,65 @@ class Evaluation:
         print("{:=^90}".format("lowest_scored(n=1)"))
         print(eva.lowest_scored(n=1))
 
+    @staticmethod
+    def _read_golds(goldfile):
+        """Returns set of gold standard bigrams read from goldfile."""
+        golds = set()
+        with open(goldfile, encoding="utf-8") as file:
+            for line in file:
+                line = line.rstrip().split()
+                golds.add(tuple(line))
+        return golds
+
     @classmethod
-    def from_file(cls, goldfile, extractedfile, ignore=2):
+    def _read_terms(cls, file, ignore):
+        """Yields bigrams and values of terms in an extracted file.
+
+        Lines are read in chunks of about CHUNK_SIZE bytes. Only the flag
+        of every line is checked, bigram and value are only parsed for
+        lines of terms. Lines with quotes are parsed by a csv reader.
+
+        Raises:
+            ValueError:
+                If a line after the first ignored lines is malformed.
+        """
+        for _ in range(ignore):
+            file.readline()
+        while True:
+            lines = file.readlines(cls.CHUNK_SIZE)
+            if not lines:
+                break
+            for line in lines:
+                if '"' in line:
+                    fields = next(csv.reader([line], delimiter=";"), [])
+                else:
+                    fields = line.rstrip("\r\n").split(";")
+                if len(fields) < 3 or fields[2] not in ("True", "False"):
+                    raise ValueError(cls._malformed(ignore))
+                if fields[2] == "True":
+                    try:
+                        value = float(fields[1])
+                    except ValueError:
+                        raise ValueError(cls._malformed(ignore))
+                    yield tuple(fields[0].split()), value
+
+    @staticmethod
+    def _malformed(ignore):
+        """Returns error message for a malformed extracted file."""
+        return ("Malformed input file. "
+                "The first {} lines "
+                "are ignored.\n"
+                "Every line after"
+                "should have the format: "
+                "<term>;<float>;"
+                "<True/False>".format(ignore))
+
+    @classmethod
+    def from_file(cls, goldfile, extractedfile, ignore=2, keep_terms=True):
         """Get gold terms and extracted terms from files.
 
         Skips first lines in extractedfile and only reads in
-        well formed lines.
+        well formed lines. The extracted file is streamed, see _read_terms.
 
         Args:
             goldfile (str):
@@ -175,6 +285,13 @@ class Evaluation:
                 that will be skipped.
                 Default is 2, because these lines contain values
                 for alpha and theta.
+            keep_terms (bool):
+                If False, extracted terms are only counted and compared
+                to the gold standard while reading, only correct terms are
+                kept in memory. Precision, recall and f1 are the same as
+                long as no term is in more than one line, highest_scored
+                and lowest_scored only return correct terms.
+                Default is True.
 
         Raises:
             ValueError:
@@ -186,38 +303,22 @@ class Evaluation:
         """
         goldfile = os.path.join(goldfile)
         extractedfile = os.path.join(extractedfile)
-        golds = set()
-        extracted = dict()
-        # Read gold standard terms from file.
-        with open(goldfile) as goldfile:
-            for line in goldfile:
-                line = line.rstrip().split()
-                golds.add(tuple(line))
-        # Read extracted terms from file.
-        with open(extractedfile) as extractedfile:
-            csv_reader = csv.reader(extractedfile, delimiter=";")
-            line_count = 0
-            for line in csv_reader:
-                if line_count not in range(ignore):
-                    try:
-                        bigram, value, isterm = (tuple(line[0].split()),
-                                                 float(line[1]),
-                                                 line[2])
-                        if isterm != "True" and isterm != "False":
-                            raise ValueError
-                    # Malformed lines.
-                    except (IndexError, ValueError):
-                        raise ValueError("Malformed input file. "
-                                         "The first {} lines "
-                                         "are ignored.\n"
-                                         "Every line after"
-                                         "should have the format: "
-                                         "<term>;<float>;"
-                                         "<True/False>".format(ignore))
-                    if isterm == "True":
+        with stage("Evaluation.from_file") as counts:
+            golds = cls._read_golds(goldfile)
+            extracted = dict()
+            n_terms = 0
+            with open(extractedfile, encoding="utf-8") as file:
+                for bigram, value in cls._read_terms(file, ignore):
+                    if keep_terms or bigram in golds:
                         extracted[bigram] = value
-                line_count += 1
-        return cls(extracted, golds)
+                    n_terms += 1
+            counts["golds"] = len(golds)
+            counts["terms"] = n_terms
+            counts["kept"] = len(extracted)
+        if keep_terms:
+            # Number of distinct terms, like before.
+            n_terms = None
+        return cls(extracted, golds, n_terms=n_terms)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Fast tokenizing of plaintext corpora, without nltk corpus views.
+"""
+import codecs
+import mmap
+import os
+import re
+
+from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+from nltk.tokenize import WordPunctTokenizer
+
+# Pattern of nltk's WordPunctTokenizer.
+TOKEN = re.compile(r"\w+|[^\w\s]+")
+# Encodings where a newline byte is never part of another character.
+_ENCODINGS = ("utf-8", "ascii")
+
+
+class FastReader:
+
+    BLOCK = 1024 ** 2
+
+    """
+    A class that tokenizes files of a plaintext corpus in large blocks.
+
+    Files are memory-mapped and split into blocks of about BLOCK bytes at
+    line breaks. Every block is decoded and tokenized at once with the
+    pattern of WordPunctTokenizer. Tokens never contain whitespace, so
+    they are the same as the tokens of the corpus reader, which tokenizes
+    line by line. Blocks of ASCII text are lowercased as a whole before
+    tokenizing, other blocks token by token, because lowercasing some
+    characters changes which characters are part of a word.
+
+    Files with other encodings than UTF-8 or ASCII are read by the corpus
+    reader. All other attributes are taken from the corpus, so a
+    FastReader can be used instead of it.
+
+    Attributes:
+        corpus (PlaintextCorpusReader):
+            The corpus that is read.
+
+    Methods:
+        supports(corpus):
+            Check if a corpus can be read by a FastReader.
+        words(fileid):
+            Get the tokens of a file.
+        lowered_words(fileid):
+            Get the lowercased tokens of a file.
+    """
+
+    def __init__(self, corpus):
+        """Construct a FastReader instance.
+
+        Args:
+            corpus (PlaintextCorpusReader):
+                A corpus that uses the default word tokenizer.
+
+        Raises:
+            ValueError:
+                If the corpus isn't supported, see supports.
+
+        Returns:
+            None.
+        """
+        if not self.supports(corpus):
+            raise ValueError("Only plaintext corpora with the default "
+                             "word tokenizer can be read fast.")
+        self.corpus = corpus
+
+    @staticmethod
+    def supports(corpus):
+        """Returns True if corpus is a plaintext corpus that tokenizes
+        words with WordPunctTokenizer."""
+        return (isinstance(corpus, PlaintextCorpusReader)
+                and type(corpus._word_tokenizer) is WordPunctTokenizer)
+
+    def _path(self, fileid):
+        """Returns path of a file if it can be read fast, else None."""
+        encoding = self.corpus.encoding(fileid) or "utf-8"
+        if codecs.lookup(encoding).name not in _ENCODINGS:
+            return None
+        return getattr(self.corpus.abspath(fileid), "path", None)
+
+    def _blocks(self, path, encoding):
+        """Yields decoded blocks of a file that end at line breaks.
+
+        Yields:
+            tuple:
+                Decoded text and whether the block is ASCII.
+        """
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    data.madvise(mmap.MADV_SEQUENTIAL)
+                start = 0
+                # The corpus reader skips a byte order mark.
+                if data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+                    start = len(codecs.BOM_UTF8)
+                while start < size:
+                    end = min(start + self.BLOCK, size)
+                    if end < size:
+                        newline = data.rfind(b"\n", start, end)
+                        if newline < 0:
+                            newline = data.find(b"\n", end)
+                        end = size if newline < 0 else newline + 1
+                    block = data[start:end]
+                    yield block.decode(encoding), block.isascii()
+                    start = end
+
+    def _tokens(self, fileid, lower):
+        """Returns list of tokens of a file, lowercased if lower is True."""
+        path = self._path(fileid)
+        if path is None:
+            words = self.corpus.words(fileid)
+            if lower:
+                return [word.lower() for word in words]
+            return list(words)
+        words = []
+        for text, ascii_only in self._blocks(path,
+                                             self.corpus.encoding(fileid)
+                                             or "utf-8"):
+            if not lower:
+                words.extend(TOKEN.findall(text))
+            elif ascii_only:
+                words.extend(TOKEN.findall(text.lower()))
+            else:
+                words.extend(word.lower() for word in TOKEN.findall(text))
+        return words
+
+    def words(self, fileid):
+        """Returns list of tokens of a file, see PlaintextCorpusReader."""
+        return self._tokens(fileid, lower=False)
+
+    def lowered_words(self, fileid):
+        """Returns list of lowercased tokens of a file."""
+        return self._tokens(fileid, lower=True)
+
+    def __getattr__(self, name):
+        return getattr(self.corpus, name)
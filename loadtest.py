@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Load test of a running extraction service, see service.py.
+
+Many requests are sent at once by several threads. Throughput and
+latency percentiles are printed and written as JSON. Without --url, a
+local service is started for the given corpora.
+
+Run `loadtest.py -h` for options.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def post(url, request, timeout=60):
+    """Sends a JSON request and returns the decoded response.
+
+    Raises:
+        urllib.error.URLError:
+            If the request failed.
+    """
+    data = json.dumps(request).encode("utf-8")
+    message = urllib.request.Request(url, data=data, method="POST",
+                                     headers={"Content-Type":
+                                              "application/json"})
+    with urllib.request.urlopen(message, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def run_load(url, request, requests=200, concurrency=8):
+    """Sends the same request many times from several threads.
+
+    Args:
+        url (str):
+            Address of an endpoint, e.g. "http://127.0.0.1:8000/top".
+        request (dict):
+            The JSON request.
+        requests (int):
+            Number of requests. Default is 200.
+        concurrency (int):
+            Number of requests sent at once. Default is 8.
+
+    Returns:
+        dict:
+            "requests", "errors", "seconds" (of all requests),
+            "throughput" (requests per second) and latencies in
+            milliseconds: "p50", "p99" and "max".
+    """
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            post(url, request)
+        except (urllib.error.URLError, OSError):
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    seconds = time.perf_counter() - start
+    done = np.array([latency for latency in latencies
+                     if latency is not None]) * 1000
+    report = {"requests": requests,
+              "errors": requests - len(done),
+              "seconds": seconds,
+              "throughput": len(done) / seconds if seconds else None}
+    for name, percentile in (("p50", 50), ("p99", 99), ("max", 100)):
+        report[name] = (float(np.percentile(done, percentile))
+                        if len(done) else None)
+    return report
+
+
+def _read_terms(filename):
+    """Returns list of terms of a file, one term per line."""
+    with open(filename, encoding="utf-8") as file:
+        return [line.split("\t")[0].strip() for line in file
+                if line.strip()]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Load test of the "
+                                     "extraction service")
+    parser.add_argument("--url", help="Address of a running service, "
+                        "e.g. http://127.0.0.1:8000")
+    parser.add_argument("--domain", help="Domain corpus of a local "
+                        "service, if no --url is given")
+    parser.add_argument("--reference", help="Reference corpus of a local "
+                        "service, if no --url is given")
+    parser.add_argument("--candidates", help="File with candidates. "
+                        "Default are the candidates of the service")
+    parser.add_argument("--golds", help="File with gold terms, needed for "
+                        "endpoint evaluate")
+    parser.add_argument("--endpoint", default="top",
+                        choices=["score", "top", "evaluate"],
+                        help="Endpoint that is tested")
+    parser.add_argument("--alpha", type=float, default=0.5)
+    parser.add_argument("--theta", type=float, default=1.0)
+    parser.add_argument("--k", type=int, default=10,
+                        help="Number of terms for endpoint top")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Number of requests")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Number of requests sent at once")
+    parser.add_argument("--out", help="Name of a JSON file for the results")
+    args = parser.parse_args(args)
+    request = {"alpha": args.alpha, "theta": args.theta, "k": args.k}
+    if args.candidates:
+        request["candidates"] = _read_terms(args.candidates)
+    if args.golds:
+        request["golds"] = _read_terms(args.golds)
+    server = None
+    url = args.url
+    if url is None:
+        if args.domain is None or args.reference is None:
+            parser.error("Either --url or --domain and --reference "
+                         "are needed")
+        from service import TermService, make_server
+        print("Starting local service...")
+        candidates = [tuple(term.split())
+                      for term in request.get("candidates", [])]
+        service = TermService(args.domain, args.reference, candidates)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://{}:{}".format(*server.server_address[:2])
+    try:
+        # First request fills the cache of the service.
+        post("{}/{}".format(url.rstrip("/"), args.endpoint), request)
+        report = run_load("{}/{}".format(url.rstrip("/"), args.endpoint),
+                          request, args.requests, args.concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    report.update(endpoint=args.endpoint, concurrency=args.concurrency)
+    if report["p50"] is None:
+        print("All {} requests failed".format(report["requests"]))
+    else:
+        print("{throughput:.1f} requests/s, p50 {p50:.2f} ms, "
+              "p99 {p99:.2f} ms, {errors} errors".format(**report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print("Success: Results written to '{}'".format(args.out))
+    return report
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -7,14 +7,50 @@ Main file - Implements command line arguments with argparse.
 Extract - Class for the command to extract terminology
 Evaluate - Class for the command to evaluate extracted terms.
 Candidates - Class for the command to generate candidates.
+Tune - Class for the command to search for the best alpha and theta.
+Index - Class for the command to write a reference index.
+Tokenize - Class for the command to store a tokenized corpus.
+Rescore - Class for the command to extract terminology from saved scores.
+CountShard - Class for the command to count a shard of a corpus.
+MergeCounts - Class for the command to merge counted shards.
+
+Modules of the package and nltk are imported by the commands that need
+them, so short commands like evaluate start fast.
 """
 import argparse
 import os
 import sys
 
-from evaluation import Evaluation
-from preprocess import Preprocess
-from terminology import Terminology
+
+def _profile_arguments(parser):
+    """Add arguments for profiling a run to parser."""
+    parser.add_argument("--profile", metavar="DIR",
+                        help="Write time, memory and counts of every stage "
+                        "to DIR/profile.json and a timeline to "
+                        "DIR/trace.json")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile, also write a cProfile dump "
+                        "of every stage to DIR")
+
+
+def run(command):
+    """Runs a command, records a profile if the command has one.
+
+    Args:
+        command:
+            An object of one of the command classes.
+
+    Returns:
+        None.
+    """
+    directory = getattr(command, "profile", None)
+    if directory is None:
+        command.run()
+        return
+    from profiling import Profiler
+    with Profiler(directory, cprofile=command.cprofile):
+        command.run()
+    print("Success: Profile written to '{}'".format(directory))
 
 
 class Extract:
@@ -35,17 +71,35 @@ class Extract:
             Value for alpha, weights relevance and consensus
         theta (float):
             Value for theta, threshold for terminology
+        workers (int):
+            Number of processes used for counting.
+        backend (str):
+            How bigrams are stored, "freqdist" or "array".
+        cache (str):
+            Directory where counted corpora are stored.
+            None if no cache should be used.
+        reference_index (str):
+            Name of an index file of the reference corpus or None.
+        scores (str):
+            Name of a file where relevance and consensus of the
+            candidates are saved or None, see Terminology.save.
+        counts (str):
+            Count file of merged shards of the domain corpus or None.
+        profile (str):
+            Directory for a profile of the run or None.
+        cprofile (bool):
+            Whether stages of the run are profiled with cProfile.
 
     Methods:
-        read_from_file(file, n=2):
+        read_from_file(file, n=None):
             Read in terms from a file.
         run():
             Extract terminology from domain corpus
             and write results to output file.
     """
-    from nltk.corpus import reuters
-
-    REF = reuters
+    # Reference corpus, nltk's reuters corpus if None.
+    REF = None
+    CACHE = ".terminology_cache"
 
     def __init__(self, sysargs):
         """Instanciate an Extract object
@@ -60,6 +114,114 @@ class Extract:
         self.out = self.args.out
         self.theta = self.args.theta
         self.alpha = self.args.alpha
+        self.workers = self.args.workers
+        self.backend = self.args.backend
+        self.cache = self._cache_dir(self.args)
+        self.reference_index = self.args.reference_index
+        self.scores = self.args.save_scores
+        self.counts = self.args.counts
+        self.profile = self.args.profile
+        self.cprofile = self.args.cprofile
+
+    def _reference(self):
+        """Returns the reference corpus, loads reuters on first use.
+
+        If an index of the reference corpus was given, it is opened instead.
+        """
+        if self.reference_index is not None:
+            from refindex import ReferenceIndex
+            return ReferenceIndex(self.reference_index)
+        if self.REF is None:
+            from nltk.corpus import reuters
+            return reuters
+        return self.REF
+
+    def _reference_candidates(self):
+        """Returns the candidates the reference corpus has counts of.
+
+        A reference index only contains bigrams, other candidates are
+        skipped with a warning.
+        """
+        if self.reference_index is None:
+            return self.candidates
+        bigrams = {term for term in self.candidates if len(term) == 2}
+        skipped = len(self.candidates) - len(bigrams)
+        if skipped:
+            print("Warning: {} candidates that aren't bigrams are skipped, "
+                  "the reference index only contains bigrams."
+                  .format(skipped))
+        return bigrams
+
+    def _domain(self):
+        """Returns the domain corpus, counts are loaded from a count file
+        if one was given."""
+        if self.counts is None:
+            return self.corpus
+        from preprocess import Preprocess
+        return Preprocess(self.corpus, cache=self.cache, workers=self.workers,
+                          counts_file=self.counts)
+
+    @staticmethod
+    def _reader_argument(parser):
+        """Add argument for choosing how files are tokenized to parser."""
+        parser.add_argument("--reader", default="nltk",
+                            choices=["nltk", "fast"],
+                            help="Tokenize files with the nltk corpus reader "
+                            "or in large blocks with the same result")
+
+    @staticmethod
+    def _counts_argument(parser):
+        """Add argument for loading counts of merged shards to parser."""
+        parser.add_argument("--counts",
+                            help="Count file of the corpus written by the "
+                            "merge-counts command. Default is counting "
+                            "the corpus")
+
+    @staticmethod
+    def _reference_argument(parser):
+        """Add argument for using an index as reference corpus to parser."""
+        parser.add_argument("--reference-index",
+                            help="Index file of the reference corpus, "
+                            "written by the index command. Default is "
+                            "counting the reuters corpus")
+
+    @staticmethod
+    def _cache_dir(args):
+        """Returns directory for counted corpora, None if disabled."""
+        if args.no_cache:
+            return None
+        return args.cache
+
+    @staticmethod
+    def _backend_argument(parser, sketch=False):
+        """Add argument for choosing how bigrams are stored to parser.
+
+        If sketch is True, bigrams can be counted approximately in bounded
+        memory, which adds options for the memory and a second exact pass.
+        """
+        choices = ["freqdist", "array"]
+        description = ("Store bigrams in nltk FreqDists or in compact numpy "
+                       "arrays")
+        if sketch:
+            choices.append("sketch")
+            description += " or estimate their counts in bounded memory"
+            parser.add_argument("--memory", type=int, default=256,
+                                help="Megabytes for counting with "
+                                "backend sketch")
+            parser.add_argument("--exact", action="store_true",
+                                help="Count bigrams found with backend "
+                                "sketch again exactly")
+        parser.add_argument("--backend", default="freqdist",
+                            choices=choices, help=description)
+
+    @classmethod
+    def _cache_arguments(cls, parser):
+        """Add arguments for caching counted corpora to parser."""
+        parser.add_argument("--cache", default=cls.CACHE,
+                            help="Directory where counted corpora are "
+                            "stored. Default is '{}'".format(cls.CACHE))
+        parser.add_argument("--no-cache", action="store_true",
+                            help="Always count corpora, don't use a cache")
 
     def _parser(self, sysargs):
         """Parse command line arguments"""
@@ -76,18 +238,33 @@ class Extract:
                             default=2,
                             help="Threshold when extracting terminology")
         parser.add_argument("out", help="Name for output file")
+        parser.add_argument("--workers", default=1, type=int,
+                            help="Number of processes used for counting")
+        parser.add_argument("--save-scores", metavar="FILE",
+                            help="Save relevance and consensus of the "
+                            "candidates to FILE, for the rescore command")
+        self._backend_argument(parser)
+        self._cache_arguments(parser)
+        self._counts_argument(parser)
+        self._reference_argument(parser)
+        _profile_arguments(parser)
         return parser.parse_args(sysargs)
 
     @staticmethod
-    def read_from_file(file, n=2):
-        """Read terms from file."""
+    def read_from_file(file, n=None):
+        """Read terms from file.
+
+        Terms with n words are read, single words as strings and other
+        terms as tuples. If n is None, terms of any length are read as
+        tuples.
+        """
         terms = set()
         with open(file, encoding="utf-8") as file:
             for line in file:
                 line = line.rstrip().split("\t")
                 if line:
                     term = line[0].split()
-                    if len(term) == n:
+                    if len(term) == n or (n is None and term):
                         if n == 1:
                             terms.add(*term)
                         else:
@@ -99,16 +276,77 @@ class Extract:
 
         Returns: None
         """
+        from terminology import Terminology
         out = os.path.join(self.out)
         # Extract terminology.
         print("Processing domain and reference corpus...")
-        term_obj = Terminology(self.corpus,
-                               self.REF,
-                               self.candidates)
+        term_obj = Terminology(self._domain(),
+                               self._reference(),
+                               self._reference_candidates(),
+                               cache=self.cache,
+                               workers=self.workers,
+                               backend=self.backend)
+        if self.scores is not None:
+            term_obj.save(self.scores)
         print("Extracting Terminology...")
         term_obj.write_csv(self.alpha, self.theta, out)
 
 
+class Rescore:
+    """
+    A class that extracts terminology with new values for alpha and theta
+    from scores saved by the extract command, without the corpora.
+
+    Attributes:
+        scores (str):
+            Name of a file written with extract --save-scores.
+        alpha (float):
+            Value for alpha, weights relevance and consensus
+        theta (float):
+            Value for theta, threshold for terminology
+        out (str):
+            Name of a file where output will be stored.
+        profile (str):
+            Directory for a profile of the run or None.
+        cprofile (bool):
+            Whether stages of the run are profiled with cProfile.
+    """
+
+    def __init__(self, sysargs):
+        self.args = self._parser(sysargs)
+        self.scores = self.args.scores
+        self.alpha = self.args.alpha
+        self.theta = self.args.theta
+        self.out = self.args.out
+        self.profile = self.args.profile
+        self.cprofile = self.args.cprofile
+
+    def _parser(self, sysargs):
+        parser = argparse.ArgumentParser(description="Extract terminology "
+                                         "from saved scores")
+        parser.add_argument("scores",
+                            help="File written with extract --save-scores")
+        parser.add_argument("-a", "--alpha", type=float,
+                            default=0.5,
+                            help="Value for weighing consensus "
+                            "and relevance")
+        parser.add_argument("-t", "--theta", type=float,
+                            default=2,
+                            help="Threshold when extracting terminology")
+        parser.add_argument("out", help="Name for output file")
+        _profile_arguments(parser)
+        return parser.parse_args(sysargs)
+
+    def run(self):
+        """Weigh saved scores and write them to the output file.
+
+        Returns: None
+        """
+        from terminology import Terminology
+        term_obj = Terminology.load(self.scores)
+        term_obj.write_csv(self.alpha, self.theta, os.path.join(self.out))
+
+
 class Evaluate:
     """
     A class that evaluates extracted terms.
@@ -126,6 +364,10 @@ class Evaluate:
         low (int):
             Indicates how many of the lowest scored terms will be
             printes, If None, no terms will be printed.
+        profile (str):
+            Directory for a profile of the run or None.
+        cprofile (bool):
+            Whether stages of the run are profiled with cProfile.
     """
 
     def __init__(self, sysargs):
@@ -142,6 +384,8 @@ class Evaluate:
         self.extracted = self._args.extracted
         self.high = self._args.high
         self.low = self._args.low
+        self.profile = self._args.profile
+        self.cprofile = self._args.cprofile
 
     def _parser(self, sysargs):
         """Parse command line arguments."""
@@ -157,11 +401,16 @@ class Evaluate:
                             help="Print n highest scored terms")
         parser.add_argument("--low", type=int,
                             help="Print n lowest scored terms")
+        _profile_arguments(parser)
         return parser.parse_args(sysargs)
 
     def run(self):
         """Evaluate extracted terms and print highest/lowest scored terms."""
-        eval_extrac = Evaluation.from_file(self.gold, self.extracted)
+        from evaluation import Evaluation
+        # Extracted terms are only needed for printing them.
+        keep_terms = self.high is not None or self.low is not None
+        eval_extrac = Evaluation.from_file(self.gold, self.extracted,
+                                           keep_terms=keep_terms)
         # Print evaluation metrics.
         print("Recall: {:.3f}".format(eval_extrac.recall()))
         print("Precision: {:.3f}".format(eval_extrac.precision()))
@@ -169,13 +418,13 @@ class Evaluate:
         if self.high is not None:
             print("{} highest scored terms:".format(self.high))
             high_terms = eval_extrac.highest_scored(self.high)
-            for wordi, wordj in high_terms:
-                print(wordi, wordj)
+            for term in high_terms:
+                print(" ".join(term))
         if self.low is not None:
             print("{} lowest scored terms:".format(self.low))
             low_terms = eval_extrac.lowest_scored(self.low)
-            for wordi, wordj in low_terms:
-                print(wordi, wordj)
+            for term in low_terms:
+                print(" ".join(term))
 
 
 class Candidates(Extract):
@@ -195,6 +444,34 @@ class Candidates(Extract):
         tags [list]:
             List of Penn Treebank Tags that are considered relevant for
             a candidate, can be empty.
+        lengths (list):
+            Numbers of words of candidates.
+        context (bool):
+            Whether bigrams are tagged in the sentences they occur in.
+        workers (int):
+            Number of processes used for counting and tagging.
+        backend (str):
+            How bigrams are stored, "freqdist", "array" or "sketch".
+        memory (int):
+            Megabytes for counting with backend "sketch".
+        exact (bool):
+            Whether bigrams found with backend "sketch" are counted again
+            exactly.
+        prefetch (int):
+            Number of files read ahead while counting.
+        prefetch_memory (int):
+            Megabytes of files read ahead.
+        counts (str):
+            Count file of merged shards of the corpus or None.
+        reader (str):
+            How files are tokenized, "nltk" or "fast".
+        cache (str):
+            Directory where counted corpora are stored.
+            None if no cache should be used.
+        profile (str):
+            Directory for a profile of the run or None.
+        cprofile (bool):
+            Whether stages of the run are profiled with cProfile.
     """
 
     def __init__(self, sysargs):
@@ -204,6 +481,19 @@ class Candidates(Extract):
         self.min_count = self.args.min
         self.output = self.args.output
         self.tags = self.args.tags
+        self.lengths = self.args.n
+        self.context = self.args.context
+        self.workers = self.args.workers
+        self.backend = self.args.backend
+        self.memory = self.args.memory
+        self.exact = self.args.exact
+        self.prefetch = self.args.prefetch
+        self.prefetch_memory = self.args.prefetch_memory
+        self.counts = self.args.counts
+        self.reader = self.args.reader
+        self.cache = self._cache_dir(self.args)
+        self.profile = self.args.profile
+        self.cprofile = self.args.cprofile
 
     def _parser(self, sysargs):
         parser = argparse.ArgumentParser(description="Generate possible "
@@ -222,6 +512,26 @@ class Candidates(Extract):
                             "use Penn Treebank Tags",
                             nargs="*",
                             default=[])
+        parser.add_argument("--n", nargs="+", type=int, default=[2],
+                            help="Numbers of words of candidates, e.g. "
+                            "1 2 3 for mixed lengths. Default is 2")
+        parser.add_argument("--context", action="store_true",
+                            help="Tag bigrams in the sentences they occur "
+                            "in instead of on their own")
+        parser.add_argument("--workers", default=1, type=int,
+                            help="Number of processes used for counting "
+                            "and tagging")
+        self._backend_argument(parser, sketch=True)
+        parser.add_argument("--prefetch", default=0, type=int,
+                            help="Number of files read ahead in background "
+                            "threads while counting. Default is 0")
+        parser.add_argument("--prefetch-memory", default=64, type=int,
+                            help="Megabytes of text read ahead at most. "
+                            "Default is 64")
+        self._reader_argument(parser)
+        self._cache_arguments(parser)
+        self._counts_argument(parser)
+        _profile_arguments(parser)
         return parser.parse_args(sysargs)
 
     def run(self):
@@ -229,30 +539,484 @@ class Candidates(Extract):
 
         Returns: None.
         """
+        from preprocess import Preprocess
         if self.stops is None:
             stops = []
         else:
             stops = self.read_from_file(self.stops, n=1)
         out = os.path.join(self.output)
         print("Processing corpus...")
-        process = Preprocess(self.corpus)
+        process = Preprocess(self.corpus, cache=self.cache,
+                             workers=self.workers, backend=self.backend,
+                             memory=self.memory * 1024 ** 2,
+                             prefetch=self.prefetch,
+                             prefetch_memory=self.prefetch_memory * 1024 ** 2,
+                             counts_file=self.counts, reader=self.reader)
+        if process.backend == "sketch":
+            bounds = process.bigrams().error_bounds()
+            print("Counts are estimated: with probability {:.3f} at most "
+                  "{:.1f} too high. Every bigram counted more than {} "
+                  "times is kept.".format(1 - bounds["delta"],
+                                          bounds["overestimate"],
+                                          bounds["threshold"]))
         print("Generating candidates...")
         process.write_candidates_file(min_count=self.min_count,
                                       stops=stops,
                                       tags=self.tags,
-                                      filename=out)
+                                      filename=out,
+                                      context=self.context,
+                                      exact=self.exact,
+                                      n=self.lengths)
+
+
+class Tune(Extract):
+    """
+    A class that evaluates many settings of alpha and theta against
+    a gold standard and writes the results to a file.
+
+    Attributes:
+        corpus (str):
+            Directory with text files of the domain.
+        candidates (set):
+            Candidates read from the candidates file.
+        golds (set):
+            Gold standard terms read from the gold file.
+        alphas (list):
+            Values for alpha.
+        thetas (list):
+            Values for theta.
+        out (str):
+            Name of the file where results are written to.
+        workers (int):
+            Number of processes used for counting and evaluating.
+        backend (str):
+            How bigrams are stored, "freqdist" or "array".
+        cache (str):
+            Directory where counted corpora are stored.
+            None if no cache should be used.
+        reference_index (str):
+            Name of an index file of the reference corpus or None.
+        counts (str):
+            Count file of merged shards of the domain corpus or None.
+    """
+
+    def __init__(self, sysargs):
+        self.args = self._parser(sysargs)
+        self.corpus = self.args.corpus
+        self.candidates = self.read_from_file(self.args.candidates)
+        self.golds = self.read_from_file(self.args.gold)
+        self.alphas = self.args.alphas
+        self.thetas = self.args.thetas
+        self.out = self.args.out
+        self.workers = self.args.workers
+        self.backend = self.args.backend
+        self.cache = self._cache_dir(self.args)
+        self.reference_index = self.args.reference_index
+        self.counts = self.args.counts
+
+    def _parser(self, sysargs):
+        parser = argparse.ArgumentParser(description="Search for the "
+                                         "best values of alpha and theta")
+        parser.add_argument("corpus",
+                            help="Directory of domain corpus with txt files")
+        parser.add_argument("candidates",
+                            help="File with candidates.")
+        parser.add_argument("gold",
+                            help="File with gold standard terms.")
+        parser.add_argument("out",
+                            help="Name for output file with results "
+                            "of every setting")
+        parser.add_argument("-a", "--alphas", type=float, nargs="+",
+                            default=[0.1, 0.3, 0.5, 0.7, 0.9],
+                            help="Values for alpha")
+        parser.add_argument("-t", "--thetas", type=float, nargs="+",
+                            default=[0.5, 1, 1.5, 2],
+                            help="Values for theta")
+        parser.add_argument("--workers", default=1, type=int,
+                            help="Number of processes used for counting "
+                            "and evaluating")
+        self._backend_argument(parser)
+        self._cache_arguments(parser)
+        self._counts_argument(parser)
+        self._reference_argument(parser)
+        return parser.parse_args(sysargs)
+
+    def run(self):
+        """Evaluate every setting, write results and print the best one.
+
+        Returns: None
+        """
+        import csv
+        from terminology import Terminology
+        out = os.path.join(self.out)
+        print("Processing domain and reference corpus...")
+        term_obj = Terminology(self._domain(),
+                               self._reference(),
+                               self._reference_candidates(),
+                               cache=self.cache,
+                               workers=self.workers,
+                               backend=self.backend)
+        print("Evaluating {} settings...".format(len(self.alphas)
+                                                 * len(self.thetas)))
+        results = term_obj.evaluate_grid(self.alphas, self.thetas,
+                                         self.golds, workers=self.workers)
+        columns = ["alpha", "theta", "extracted",
+                   "precision", "recall", "f1"]
+        with open(out, "w", encoding="utf-8", newline="") as file:
+            csv_writer = csv.writer(file, delimiter=";")
+            csv_writer.writerow(columns)
+            for result in results:
+                csv_writer.writerow([result[column] for column in columns])
+        print("Success: Results written to '{}'".format(out))
+        best = max(results, key=lambda result: result["f1"])
+        print("Best setting: alpha={} theta={}".format(best["alpha"],
+                                                       best["theta"]))
+        print("Recall: {:.3f}".format(best["recall"]))
+        print("Precision: {:.3f}".format(best["precision"]))
+        print("F1-Score: {:.3f}".format(best["f1"]))
+
+
+class Index(Extract):
+    """
+    A class that counts bigrams of a reference corpus and writes them
+    to an index file, see ReferenceIndex.
+
+    Attributes:
+        corpus (str):
+            Directory with text files. If None, the reuters corpus is used.
+        out (str):
+            Name of the index file.
+        workers (int):
+            Number of processes used for counting.
+        backend (str):
+            How bigrams are stored while counting, "freqdist" or "array".
+        cache (str):
+            Directory where counted corpora are stored.
+            None if no cache should be used.
+    """
+
+    def __init__(self, sysargs):
+        self.args = self._parser(sysargs)
+        self.corpus = self.args.corpus
+        self.out = self.args.out
+        self.workers = self.args.workers
+        self.backend = self.args.backend
+        self.cache = self._cache_dir(self.args)
+        self.reference_index = None
+
+    def _parser(self, sysargs):
+        parser = argparse.ArgumentParser(description="Write an index of "
+                                         "the bigrams of a reference corpus")
+        parser.add_argument("out", help="Name for the index file")
+        parser.add_argument("--corpus",
+                            help="Directory with txt files. Default is "
+                            "the reuters corpus")
+        parser.add_argument("--workers", default=1, type=int,
+                            help="Number of processes used for counting")
+        self._backend_argument(parser)
+        self._cache_arguments(parser)
+        return parser.parse_args(sysargs)
+
+    def run(self):
+        """Count bigrams of the corpus and write the index file.
+
+        Returns: None
+        """
+        from preprocess import Preprocess
+        from refindex import ReferenceIndex
+        out = os.path.join(self.out)
+        corpus = self.corpus
+        if corpus is None:
+            corpus = self._reference()
+        print("Processing corpus...")
+        process = Preprocess(corpus, cache=self.cache, per_file=False,
+                             workers=self.workers, backend=self.backend)
+        ReferenceIndex.write(out, process.bigrams())
+        print("Success: Index written to '{}'".format(out))
+
+
+class Serve(Extract):
+    """
+    A class that keeps domain and reference corpus in memory and answers
+    requests for extracting terminology over HTTP, see TermService.
+
+    Attributes:
+        corpus (str):
+            Directory with text files of the domain.
+        candidates (set):
+            Candidates used if a request doesn't contain any, can be
+            empty.
+        host (str):
+            Address the server listens on.
+        port (int):
+            Port the server listens on.
+        workers (int):
+            Number of processes used for counting.
+        backend (str):
+            How bigrams are stored, "freqdist" or "array".
+        cache (str):
+            Directory where counted corpora are stored.
+            None if no cache should be used.
+        reference_index (str):
+            Index file of the reference corpus or None.
+        verbose (bool):
+            Whether every request is logged.
+    """
+
+    def __init__(self, sysargs):
+        self.args = self._parser(sysargs)
+        self.corpus = self.args.corpus
+        self.candidates = set()
+        if self.args.candidates is not None:
+            self.candidates = self.read_from_file(self.args.candidates)
+        self.host = self.args.host
+        self.port = self.args.port
+        self.workers = self.args.workers
+        self.backend = self.args.backend
+        self.cache = self._cache_dir(self.args)
+        self.reference_index = self.args.reference_index
+        self.verbose = self.args.verbose
+
+    def _parser(self, sysargs):
+        parser = argparse.ArgumentParser(description="Answer requests for "
+                                         "extracting terminology over HTTP")
+        parser.add_argument("corpus",
+                            help="Directory with txt files of the domain")
+        parser.add_argument("--candidates",
+                            help="File with candidates used if a request "
+                            "doesn't contain any")
+        parser.add_argument("--host", default="127.0.0.1",
+                            help="Address the server listens on")
+        parser.add_argument("--port", default=8000, type=int,
+                            help="Port the server listens on")
+        parser.add_argument("--workers", default=1, type=int,
+                            help="Number of processes used for counting")
+        parser.add_argument("--verbose", action="store_true",
+                            help="Log every request")
+        self._backend_argument(parser)
+        self._cache_arguments(parser)
+        self._reference_argument(parser)
+        return parser.parse_args(sysargs)
+
+    def run(self):
+        """Count both corpora and answer requests until interrupted.
+
+        Returns: None
+        """
+        from service import TermService, make_server
+        print("Processing domain and reference corpus...")
+        service = TermService(self.corpus, self._reference(),
+                              self._reference_candidates(), cache=self.cache,
+                              workers=self.workers, backend=self.backend)
+        server = make_server(service, self.host, self.port, self.verbose)
+        print("Serving on http://{}:{}".format(*server.server_address[:2]))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+class Tokenize:
+    """
+    A class that tokenizes a corpus once and stores the tokens,
+    see TokenStore.
+
+    Attributes:
+        corpus (str):
+            Directory with text files.
+        store (str):
+            Directory where the tokens are stored.
+    """
+
+    def __init__(self, sysargs):
+        self.args = self._parser(sysargs)
+        self.corpus = self.args.corpus
+        self.store = self.args.store
+
+    def _parser(self, sysargs):
+        parser = argparse.ArgumentParser(description="Tokenize a corpus "
+                                         "and store it as arrays of word ids")
+        parser.add_argument("corpus",
+                            help="Directory with txt files")
+        parser.add_argument("store",
+                            help="Directory for the tokenized corpus. It "
+                            "can be used instead of the corpus directory "
+                            "by the other commands")
+        return parser.parse_args(sysargs)
+
+    def run(self):
+        """Tokenize the corpus and write the store.
+
+        Returns: None
+        """
+        from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+        from tokenstore import TokenStore
+        print("Tokenizing corpus...")
+        corpus = PlaintextCorpusReader(self.corpus, r".*\.txt")
+        TokenStore.write(self.store, corpus)
+        print("Success: Tokens written to '{}'".format(self.store))
+
+
+class CountShard:
+    """
+    A class that counts the bigrams of a shard of a corpus and writes them
+    to a count file, see sharding.py. Shards can be counted on different
+    hosts and merged with the merge-counts command.
+
+    Attributes:
+        corpus (str):
+            Directory with text files or of a tokenized corpus.
+        out (str):
+            Name of the count file.
+        index (int):
+            Number of the shard, from 0.
+        count (int):
+            Number of shards.
+        by (str):
+            How files are selected, "range" or "hash".
+        backend (str):
+            How bigrams are stored, "freqdist" or "array".
+        prefetch (int):
+            Number of files read ahead while counting.
+        reader (str):
+            How files are tokenized, "nltk" or "fast".
+    """
+
+    def __init__(self, sysargs):
+        self.args = self._parser(sysargs)
+        self.corpus = self.args.corpus
+        self.out = self.args.out
+        self.index, self.count = self.args.shard
+        self.by = self.args.by
+        self.backend = self.args.backend
+        self.prefetch = self.args.prefetch
+        self.reader = self.args.reader
+
+    @staticmethod
+    def _shard(value):
+        """Parses a shard given as <index>/<count>."""
+        try:
+            index, count = (int(number) for number in value.split("/"))
+        except ValueError:
+            raise argparse.ArgumentTypeError("Shard should be given as "
+                                             "<index>/<count>, e.g. 0/4")
+        if not 0 <= index < count:
+            raise argparse.ArgumentTypeError("Index of shard should be "
+                                             "between 0 and count - 1")
+        return index, count
+
+    def _parser(self, sysargs):
+        parser = argparse.ArgumentParser(description="Count bigrams of a "
+                                         "shard of a corpus")
+        parser.add_argument("corpus",
+                            help="Directory with txt files")
+        parser.add_argument("out", help="Name for the count file")
+        parser.add_argument("--shard", type=self._shard, required=True,
+                            help="Shard that is counted as <index>/<count>, "
+                            "e.g. 0/4 for the first of four shards")
+        parser.add_argument("--by", default="range",
+                            choices=["range", "hash"],
+                            help="Select consecutive files or files by a "
+                            "hash of their names. Default is range")
+        Extract._backend_argument(parser)
+        parser.add_argument("--prefetch", default=0, type=int,
+                            help="Number of files read ahead in background "
+                            "threads while counting. Default is 0")
+        Extract._reader_argument(parser)
+        return parser.parse_args(sysargs)
+
+    def run(self):
+        """Count the files of the shard and write the count file.
+
+        Returns: None
+        """
+        from preprocess import _open_corpus, count_shard
+        from sharding import select, write_counts
+        corpus = _open_corpus(self.corpus)
+        fileids = select(corpus.fileids(), self.index, self.count, self.by)
+        print("Counting {} files of shard {}/{}...".format(
+            len(fileids), self.index, self.count))
+        write_counts(self.out, count_shard(corpus, fileids, self.backend,
+                                           self.prefetch,
+                                           reader=self.reader))
+        print("Success: Counts written to '{}'".format(self.out))
+
+
+class MergeCounts:
+    """
+    A class that merges count files of all shards of a corpus into one
+    count file, which can be used with --counts instead of counting the
+    corpus.
+
+    Attributes:
+        out (str):
+            Name of the merged count file.
+        shards (list):
+            Names of the count files of the shards.
+    """
+
+    def __init__(self, sysargs):
+        self.args = self._parser(sysargs)
+        self.out = self.args.out
+        self.shards = self.args.shards
+
+    def _parser(self, sysargs):
+        parser = argparse.ArgumentParser(description="Merge count files "
+                                         "of the shards of a corpus")
+        parser.add_argument("out", help="Name for the merged count file")
+        parser.add_argument("shards", nargs="+",
+                            help="Count files written by count-shard")
+        return parser.parse_args(sysargs)
+
+    def run(self):
+        """Merge the count files and write the merged file.
+
+        Returns: None
+        """
+        from sharding import merge_counts, read_counts, write_counts
+        print("Merging {} shards...".format(len(self.shards)))
+        write_counts(self.out, merge_counts(read_counts(name)
+                                            for name in self.shards))
+        print("Success: Counts written to '{}'".format(self.out))
+
+
+def usage():
+    """Prints information about the commands."""
+    print("Type 'evaluate -h', 'extract -h', 'candidates -h', "
+          "'tune -h', 'index -h', 'tokenize -h', 'serve -h', "
+          "'rescore -h', 'count-shard -h' or 'merge-counts -h' for "
+          "information about commands\n"
+          "Type 'demo' for a demo of commands")
 
 
 def main():
     arg = sys.argv
     if len(arg) < 2:
         raise ValueError("Enter a valid command.")
-    if arg[1] == "extract":
-        Extract(arg[2:]).run()
+    if arg[1] in ("-h", "--help"):
+        usage()
+    elif arg[1] == "extract":
+        run(Extract(arg[2:]))
     elif arg[1] == "evaluate":
-        Evaluate(arg[2:]).run()
+        run(Evaluate(arg[2:]))
     elif arg[1] == "candidates":
-        Candidates(arg[2:]).run()
+        run(Candidates(arg[2:]))
+    elif arg[1] == "tune":
+        run(Tune(arg[2:]))
+    elif arg[1] == "index":
+        run(Index(arg[2:]))
+    elif arg[1] == "tokenize":
+        run(Tokenize(arg[2:]))
+    elif arg[1] == "serve":
+        run(Serve(arg[2:]))
+    elif arg[1] == "rescore":
+        run(Rescore(arg[2:]))
+    elif arg[1] == "count-shard":
+        run(CountShard(arg[2:]))
+    elif arg[1] == "merge-counts":
+        run(MergeCounts(arg[2:]))
     elif arg[1] == "demo":
         demo_candidates = ["--stops", "demo/demo_stops.txt",
                            "--min", "1",
@@ -292,6 +1056,4 @@ if __name__ == "__main__":
         main()
     except (OSError, ValueError) as err:
         print("Failure: {}".format(err))
-        print("Type 'evaluate -h', 'extract -h' "
-              "or 'candidates -h' for information about commands\n"
-              "Type 'demo' for a demo of commands")
+        usage()
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Counts of n-grams of any length, served from one suffix array.
+"""
+import numpy as np
+
+# Marks positions after the end of the corpus, sorts before every word.
+_END = -1
+
+
+class NgramIndex:
+
+    MAX_N = 4
+
+    """
+    A class for counts of n-grams of a corpus up to a maximum length.
+
+    All token ids of the corpus are stored once, file after file. A
+    suffix array sorts the positions of the tokens by the n-grams that
+    start there, so all occurences of an n-gram are one consecutive range
+    of the suffix array, for every n. N-grams sharing a prefix are
+    neighbours and their common prefix is stored once, as the tokens of
+    the corpus. Like bigrams of Preprocess, n-grams spanning the border
+    of two files count for the corpus, but not for a file.
+
+    Attributes:
+        vocabulary (Vocabulary):
+            Vocabulary used to encode words.
+        max_n (int):
+            Length of the longest n-grams.
+
+    Methods:
+        from_files(files, vocabulary, max_n=None):
+            Index a sequence of files.
+        frequent(n, min_count=1, allowed=None, document=None):
+            Get n-grams with a minimum count, most frequent first.
+        frequencies(ngram_list, document=None):
+            Get counts of n-grams in corpus or a file.
+        frequency_matrix(ngram_list, documents=None):
+            Get counts of n-grams in every file as sparse matrix.
+    """
+
+    def __init__(self, ids, offsets, vocabulary, max_n=None):
+        """Construct a NgramIndex instance.
+
+        Args:
+            ids (numpy.ndarray):
+                Ids of the lowercased tokens of all files, file after file.
+            offsets (numpy.ndarray):
+                Start of every file in ids and end of the last file.
+            vocabulary (Vocabulary):
+                Vocabulary used to encode words.
+            max_n (int):
+                Length of the longest n-grams. If default is used, MAX_N
+                is used. Default is None.
+
+        Returns:
+            None.
+        """
+        self.vocabulary = vocabulary
+        self.max_n = max_n or self.MAX_N
+        self._size = len(ids)
+        self._ids = np.concatenate((np.asarray(ids, dtype=np.int32),
+                                    np.full(self.max_n, _END, np.int32)))
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        dtype = np.int32 if self._size < 2 ** 31 else np.int64
+        # lexsort uses its last key first.
+        self._suffixes = np.lexsort([self._ids[j:j + self._size]
+                                     for j in reversed(range(self.max_n))]
+                                    ).astype(dtype)
+        self._common = self._prefix_lengths()
+
+    @classmethod
+    def from_files(cls, files, vocabulary, max_n=None):
+        """Index a sequence of files.
+
+        Args:
+            files:
+                Iterable of arrays of token ids, one for every file.
+            vocabulary (Vocabulary):
+                Vocabulary used to encode words.
+            max_n (int):
+                Length of the longest n-grams, see __init__.
+
+        Returns:
+            NgramIndex
+        """
+        files = [np.asarray(ids, dtype=np.int32) for ids in files]
+        offsets = np.zeros(len(files) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in files], out=offsets[1:])
+        ids = np.concatenate(files or [np.zeros(0, np.int32)])
+        return cls(ids, offsets, vocabulary, max_n)
+
+    def __len__(self):
+        return self._size
+
+    def _window(self, positions, j):
+        """Returns the j-th token of the n-grams starting at positions."""
+        return self._ids[positions + j]
+
+    def _prefix_lengths(self):
+        """Computes the common prefix of neighbours in the suffix array.
+
+        Returns:
+            numpy.ndarray:
+                Number of tokens, at most max_n, that every suffix shares
+                with the previous one. 0 for the first suffix.
+        """
+        common = np.zeros(self._size, dtype=np.uint8)
+        if self._size < 2:
+            return common
+        previous, current = self._suffixes[:-1], self._suffixes[1:]
+        same = np.ones(self._size - 1, dtype=bool)
+        for j in range(self.max_n):
+            same &= (self._window(previous, j) == self._window(current, j))
+            # Tokens after the end of the corpus are never shared.
+            same &= self._window(current, j) != _END
+            common[1:] += same
+        return common
+
+    def _check(self, n):
+        """Raises ValueError if n-grams of length n are not indexed."""
+        if not 1 <= n <= self.max_n:
+            raise ValueError("Only n-grams of length 1 to {} are "
+                             "indexed.".format(self.max_n))
+
+    def _groups(self, n, document=None):
+        """Finds all n-grams of corpus or a file.
+
+        Returns:
+            tuple:
+                Arrays with the position of one occurence of every n-gram
+                and with the counts of the n-grams.
+        """
+        if document is None:
+            starts = np.flatnonzero(self._common < n)
+            counts = np.diff(np.append(starts, self._size))
+            positions = self._suffixes[starts]
+            # N-grams running past the end of the corpus are left out.
+            complete = positions + n <= self._size
+            return positions[complete], counts[complete]
+        # Number of the n-gram of every suffix.
+        groups = np.cumsum(self._common < n) - 1
+        start, end = self._offsets[document], self._offsets[document + 1]
+        inside = (self._suffixes >= start) & (self._suffixes + n <= end)
+        _, first, counts = np.unique(groups[inside], return_index=True,
+                                     return_counts=True)
+        return self._suffixes[inside][first], counts
+
+    def _decode(self, positions, n):
+        """Returns a list of n-grams starting at positions."""
+        words = self.vocabulary.words()
+        columns = [self._window(positions, j).tolist() for j in range(n)]
+        return [tuple(words[i] for i in ngram) for ngram in zip(*columns)]
+
+    def frequent(self, n, min_count=1, allowed=None, document=None):
+        """Get n-grams with a minimum count, most frequent first.
+
+        Args:
+            n (int):
+                Length of the n-grams.
+            min_count (int):
+                Minimum count of returned n-grams. Default is 1.
+            allowed (numpy.ndarray):
+                Boolean array, allowed[i] is True if the word with id i
+                may be part of a returned n-gram. If default is used,
+                all words are allowed.
+            document (int):
+                Position of a file. If default is used, n-grams of the
+                whole corpus are returned. Default is None.
+
+        Raises:
+            ValueError:
+                If n-grams of length n are not indexed.
+
+        Returns:
+            list:
+                (n-gram, count) tuples, n-grams are tuples of strings.
+        """
+        self._check(n)
+        positions, counts = self._groups(n, document)
+        keep = counts >= min_count
+        if allowed is not None:
+            for j in range(n):
+                keep &= allowed[self._window(positions, j)]
+        index = np.flatnonzero(keep)
+        index = index[np.argsort(-counts[index], kind="mergesort")]
+        return list(zip(self._decode(positions[index], n),
+                        counts[index].tolist()))
+
+    def _less(self, positions, query, n, equal):
+        """Compares n-grams at positions with query n-grams.
+
+        Returns:
+            numpy.ndarray:
+                True where the n-gram at a position is smaller than the
+                query, or smaller or equal if equal is True.
+        """
+        result = np.full(len(positions), equal)
+        for j in reversed(range(n)):
+            tokens = self._window(positions, j)
+            result = ((tokens < query[:, j])
+                      | ((tokens == query[:, j]) & result))
+        return result
+
+    def _ranges(self, query, n):
+        """Finds the suffix array ranges of n-grams by binary search.
+
+        All n-grams are searched at once, one step of the search is one
+        vectorized comparison.
+
+        Args:
+            query (numpy.ndarray):
+                Array of token ids with n columns.
+            n (int):
+                Length of the n-grams.
+
+        Returns:
+            tuple:
+                Arrays of starts and ends of ranges in the suffix array.
+        """
+        bounds = []
+        for equal in (False, True):
+            low = np.zeros(len(query), dtype=np.int64)
+            high = np.full(len(query), self._size, dtype=np.int64)
+            while np.any(low < high):
+                middle = (low + high) // 2
+                searching = low < high
+                less = self._less(self._suffixes[np.minimum(middle,
+                                                            self._size - 1)],
+                                  query, n, equal)
+                low = np.where(searching & less, middle + 1, low)
+                high = np.where(searching & ~less, middle, high)
+            bounds.append(low)
+        return bounds[0], bounds[1]
+
+    def _lookup(self, ngram_list):
+        """Finds ranges of n-grams of any length.
+
+        Yields:
+            tuple:
+                Indices into ngram_list of n-grams of one length with
+                known words, n, starts and ends of their ranges.
+        """
+        by_length = dict()
+        for i, ngram in enumerate(ngram_list):
+            by_length.setdefault(len(ngram), []).append(i)
+        for n, indices in sorted(by_length.items()):
+            self._check(n)
+            indices = np.array(indices, dtype=np.int64)
+            words = (word for i in indices.tolist() for word in ngram_list[i])
+            query = self.vocabulary.encode(words, add=False).reshape(-1, n)
+            known = np.all(query >= 0, axis=1)
+            indices, query = indices[known], query[known]
+            if len(indices) == 0 or self._size == 0:
+                continue
+            starts, ends = self._ranges(query, n)
+            yield indices, n, starts, ends
+
+    def frequencies(self, ngram_list, document=None):
+        """Get counts of n-grams of any length.
+
+        Args:
+            ngram_list:
+                Iterable of tuples of strings.
+            document (int):
+                Position of a file. If default is used, counts in the whole
+                corpus are returned. Default is None.
+
+        Raises:
+            ValueError:
+                If n-grams of a length are not indexed.
+
+        Returns:
+            dict:
+                Keys are n-grams that occur, values are counts.
+        """
+        ngram_list = list(ngram_list)
+        if document is not None:
+            rows, _, counts = self.frequency_matrix(ngram_list, [document])
+            return {ngram_list[row]: count
+                    for row, count in zip(rows.tolist(), counts.tolist())}
+        frequency = dict()
+        for indices, _, starts, ends in self._lookup(ngram_list):
+            found = ends > starts
+            counts = (ends - starts)[found]
+            frequency.update(zip((ngram_list[i]
+                                  for i in indices[found].tolist()),
+                                 counts.tolist()))
+        return frequency
+
+    def frequency_matrix(self, ngram_list, documents=None):
+        """Get counts of n-grams in files.
+
+        Args:
+            ngram_list (list):
+                List of tuples of strings, determines the order of rows.
+            documents (list):
+                Positions of files, determines the order of columns. If
+                default is used, all files are used. Default is None.
+
+        Returns:
+            tuple:
+                Three numpy arrays rows, columns and counts, ordered by
+                column, see Preprocess.frequency_matrix.
+        """
+        if documents is None:
+            documents = range(len(self._offsets) - 1)
+        column_of = np.full(len(self._offsets) - 1, -1, dtype=np.int64)
+        column_of[np.asarray(documents, dtype=np.int64)] = np.arange(
+            len(documents))
+        rows, columns = [], []
+        for indices, n, starts, ends in self._lookup(ngram_list):
+            lengths = ends - starts
+            # One entry for every occurence of every n-gram.
+            entry_rows = np.repeat(indices, lengths)
+            within = (np.arange(lengths.sum())
+                      - np.repeat(np.cumsum(lengths) - lengths, lengths))
+            positions = self._suffixes[np.repeat(starts, lengths) + within]
+            document = np.searchsorted(self._offsets, positions,
+                                       side="right") - 1
+            # Occurences spanning the border to the next file are left out.
+            inside = positions + n <= self._offsets[document + 1]
+            column = column_of[document]
+            keep = inside & (column >= 0)
+            rows.append(entry_rows[keep])
+            columns.append(column[keep])
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy(), empty.copy()
+        rows = np.concatenate(rows)
+        columns = np.concatenate(columns)
+        # Count equal entries, ordered by column and row.
+        keys = columns * max(1, len(ngram_list)) + rows
+        keys, counts = np.unique(keys, return_counts=True)
+        columns, rows = np.divmod(keys, max(1, len(ngram_list)))
+        return rows, columns, counts.astype(np.int64)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Process pools that share objects with their workers.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Objects shared with the current worker process.
+_SHARED = dict()
+
+
+def _share(objects):
+    """Initializer of worker processes, stores shared objects."""
+    _SHARED.clear()
+    _SHARED.update(objects)
+
+
+def shared(name):
+    """Returns an object that was shared with the worker processes."""
+    return _SHARED[name]
+
+
+def shards(items, count):
+    """Splits a list into at most count contiguous, equally sized shards.
+
+    Args:
+        items (list):
+            List that should be split.
+        count (int):
+            Maximum number of shards.
+
+    Returns:
+        list:
+            Lists of consecutive items. Concatenating the shards gives
+            items again.
+    """
+    size = max(1, -(-len(items) // max(1, count)))
+    return [items[i:i+size] for i in range(0, len(items), size)]
+
+
+def process_pool(workers, **objects):
+    """Create a pool of processes that share some objects.
+
+    Where possible, worker processes are forked, so shared objects are
+    inherited instead of pickled once per worker. Some nltk objects, like
+    corpus readers with lazily loaded tokenizers, can't be unpickled.
+
+    Args:
+        workers (int):
+            Number of processes.
+        **objects:
+            Objects that can be accessed in the workers with shared().
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    return ProcessPoolExecutor(workers,
+                               mp_context=context,
+                               initializer=_share,
+                               initargs=(objects,))
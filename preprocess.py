@@ -5,13 +5,318 @@
 Choose candidates for terminolgy extraction
 and do some preprocessing.
 """
+import contextlib
 import os
+from bisect import insort
+from collections import Counter
 
-from nltk import bigrams
+import numpy as np
 from nltk import pos_tag
 from nltk.corpus.reader.plaintext import PlaintextCorpusReader
 from nltk.probability import FreqDist
 
+from bigramtable import BigramTable, TableBuilder, Vocabulary, pack
+from cache import CountCache, LRUDict, fingerprint
+from fastreader import FastReader
+from ngrams import NgramIndex
+from parallel import process_pool, shared, shards
+from profiling import stage
+from readahead import ReadAhead
+from sharding import VERSION, borders, read_counts
+from sketch import SketchBuilder, SketchTable
+from tagging import BigramTagger
+from tokenstore import TokenStore
+
+
+def _lowered_words(corpus, fileid):
+    """Returns iterable of the lowercased tokens of a file.
+
+    A FastReader lowercases whole blocks of text, otherwise tokens are
+    lowercased one by one.
+    """
+    if hasattr(corpus, "lowered_words"):
+        return corpus.lowered_words(fileid)
+    return map(str.lower, corpus.words(fileid))
+
+
+def _lowered_bigrams(words, edges):
+    """Yields bigrams of lowercased words one by one.
+
+    Only the previous word is kept, so words can be a lazy corpus view
+    that is never held in memory as a whole.
+
+    Args:
+        words:
+            Iterable of strings.
+        edges (list):
+            First and last word are appended to this list, None if
+            words is empty.
+    """
+    words = map(str.lower, words)
+    previous = next(words, None)
+    edges.append(previous)
+    for word in words:
+        yield previous, word
+        previous = word
+    edges.append(previous)
+
+
+def _lowered_ids(corpus, fileid, vocabulary):
+    """Returns array of ids of the lowercased tokens of a file."""
+    if isinstance(corpus, TokenStore):
+        return corpus.lowered_ids(fileid, vocabulary)
+    return vocabulary.encode(_lowered_words(corpus, fileid))
+
+
+def _reader(corpus, fileids, prefetch=0, memory=None):
+    """Returns a context manager giving corpus or a ReadAhead of it.
+
+    Files are read ahead if prefetch is above 0 and the corpus is a
+    plaintext corpus, see ReadAhead.
+    """
+    if prefetch and ReadAhead.supports(corpus):
+        return ReadAhead(corpus, fileids, prefetch, memory)
+    return contextlib.nullcontext(corpus)
+
+
+def _count_file(corpus, fileid, vocabulary=None):
+    """Counts bigrams in a single file, case insensitive.
+
+    Words are streamed from the corpus, see _lowered_bigrams, or taken
+    from a FastReader. If a vocabulary is given, words are encoded as ids
+    and counted in a BigramTable instead. Files of a TokenStore are
+    counted from their stored ids, see _count_stored.
+
+    Returns:
+        tuple:
+            FreqDist or BigramTable of bigrams, first and last word of file.
+            Words are None if file is empty.
+    """
+    if isinstance(corpus, TokenStore):
+        return _count_stored(corpus, fileid, vocabulary)
+    if vocabulary is not None:
+        ids = vocabulary.encode(_lowered_words(corpus, fileid))
+        if len(ids) == 0:
+            return BigramTable.empty(vocabulary), None, None
+        return (BigramTable.from_ids(ids, vocabulary),
+                vocabulary.word(ids[0]),
+                vocabulary.word(ids[-1]))
+    if hasattr(corpus, "lowered_words"):
+        # Words of a FastReader are lowercased and in memory already.
+        words = corpus.lowered_words(fileid)
+        if not words:
+            return FreqDist(), None, None
+        counts = Counter(zip(words, words[1:]))
+        return FreqDist(counts), words[0], words[-1]
+    edges = []
+    # Counting with a Counter is faster, FreqDist overrides __setitem__.
+    counts = Counter(_lowered_bigrams(corpus.words(fileid), edges))
+    first, last = edges
+    return FreqDist(counts), first, last
+
+
+def _count_stored(store, fileid, vocabulary=None):
+    """Counts bigrams in a file of a TokenStore, see _count_file.
+
+    Ids of lowercased words are read from the store, nothing is
+    tokenized or lowercased again.
+    """
+    ids = store.lowered_ids(fileid, vocabulary)
+    table_vocabulary = vocabulary or store.vocabulary
+    if len(ids) == 0:
+        if vocabulary is None:
+            return FreqDist(), None, None
+        return BigramTable.empty(vocabulary), None, None
+    bigrams_file = BigramTable.from_ids(ids, table_vocabulary)
+    first = table_vocabulary.word(ids[0])
+    last = table_vocabulary.word(ids[-1])
+    if vocabulary is None:
+        bigrams_file = FreqDist(dict(bigrams_file.items()))
+    return bigrams_file, first, last
+
+
+def _count_shard(corpus, fileids, files=None, vocabulary=None, edges=None,
+                 counts=None):
+    """Counts bigrams in consecutive files of a corpus.
+
+    Args:
+        corpus:
+            A nltk corpus object.
+        fileids (list):
+            Ids of consecutive files in corpus.
+        files:
+            A dict where bigrams of each file are stored. If None,
+            bigrams of files aren't kept. Default is None.
+        vocabulary (Vocabulary):
+            If given, bigrams are counted in BigramTables.
+            Default is None.
+        edges (dict):
+            If given, first and last word of each file are stored in it.
+            Default is None.
+        counts:
+            A builder with update(bigrams) and table() that sums up
+            bigrams of files, e.g. a SketchBuilder. If default is used,
+            a FreqDist or TableBuilder is used. Default is None.
+
+    Returns:
+        tuple:
+            FreqDist or BigramTable of bigrams in all files, including
+            bigrams spanning the border between two files, first and last
+            word of the files. Words are None if all files are empty.
+    """
+    if counts is None:
+        if vocabulary is None:
+            counts = FreqDist()
+        else:
+            counts = TableBuilder(vocabulary)
+    first = last = None
+    for fileid in fileids:
+        file_bigrams, file_first, file_last = _count_file(corpus, fileid,
+                                                          vocabulary)
+        if files is not None:
+            files[fileid] = file_bigrams
+        if edges is not None:
+            edges[fileid] = (file_first, file_last)
+        counts.update(file_bigrams)
+        if file_first is not None:
+            if last is None:
+                first = file_first
+            else:
+                counts.update({(last, file_first): 1})
+            last = file_last
+    if hasattr(counts, "table"):
+        counts = counts.table()
+    return counts, first, last
+
+
+def _open_corpus(corpus):
+    """Returns a directory of text files or of a TokenStore as corpus,
+    other corpora as they are."""
+    if isinstance(corpus, str):
+        if TokenStore.is_store(corpus):
+            return TokenStore(corpus)
+        # Convert directory to Plaintext Corpus.
+        return PlaintextCorpusReader(corpus, r".*\.txt")
+    return corpus
+
+
+def _encoding(corpus, fileids):
+    """Returns the encoding of a plaintext corpus for a reader over
+    fileids.
+
+    An encoding given for every file is kept, files that aren't in the
+    corpus get the default encoding of PlaintextCorpusReader.
+    """
+    encoding = corpus._encoding
+    if isinstance(encoding, dict):
+        return {fileid: encoding.get(fileid, "utf8") for fileid in fileids}
+    return encoding
+
+
+def _with_fileids(corpus, fileids):
+    """Returns a new corpus over fileids, read like corpus.
+
+    Raises:
+        ValueError:
+            If corpus isn't a plaintext corpus or a TokenStore, other
+            corpora have no way of changing their files.
+    """
+    if isinstance(corpus, TokenStore):
+        return corpus.subset(fileids)
+    if isinstance(corpus, PlaintextCorpusReader):
+        return PlaintextCorpusReader(
+            corpus.root, list(fileids),
+            word_tokenizer=corpus._word_tokenizer,
+            sent_tokenizer=corpus._sent_tokenizer,
+            para_block_reader=corpus._para_block_reader,
+            encoding=_encoding(corpus, fileids))
+    raise ValueError("Files can only be added to or removed from plaintext "
+                     "corpora and token stores.")
+
+
+def count_shard(corpus, fileids, backend="freqdist", prefetch=0,
+                prefetch_memory=None, reader="nltk"):
+    """Counts bigrams of some files of a corpus for a count file.
+
+    Args:
+        corpus:
+            A corpus, see Preprocess.
+        fileids (list):
+            Ids of the files of the shard, see sharding.select.
+        backend (str):
+            "freqdist" or "array", see Preprocess. Default is "freqdist".
+        prefetch (int):
+            Number of files read ahead, see Preprocess. Default is 0.
+        prefetch_memory (int):
+            Bytes of files read ahead, see Preprocess. Default is None.
+        reader (str):
+            How files are tokenized, see Preprocess. Default is "nltk".
+
+    Raises:
+        ValueError:
+            If backend can't be used for shards.
+
+    Returns:
+        dict:
+            Counts of the shard, see sharding.read_counts.
+    """
+    if backend not in ("freqdist", "array"):
+        raise ValueError("Shards are counted with backend freqdist or "
+                         "array.")
+    corpus = _open_corpus(corpus)
+    vocabulary = None
+    total = FreqDist()
+    if backend == "array":
+        vocabulary = Vocabulary()
+        total = TableBuilder(vocabulary)
+    files, edges, tokens = dict(), dict(), dict()
+    if reader == "fast" and FastReader.supports(corpus):
+        opened = contextlib.nullcontext(FastReader(corpus))
+    else:
+        opened = _reader(corpus, fileids, prefetch, prefetch_memory)
+    with opened as source:
+        for fileid in fileids:
+            bigrams_file, first, last = _count_file(source, fileid,
+                                                    vocabulary)
+            files[fileid] = bigrams_file
+            edges[fileid] = (first, last)
+            tokens[fileid] = bigrams_file.N() + (first is not None)
+            total.update(bigrams_file)
+    if vocabulary is not None:
+        total = total.table()
+    return {"version": VERSION,
+            "backend": backend,
+            "corpus": list(corpus.fileids()),
+            "fileids": list(fileids),
+            "shards": 0,
+            "bigrams": total,
+            "files": files,
+            "edges": edges,
+            "tokens": tokens}
+
+
+def _count_shard_shared(fileids):
+    """Like _count_shard, with corpus shared by the pool.
+
+    Every process encodes words with its own vocabulary.
+
+    Returns:
+        tuple:
+            dict with bigrams of each file (or None), followed by the
+            values returned by _count_shard, the vocabulary (or None) and
+            a dict with first and last word of each file.
+    """
+    files = dict() if shared("keep_files") else None
+    vocabulary = None
+    if shared("backend") == "array":
+        vocabulary = Vocabulary()
+    edges = dict()
+    with _reader(shared("corpus"), fileids, shared("prefetch"),
+                 shared("prefetch_memory")) as corpus:
+        counts, first, last = _count_shard(corpus, fileids, files,
+                                           vocabulary, edges)
+    return files, counts, first, last, vocabulary, edges
+
 
 class Preprocess:
 
@@ -19,53 +324,347 @@ class Preprocess:
 
     """
     A class that does some processing of a corpus. A corpus can be
-    an nltk corpus or directory of text files.
+    an nltk corpus, a directory of text files or a TokenStore.
 
     Attributes:
         corpus: A nltk corpus object.
+        cache: A CountCache object or None.
+        per_file: Whether bigrams of files are kept in memory.
+        workers: Number of processes used for counting and tagging.
+        backend: How bigrams are stored, "freqdist", "array" or "sketch".
+        memory: Number of bytes for counting if backend is "sketch".
+        prefetch: Number of files read ahead while counting.
+        prefetch_memory: Number of bytes of files read ahead.
+        reader: How files are tokenized, "nltk" or "fast".
+        vocabulary: A Vocabulary object if backend is "array" or "sketch",
+            else None.
 
     Methods:
         corpus_stats:
             Prints some infos about given corpus.
         is_lexical(word_i, word_j):
             Check if both words are alphabetical.
-        candidates(self, min_count=4, stops=None, tags={"NN", "NNP", "NNS"}):
+        candidates(self, min_count=4, stops=None, tags={"NN", "NNP", "NNS"},
+                   context=False, workers=None, exact=False, n=2):
             Get set of possible bigrams for terminology extraction.
         get_frequency(bigram_list, fileid=None):
-            Get frequency of bigrams in bigram list in corpus or file.
+            Get frequency of n-grams in list in corpus or file.
+        frequency_matrix(terms, fileids=None):
+            Get frequency of n-grams in every file as sparse matrix.
+        ngram_index(max_n=None):
+            Index of n-grams of any length.
+        ngrams(n, fileid=None):
+            N-grams with frequency in whole corpus or file.
+        exact_frequency(bigram_list):
+            Count bigrams exactly in a second pass over the corpus.
         bigrams(fileid=None):
             Bigrams with frequency in whole corpus or file.
+        fileids():
+            Ids of files in corpus.
+        fingerprint():
+            Digest that changes whenever the corpus changes.
+        add_documents(fileids):
+            Count new files and add them to the corpus.
+        remove_documents(fileids):
+            Remove files and their bigrams from the corpus.
     """
 
-    def __init__(self, corpus):
+    BACKENDS = ("freqdist", "array", "sketch")
+    READERS = ("nltk", "fast")
+    # Default number of bytes for counting with backend "sketch".
+    MEMORY = 256 * 1024 ** 2
+
+    def __init__(self, corpus, cache=None, per_file=True, workers=1,
+                 backend="freqdist", memory=None, prefetch=0,
+                 prefetch_memory=None, counts_file=None, reader="nltk"):
         """
         Constructs a preprocess instance.
 
         Args:
             corpus:
-                Should either be the name of a directory with text files
-                or a nltk corpus.
+                Should either be the name of a directory with text files,
+                a nltk corpus, a TokenStore or the directory of one.
+            cache:
+                A CountCache object or the name of a directory for one.
+                If the corpus didn't change since it was counted last,
+                bigrams are loaded from the cache instead of being counted
+                again. Default is None, no cache is used.
+            per_file:
+                Determines which bigrams of single files are kept in
+                memory after counting. If True, bigrams of all files are
+                kept. If an integer, bigrams of at most that many recently
+                used files are kept. If False, bigrams of files are counted
+                again whenever they are needed. Only files whose bigrams
+                are kept can be removed, see remove_documents.
+                Default is True.
+            workers (int):
+                Number of processes used for counting and tagging.
+                Files are split into consecutive shards that are counted
+                in parallel. The result is the same as with one process.
+                Default is 1.
+            backend (str):
+                If "freqdist", bigrams are counted in nltk FreqDists.
+                If "array", words are mapped to integer ids and bigrams are
+                counted in BigramTables, which need much less memory.
+                If "sketch", counts are estimated in bounded memory, see
+                SketchTable. Only bigrams with the highest counts can be
+                iterated, candidates are found among them. Files are
+                counted in one process and per_file is ignored, bigrams of
+                files are counted again whenever they are needed.
+                Default is "freqdist".
+            memory (int):
+                Number of bytes for counting if backend is "sketch",
+                see SketchBuilder. If default is used, Preprocess.MEMORY
+                is used. Default is None.
+            prefetch (int):
+                Number of files that are read ahead in background threads
+                while a file is counted, see ReadAhead. Only files of
+                plaintext corpora are read ahead. Counts are the same.
+                Default is 0, files are read when they are counted.
+            prefetch_memory (int):
+                Maximum number of bytes of files that were read ahead and
+                not yet counted. If default is used, ReadAhead.MEMORY is
+                used. Default is None.
+            counts_file (str):
+                Name of a count file of merged shards of the corpus, see
+                sharding.merge_counts. Bigrams are loaded from it instead
+                of counting the corpus, backend is the backend of the
+                shards. Default is None.
+            reader (str):
+                If "nltk", files are tokenized by the corpus reader. If
+                "fast", files of a plaintext corpus are tokenized in large
+                blocks by a FastReader, which gives the same tokens.
+                Files aren't read ahead then. Default is "nltk".
+
+        Raises:
+            ValueError:
+                If backend or reader is unknown or the count file isn't
+                of the merged files of the corpus.
 
         Returns:
             None.
         """
-        if isinstance(corpus, str):
-            # Convert directory to Plaintext Corpus.
-            corpus = PlaintextCorpusReader(corpus, r".*\.txt")
-        self.corpus = corpus
+        counted = None
+        if counts_file is not None:
+            counted = read_counts(counts_file)
+            backend = counted["backend"]
+        if backend not in self.BACKENDS:
+            raise ValueError("Backend should be one of {}".format(
+                ", ".join(self.BACKENDS)))
+        if reader not in self.READERS:
+            raise ValueError("Reader should be one of {}".format(
+                ", ".join(self.READERS)))
+        corpus = _open_corpus(corpus)
+        if isinstance(cache, str):
+            cache = CountCache(cache)
+        self.cache = cache
+        if backend == "sketch":
+            per_file = False
+        self.per_file = per_file
+        self.workers = max(1, workers)
+        self.backend = backend
+        self.memory = memory or self.MEMORY
+        self.prefetch = max(0, prefetch)
+        self.prefetch_memory = prefetch_memory
+        self.reader = reader
+        self._set_corpus(corpus)
+        self.vocabulary = None
+        if backend != "freqdist":
+            self.vocabulary = Vocabulary()
+        self._fileids = list(corpus.fileids())
+        # Set for fast membership tests.
+        self._fileid_set = set(self._fileids)
         self._bigrams = FreqDist()
-        self._count()
+        self._file_bigrams = self._file_table()
+        # First and last word of every file.
+        self._edges = dict()
+        # Built on first use, see ngram_index.
+        self._ngram_index = None
+        self._documents = dict()
+        with stage("Preprocess.count") as counts:
+            counts["corpus"] = str(getattr(corpus, "root", corpus))
+            counts["cached"] = self._load(counted)
+            if not counts["cached"]:
+                self._count()
+                self._save()
+            counts["documents"] = len(self._fileids)
+            counts["bigram_types"] = len(self._bigrams)
+            # Bigrams span every pair of consecutive tokens.
+            counts["tokens"] = self._bigrams.N() + any(
+                first is not None for first, _ in self._edges.values())
+
+    def _file_table(self):
+        """Returns an empty container for bigrams of files."""
+        if self.per_file is True:
+            return dict()
+        if self.per_file:
+            return LRUDict(self.per_file)
+        return None
+
+    def _tokenizer(self, corpus):
+        """Returns the object that tokenizes files of corpus for counting,
+        see reader."""
+        if self.reader == "fast" and FastReader.supports(corpus):
+            return FastReader(corpus)
+        return corpus
+
+    def _set_corpus(self, corpus):
+        """Sets the corpus and the object that tokenizes its files."""
+        self.corpus = corpus
+        # Tokenizes files for counting, the corpus itself is kept for
+        # everything else.
+        self._words = self._tokenizer(corpus)
+
+    def _reader(self, fileids, corpus=None):
+        """Returns a context manager giving the corpus for counting,
+        reading fileids ahead, see _reader. Files are read from corpus
+        if it's given, else from self.corpus."""
+        if corpus is None:
+            corpus, words = self.corpus, self._words
+        else:
+            words = self._tokenizer(corpus)
+        if words is not corpus:
+            return contextlib.nullcontext(words)
+        return _reader(corpus, fileids, self.prefetch, self.prefetch_memory)
+
+    def _settings(self):
+        """Returns settings that change the counts of the corpus."""
+        settings = {"lowercase": True, "backend": self.backend}
+        if self.backend == "sketch":
+            settings["memory"] = self.memory
+        return settings
+
+    def _cache_key(self):
+        """Key of the corpus in the cache, None if there is no cache."""
+        if self.cache is None:
+            return None
+        return self.cache.key(self.corpus, files=self.per_file is True,
+                              **self._settings())
+
+    def fingerprint(self):
+        """Get a digest of the files of the corpus and settings of counting.
+
+        The digest changes whenever a file changes or files are added or
+        removed, see cache.fingerprint.
+
+        Returns:
+            str:
+                Hexadecimal digest or None if the corpus can't be
+                fingerprinted.
+        """
+        return fingerprint(self.corpus, **self._settings())
+
+    def _load(self, counted=None):
+        """Loads counted bigrams from a count file or the cache.
+
+        Args:
+            counted (dict):
+                Counts read from a count file, see sharding.read_counts.
+                If default is used, bigrams are loaded from the cache.
+
+        Raises:
+            ValueError:
+                If counted isn't of the merged files of the corpus.
+
+        Returns:
+            bool:
+                True if bigrams were loaded, False otherwise.
+        """
+        state = counted
+        if counted is not None:
+            if not counted["shards"] or counted["fileids"] != self._fileids:
+                raise ValueError("Count file should be of the merged shards "
+                                 "of all files of the corpus.")
+        elif self.cache is not None:
+            state = self.cache.load(self._cache_key())
+        if state is None:
+            return False
+        self._bigrams = state["bigrams"]
+        if self.vocabulary is not None:
+            self.vocabulary = self._bigrams.vocabulary
+        if self.per_file is True:
+            self._file_bigrams = state["files"]
+        self._edges = state["edges"]
+        return True
+
+    def _save(self):
+        """Stores counted bigrams in the cache, if there is one."""
+        if self.cache is not None:
+            files = None
+            if self.per_file is True:
+                files = self._file_bigrams
+            self.cache.save(self._cache_key(),
+                            {"bigrams": self._bigrams,
+                             "files": files,
+                             "edges": self._edges})
 
     def _count(self):
         """Counts occurences of bigrams in corpus, case insensitive.
 
+        Every file is read once. Bigrams are counted for each file and
+        added to the counts of the whole corpus, including the bigram
+        spanning the border between two consecutive files. Bigrams of
+        files are kept according to self.per_file.
+
+        With more than one worker, consecutive shards of files are counted
+        in separate processes and merged in order, adding the bigrams
+        spanning the borders between shards.
+
         Returns:
             None.
         """
-        words = [word.lower() for word in self.corpus.words()]
-        bigrams_words = bigrams(words)
-        for bigram in bigrams_words:
-            self._bigrams[bigram] += 1
+        if self.backend == "sketch":
+            builder = SketchBuilder(self.vocabulary, self.memory)
+            with self._reader(self._fileids) as corpus:
+                self._bigrams, _, _ = _count_shard(corpus,
+                                                   self._fileids,
+                                                   vocabulary=self.vocabulary,
+                                                   edges=self._edges,
+                                                   counts=builder)
+            return
+        if self.workers == 1 or len(self._fileids) < 2:
+            with self._reader(self._fileids) as corpus:
+                self._bigrams, _, _ = _count_shard(corpus,
+                                                   self._fileids,
+                                                   self._file_bigrams,
+                                                   self.vocabulary,
+                                                   self._edges)
+            return
+        # More shards than workers, so slow shards don't stall the pool.
+        shard_list = shards(self._fileids, 4 * self.workers)
+        if self.vocabulary is None:
+            total = FreqDist()
+        else:
+            total = TableBuilder(self.vocabulary)
+        last = None
+        with process_pool(self.workers,
+                          corpus=self._words,
+                          keep_files=self.per_file is True,
+                          backend=self.backend,
+                          prefetch=self.prefetch,
+                          prefetch_memory=self.prefetch_memory) as pool:
+            for (files, counts, first, shard_last,
+                 vocabulary, edges) in pool.map(_count_shard_shared,
+                                                shard_list):
+                self._edges.update(edges)
+                if vocabulary is not None:
+                    # Translate ids of the worker to own vocabulary.
+                    mapping = self.vocabulary.encode(vocabulary.words())
+                    counts = counts.remap(mapping, self.vocabulary)
+                    if files is not None:
+                        files = {fileid: table.remap(mapping,
+                                                     self.vocabulary)
+                                 for fileid, table in files.items()}
+                if files is not None:
+                    self._file_bigrams.update(files)
+                total.update(counts)
+                if first is not None:
+                    if last is not None:
+                        total.update({(last, first): 1})
+                    last = shard_last
+        if self.vocabulary is not None:
+            total = total.table()
+        self._bigrams = total
 
     def corpus_stats(self):
         """Prints no of sentences, types and token in the corpus."""
@@ -114,7 +713,8 @@ class Preprocess:
             return True
         return False
 
-    def candidates(self, min_count, stops=None, tags={"NN", "NNS", "NNP"}):
+    def candidates(self, min_count, stops=None, tags={"NN", "NNS", "NNP"},
+                   context=False, workers=None, exact=False, n=2):
         """
         Generate a list of possible candidates for terminology extraction.
 
@@ -123,43 +723,132 @@ class Preprocess:
         doesn't contain tokens in stopword list and consists
         of at least one relevant tag.
 
+        Bigrams that pass all other filters are tagged together in
+        batches, see BigramTagger.
+
         Args:
             min_count (int):
                 Minimum frequency a bigram has to have to be considered a
                 candidate. Absolute frequency are used.
-            stops (list):
-                List of strings. If a bigram contains a word of that list, it
+            stops:
+                Iterable of strings. If a bigram contains one of them, it
                 is not considered a candidate. If default is used,
-                an empty list is used. Default is None.
+                no stopwords are used. Default is None.
+            tags:
+                Iterable of strings, representing valid tags
+                used by Penn Treebank. If empty, no tagging is used.
+            context (bool):
+                If True, bigrams are tagged in the sentences they occur in.
+                If False, every bigram is tagged on its own, which gives
+                the same tags as has_relevant_tag. Default is False.
+            workers (int):
+                Number of processes used for tagging. If default is used,
+                self.workers is used. Default is None.
+            exact (bool):
+                Only used if backend is "sketch". If True, bigrams that
+                pass the filters are counted again exactly before tagging,
+                see exact_frequency, and bigrams whose exact count is below
+                min_count are left out. If False, estimated counts are
+                used, which can only be too high. Default is False.
+            n:
+                Length of candidates, an integer or an iterable of
+                integers for candidates of mixed length. Bigrams are taken
+                from the counted bigrams, n-grams of other lengths from
+                the n-gram index, see ngram_index. Default is 2.
 
         Returns:
             set:
-                set of tuples containing two strings.
+                set of tuples of strings.
         """
-        if stops is None:
-            stops = []
-        candidates = set()
-        for word_i, word_j in self.bigrams():
-            # Filter out bigrams with stopwords.
-            if word_i not in stops and word_j not in stops:
-                # Make sure bigrams are alphabetical.
-                if self.is_lexical(word_i, word_j):
-                    # Filter out infrequent bigrams.
-                    if self.bigrams()[word_i, word_j] >= min_count:
-                        if self.has_relevant_tag((word_i, word_j), tags):
-                            candidates.add((word_i, word_j))
-        return candidates
+        stops = frozenset(stops or ())
+        with stage("Preprocess.candidates") as counts:
+            counts["bigram_types"] = len(self.bigrams())
+            filtered = []
+            for length in sorted({n} if isinstance(n, int) else set(n)):
+                if length == 2:
+                    frequent = self._frequent(min_count, stops)
+                else:
+                    frequent = self._frequent_ngrams(length, min_count,
+                                                     stops)
+                filtered.extend(ngram for ngram, _ in frequent)
+            if exact and self.backend == "sketch":
+                frequency = self.exact_frequency([ngram for ngram in filtered
+                                                  if len(ngram) == 2])
+                filtered = [ngram for ngram in filtered
+                            if len(ngram) != 2
+                            or frequency.get(ngram, 0) >= min_count]
+            counts["filtered"] = len(filtered)
+            relevant = set(tags)
+            if relevant:
+                if workers is None:
+                    workers = self.workers
+                tagger = BigramTagger(context=context, workers=workers)
+                tagged = tagger.tag(filtered, corpus=self.corpus)
+                filtered = [bigram for bigram in filtered
+                            if relevant.intersection(tagged.get(bigram, ()))]
+            counts["candidates"] = len(filtered)
+        return set(filtered)
+
+    def _frequent(self, min_count, stops):
+        """Get bigrams of corpus that pass all filters but tagging.
+
+        The cutoff by frequency is checked first. Whether a word is
+        alphabetical and not a stopword is checked once per word, not
+        once per bigram.
+
+        Args:
+            min_count (int):
+                Minimum frequency of bigrams.
+            stops (frozenset):
+                Set of stopwords.
+
+        Returns:
+            list:
+                (bigram, count) tuples, most frequent first.
+        """
+        if self.vocabulary is not None:
+            allowed = self._allowed(self.vocabulary, stops)
+            return self._bigrams.frequent(min_count, allowed)
+        allowed = dict()
+        frequent = []
+        for bigram, count in self._bigrams.items():
+            if count < min_count:
+                continue
+            for word in bigram:
+                if word not in allowed:
+                    allowed[word] = word.isalpha() and word not in stops
+            if allowed[bigram[0]] and allowed[bigram[1]]:
+                frequent.append((bigram, count))
+        frequent.sort(key=lambda item: item[1], reverse=True)
+        return frequent
+
+    @staticmethod
+    def _allowed(vocabulary, stops):
+        """Returns boolean array, True for ids of alphabetical words that
+        are not stopwords."""
+        words = vocabulary.words()
+        return np.fromiter((word.isalpha() and word not in stops
+                            for word in words),
+                           dtype=bool, count=len(words))
+
+    def _frequent_ngrams(self, n, min_count, stops):
+        """Like _frequent, for n-grams of the n-gram index."""
+        index = self.ngram_index(n)
+        return index.frequent(n, min_count,
+                              self._allowed(index.vocabulary, stops))
 
     def get_frequency(self, bigram_list, fileid=None):
-        """Get the frequency of a list of bigrams
+        """Get the frequency of a list of n-grams
 
         Either get frequency for the whole corpus or for
-        a specific file. Bigrams that don't occur in corpus/file
-        are not keys in returned dictionaries.
+        a specific file. N-grams that don't occur in corpus/file
+        are not keys in returned dictionaries. Bigrams are looked up
+        in the counted bigrams, n-grams of other lengths in the n-gram
+        index.
 
         Args:
             bigram_list (list):
-                List with two-tuples of strings
+                List with tuples of strings, usually two-tuples.
             fileid (str):
                 Id of file in corpus. If default is used, gets frequency
                 in whole corpus. Default is None.
@@ -169,19 +858,225 @@ class Preprocess:
                 Keys are tuples of strings, values are frequencies in
                 file/corpus (int)
         """
+        bigram_list = list(bigram_list)
+        ngram_list = [ngram for ngram in bigram_list if len(ngram) != 2]
+        if ngram_list:
+            bigram_list = [ngram for ngram in bigram_list if len(ngram) == 2]
         freq = self.bigrams(fileid)
-        return {bigr: freq[bigr] for bigr in bigram_list if bigr in freq}
+        if isinstance(freq, (BigramTable, SketchTable)):
+            frequency = freq.frequencies(bigram_list)
+        else:
+            frequency = {bigr: freq[bigr] for bigr in bigram_list
+                         if bigr in freq}
+        if ngram_list:
+            index = self.ngram_index(max(map(len, ngram_list)))
+            document = None
+            if fileid is not None:
+                document = self._documents[fileid]
+            frequency.update(index.frequencies(ngram_list, document))
+        return frequency
+
+    def exact_frequency(self, bigram_list):
+        """Get the exact frequency of bigrams in the whole corpus.
+
+        If backend is "sketch", every file is counted again and only
+        the given bigrams are kept, so memory depends on the number of
+        bigrams and the size of a file. Otherwise the same as
+        get_frequency.
+
+        Args:
+            bigram_list (list):
+                List with two-tuples of strings.
+
+        Returns:
+            dict:
+                Keys are bigrams that occur in corpus, values are
+                frequencies (int).
+        """
+        if self.backend != "sketch":
+            return self.get_frequency(bigram_list)
+        bigram_list = list(bigram_list)
+        rows, _, counts = self.frequency_matrix(bigram_list)
+        totals = np.bincount(rows, weights=counts,
+                             minlength=len(bigram_list)).astype(np.int64)
+        frequency = {bigram_list[row]: int(totals[row])
+                     for row in np.flatnonzero(totals).tolist()}
+        # Bigrams spanning the borders between files.
+        wanted = set(bigram_list)
+        for bigram, count in self._borders().items():
+            if count and bigram in wanted:
+                frequency[bigram] = frequency.get(bigram, 0) + count
+        return frequency
+
+    def frequency_matrix(self, terms, fileids=None):
+        """Get the frequency of n-grams in every file of corpus.
+
+        The frequencies form a sparse matrix with one row for every term
+        and one column for every file. Only entries that aren't zero are
+        returned, ordered by file. Bigrams are looked up in the bigrams
+        of files, n-grams of other lengths in the n-gram index.
+
+        Args:
+            terms (list):
+                List with tuples of strings, usually two-tuples,
+                determines the order of rows.
+            fileids (list):
+                Ids of files in corpus, determines the order of columns.
+                If default is used, self.fileids() is used. Default is None.
+
+        Returns:
+            tuple:
+                Three numpy arrays rows, columns and counts. counts[i] is
+                the frequency of terms[rows[i]] in file
+                fileids[columns[i]].
+        """
+        if fileids is None:
+            fileids = self._fileids
+        others = [row for row, term in enumerate(terms) if len(term) != 2]
+        if not others:
+            return self._bigram_matrix(terms, fileids)
+        index = self.ngram_index(max(len(terms[row]) for row in others))
+        rows, columns, counts = index.frequency_matrix(
+            [terms[row] for row in others],
+            [self._documents[fileid] for fileid in fileids])
+        rows = np.asarray(others, dtype=np.int64)[rows]
+        pairs = [row for row, term in enumerate(terms) if len(term) == 2]
+        if pairs:
+            pair_rows, pair_columns, pair_counts = self._bigram_matrix(
+                [terms[row] for row in pairs], fileids)
+            rows = np.concatenate((np.asarray(pairs, dtype=np.int64)[
+                pair_rows], rows))
+            columns = np.concatenate((pair_columns, columns))
+            counts = np.concatenate((pair_counts, counts))
+            order = np.argsort(columns, kind="mergesort")
+            rows, columns, counts = rows[order], columns[order], counts[order]
+        return rows, columns, counts
+
+    def _bigram_matrix(self, terms, fileids):
+        """Like frequency_matrix, for a list of bigrams."""
+        rows, columns, counts = [], [], []
+        if self.vocabulary is not None:
+            # Keys of known terms, sorted for binary search.
+            ids_i = self.vocabulary.encode((t[0] for t in terms), add=False)
+            ids_j = self.vocabulary.encode((t[1] for t in terms), add=False)
+            known = np.flatnonzero((ids_i >= 0) & (ids_j >= 0))
+            term_keys = pack(ids_i[known], ids_j[known])
+            order = np.argsort(term_keys)
+            term_keys = term_keys[order]
+            term_rows = known[order]
+        else:
+            index = {term: row for row, term in enumerate(terms)}
+        # Files that weren't kept are counted again, in order.
+        uncounted = [fileid for fileid in fileids
+                     if self._file_bigrams is None
+                     or fileid not in self._file_bigrams]
+        with self._reader(uncounted) as corpus:
+            for column, fileid in enumerate(fileids):
+                freq = self._file_counts(fileid, corpus)
+                if self.vocabulary is not None:
+                    if len(term_keys) == 0 or len(freq) == 0:
+                        continue
+                    pos = np.searchsorted(term_keys, freq.keys)
+                    pos = np.minimum(pos, len(term_keys) - 1)
+                    found = np.flatnonzero(term_keys[pos] == freq.keys)
+                    file_rows = term_rows[pos[found]]
+                    file_counts = freq.counts[found]
+                else:
+                    file_rows, file_counts = [], []
+                    # Iterate over the smaller of both collections.
+                    if len(freq) < len(index):
+                        for bigram, count in freq.items():
+                            if bigram in index:
+                                file_rows.append(index[bigram])
+                                file_counts.append(count)
+                    else:
+                        for term, row in index.items():
+                            if term in freq:
+                                file_rows.append(row)
+                                file_counts.append(freq[term])
+                rows.append(np.asarray(file_rows, dtype=np.int64))
+                counts.append(np.asarray(file_counts, dtype=np.int64))
+                columns.append(np.full(len(file_rows), column, dtype=np.int64))
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy(), empty.copy()
+        return (np.concatenate(rows),
+                np.concatenate(columns),
+                np.concatenate(counts))
+
+    def fileids(self):
+        """Returns list of ids of files in corpus."""
+        return list(self._fileids)
+
+    def ngram_index(self, max_n=None):
+        """Get the index of n-grams of the corpus, see NgramIndex.
+
+        The index is built when it's used first. It's built again if
+        longer n-grams are needed or files were added or removed.
+
+        Args:
+            max_n (int):
+                Length of the longest n-grams that are needed. N-grams of
+                at least NgramIndex.MAX_N words are always indexed.
+                Default is None.
+
+        Returns:
+            NgramIndex
+        """
+        max_n = max(max_n or 0, NgramIndex.MAX_N)
+        if self._ngram_index is None or self._ngram_index.max_n < max_n:
+            vocabulary = self.vocabulary or Vocabulary()
+            with stage("Preprocess.ngram_index") as counts, \
+                    self._reader(self._fileids) as corpus:
+                files = (_lowered_ids(corpus, fileid, vocabulary)
+                         for fileid in self._fileids)
+                self._ngram_index = NgramIndex.from_files(files, vocabulary,
+                                                          max_n)
+                self._documents = {fileid: document for document, fileid
+                                   in enumerate(self._fileids)}
+                counts["documents"] = len(self._fileids)
+                counts["tokens"] = len(self._ngram_index)
+        return self._ngram_index
+
+    def ngrams(self, n, fileid=None):
+        """Frequency of n-grams in file or corpus, see ngram_index.
+
+        Args:
+            n (int):
+                Length of the n-grams.
+            fileid (str):
+                Id of file in corpus. If default is used, returns n-grams
+                in whole corpus. Default is None.
+
+        Returns:
+            FreqDist:
+                tuples of n strings are keys, frequency in corpus/file are
+                values.
+
+        Raises:
+            AssertionError:
+                If given file is not in corpus.
+        """
+        index = self.ngram_index(n)
+        document = None
+        if fileid is not None:
+            assert fileid in self._fileid_set, "File not in corpus."
+            document = self._documents[fileid]
+        return FreqDist(dict(index.frequent(n, document=document)))
 
     def bigrams(self, fileid=None):
         """Frequency of bigrams in file or corpus.
 
+        Bigrams of a file are served from memory if they were kept
+        after counting, otherwise the file is counted again.
+
         Args:
             fileid (str):
                 Id of file in corpus. If default is used, returns bigrams
                 in whole corpus. Default is None.
 
         Returns:
-            FreqDist:
+            FreqDist or BigramTable:
                 two-tuples of strings are keys, frequency in corpus/file are
                 values.
 
@@ -191,17 +1086,176 @@ class Preprocess:
         """
         if fileid is not None:
             # Make sure file is in corpus.
-            assert fileid in self.corpus.fileids(), "File not in corpus."
-            # Case insensitive.
-            file_words = [word.lower() for word in self.corpus.words(fileid)]
-            bigrams_file = bigrams(file_words)
-            return FreqDist(bigrams_file)
+            assert fileid in self._fileid_set, "File not in corpus."
+            return self._file_counts(fileid, self._words)
         return self._bigrams
 
-    def write_candidates_file(self, min_count, stops, tags, filename):
+    def _file_counts(self, fileid, corpus):
+        """Returns bigrams of a file, counted from corpus if they weren't
+        kept."""
+        if self._file_bigrams is not None:
+            if fileid in self._file_bigrams:
+                return self._file_bigrams[fileid]
+        bigrams_file, _, _ = _count_file(corpus, fileid, self.vocabulary)
+        if self._file_bigrams is not None:
+            self._file_bigrams[fileid] = bigrams_file
+        return bigrams_file
+
+    def _borders(self):
+        """Returns a Counter of bigrams spanning the border of two files."""
+        return borders(self._fileids, self._edges)
+
+    def _set_fileids(self, fileids, corpus):
+        """Replaces the files of the corpus.
+
+        Args:
+            fileids (list):
+                Ids of the files of the corpus.
+            corpus:
+                The corpus over these files, see _with_fileids.
+        """
+        self._set_corpus(corpus)
+        self._fileids = fileids
+        self._fileid_set = set(fileids)
+        # Positions of files in the n-gram index changed, it's built
+        # again when it's used next.
+        self._ngram_index = None
+
+    def _apply(self, added, removed, borders):
+        """Adds and subtracts bigrams from counts of the whole corpus.
+
+        Args:
+            added (list):
+                FreqDists or BigramTables of added files.
+            removed (list):
+                FreqDists or BigramTables of removed files.
+            borders (Counter):
+                Change of the counts of bigrams spanning borders of files,
+                can be negative.
+
+        Returns:
+            None.
+        """
+        if self.vocabulary is not None:
+            delta = TableBuilder(self.vocabulary)
+            for table in added:
+                delta.update(table)
+            for table in removed:
+                delta.subtract(table)
+            delta.update(borders)
+            self._bigrams = self._bigrams.merge(delta.table())
+            return
+        delta = Counter(borders)
+        for freq in added:
+            delta.update(freq)
+        for freq in removed:
+            delta.subtract(freq)
+        for bigram, count in delta.items():
+            count += self._bigrams.get(bigram, 0)
+            if count > 0:
+                self._bigrams[bigram] = count
+            elif bigram in self._bigrams:
+                del self._bigrams[bigram]
+
+    def add_documents(self, fileids):
+        """Count new files of the corpus and add their bigrams.
+
+        Only the new files are read. Their bigrams are added to the counts
+        of the whole corpus, including the bigrams spanning the borders to
+        neighbouring files. If the files of the corpus are sorted, new files
+        are inserted in order, otherwise they are appended. Counts are the
+        same as if the whole corpus was counted again. The n-gram index
+        isn't updated, it's built again when it's used next. The cache
+        isn't written, that would take as long as the whole corpus.
+
+        Args:
+            fileids (list):
+                Ids of files, relative to the root of the corpus.
+
+        Raises:
+            ValueError:
+                If a file is already in the corpus or the corpus isn't a
+                plaintext corpus or a TokenStore.
+
+        Returns:
+            None.
+        """
+        fileids = list(fileids)
+        seen = set()
+        for fileid in fileids:
+            if fileid in self._fileid_set or fileid in seen:
+                raise ValueError("File '{}' already in corpus.".format(fileid))
+            seen.add(fileid)
+        new_fileids = list(self._fileids)
+        if new_fileids == sorted(new_fileids):
+            for fileid in fileids:
+                insort(new_fileids, fileid)
+        else:
+            new_fileids.extend(fileids)
+        new_corpus = _with_fileids(self.corpus, new_fileids)
+        old_borders = self._borders()
+        added = []
+        with self._reader(fileids, new_corpus) as corpus:
+            for fileid in fileids:
+                bigrams_file, first, last = _count_file(corpus, fileid,
+                                                        self.vocabulary)
+                added.append(bigrams_file)
+                self._edges[fileid] = (first, last)
+                if self._file_bigrams is not None:
+                    self._file_bigrams[fileid] = bigrams_file
+        self._set_fileids(new_fileids, new_corpus)
+        borders = self._borders()
+        borders.subtract(old_borders)
+        self._apply(added, [], borders)
+
+    def remove_documents(self, fileids):
+        """Remove files from the corpus and subtract their bigrams.
+
+        Bigrams of the removed files are taken from memory, files aren't
+        read again, so they can already be changed or deleted on disk.
+        Counts are the same as if the remaining files were counted again.
+        The n-gram index isn't updated, it's built again when it's used
+        next. The cache isn't written, see add_documents.
+
+        Args:
+            fileids (list):
+                Ids of files in corpus.
+
+        Raises:
+            ValueError:
+                If a file is not in the corpus, bigrams of a file weren't
+                kept in memory (see per_file, backend "sketch" keeps none)
+                or the corpus isn't a plaintext corpus or a TokenStore.
+
+        Returns:
+            None.
+        """
+        fileids = set(fileids)
+        for fileid in fileids:
+            if fileid not in self._fileid_set:
+                raise ValueError("File '{}' not in corpus.".format(fileid))
+            if self._file_bigrams is None or fileid not in self._file_bigrams:
+                raise ValueError("Bigrams of file '{}' weren't kept, see "
+                                 "per_file.".format(fileid))
+        new_fileids = [fileid for fileid in self._fileids
+                       if fileid not in fileids]
+        new_corpus = _with_fileids(self.corpus, new_fileids)
+        old_borders = self._borders()
+        removed = [self._file_bigrams.pop(fileid) for fileid in fileids]
+        for fileid in fileids:
+            del self._edges[fileid]
+        self._set_fileids(new_fileids, new_corpus)
+        borders = self._borders()
+        borders.subtract(old_borders)
+        self._apply([], removed, borders)
+
+    def write_candidates_file(self, min_count, stops, tags, filename,
+                              context=False, workers=None, exact=False,
+                              n=2):
         """Write a file with candidates.
 
-        Each line in the output file will contain one candidate.
+        Each line in the output file will contain one candidate, its
+        words separated by spaces.
 
         Args:
             min_count (int):
@@ -216,15 +1270,28 @@ class Preprocess:
                 used by Penn Treebank.
             filename (str):
                 The name of the output file.
+            context (bool):
+                Whether bigrams are tagged in the sentences they occur in.
+                Default is False.
+            workers (int):
+                Number of processes used for tagging. If default is used,
+                self.workers is used. Default is None.
+            exact (bool):
+                Whether estimated counts are checked in a second pass,
+                see candidates. Default is False.
+            n:
+                Length of candidates, see candidates. Default is 2.
 
         Returns:
             None.
         """
         filename = os.path.join(filename)
-        candidates = self.candidates(min_count, stops, tags)
+        candidates = self.candidates(min_count, stops, tags,
+                                     context=context, workers=workers,
+                                     exact=exact, n=n)
         with open(filename, "w", encoding="utf-8") as file:
-            for wordi, wordj in candidates:
-                file.write("{} {}\n".format(wordi, wordj))
+            for candidate in candidates:
+                file.write("{}\n".format(" ".join(candidate)))
         print("Success: Candidates written to '{}'".format(filename))
 
     @classmethod
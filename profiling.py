@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Recording time, memory and counts of the stages of a run.
+
+Code marks its stages with stage(). Stages are only recorded while a
+Profiler is active, otherwise stage() costs next to nothing.
+"""
+import contextlib
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None
+
+# Profiler that records stages, None if no profiler is active.
+_ACTIVE = None
+
+
+def _max_rss():
+    """Returns maximum resident set size of the process in bytes or None."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    if sys.platform != "darwin":
+        rss *= 1024
+    return rss
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Marks a stage of a run.
+
+    Args:
+        name (str):
+            Name of the stage.
+
+    Yields:
+        dict:
+            Counts of the stage, e.g. number of documents. Code in the
+            stage can add counts to it.
+    """
+    if _ACTIVE is None:
+        yield dict()
+    else:
+        with _ACTIVE.stage(name) as counts:
+            yield counts
+
+
+class Profiler:
+
+    """
+    A class that records wall and CPU time, peak memory and counts of
+    stages.
+
+    Stages can be nested. Peak memory is measured with tracemalloc, which
+    slows down the run, and as maximum resident set size of the process.
+    Stages in worker processes are not recorded.
+
+    Attributes:
+        directory (str):
+            Directory where reports are written when the profiler is
+            left, None if nothing should be written.
+        memory (bool):
+            Whether memory is traced with tracemalloc.
+        cprofile (bool):
+            Whether a cProfile dump of every outermost stage is written.
+        stages (list):
+            Dicts of recorded stages, in the order they ended.
+
+    Methods:
+        stage(name):
+            Record a stage.
+        report():
+            Get recorded stages.
+        trace():
+            Get recorded stages in the Chrome trace event format.
+        write():
+            Write report, trace and cProfile dumps to self.directory.
+    """
+
+    REPORT = "profile.json"
+    TRACE = "trace.json"
+
+    def __init__(self, directory=None, memory=True, cprofile=False):
+        """Construct a Profiler instance.
+
+        Args:
+            directory (str):
+                Directory for the reports. Default is None, reports are
+                not written.
+            memory (bool):
+                Whether memory is traced with tracemalloc.
+                Default is True.
+            cprofile (bool):
+                Whether stages are profiled with cProfile. Default is False.
+
+        Returns:
+            None.
+        """
+        self.directory = directory
+        self.memory = memory
+        self.cprofile = cprofile
+        self.stages = []
+        self._open = []
+        self._profiles = []
+        self._start = None
+        self._previous = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        global _ACTIVE
+        self._previous = _ACTIVE
+        _ACTIVE = self
+        self._start = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        global _ACTIVE
+        _ACTIVE = self._previous
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if self.directory is not None:
+            self.write()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Records a stage, see profiling.stage."""
+        counts = dict()
+        record = {"name": name,
+                  "depth": len(self._open),
+                  "start": time.perf_counter() - self._start,
+                  "peak": 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._open:
+                self._open[-1]["peak"] = max(self._open[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            record["memory"] = current
+        profile = None
+        if self.cprofile and not self._open:
+            profile = cProfile.Profile()
+        self._open.append(record)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield counts
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profiles.append((len(self._profiles), name, profile))
+            record["wall_seconds"] = time.perf_counter() - wall
+            record["cpu_seconds"] = time.process_time() - cpu
+            self._open.pop()
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                start = record.pop("memory")
+                record["peak_bytes"] = max(record.pop("peak"), peak)
+                # Peak of memory allocated while the stage ran.
+                record["peak_increase_bytes"] = record["peak_bytes"] - start
+                record["allocated_bytes"] = current - start
+                if self._open:
+                    self._open[-1]["peak"] = max(self._open[-1]["peak"],
+                                                 record["peak_bytes"])
+            else:
+                del record["peak"]
+            record["max_rss_bytes"] = _max_rss()
+            record["counts"] = counts
+            self.stages.append(record)
+
+    def report(self):
+        """Returns recorded stages, ordered by their start."""
+        return {"stages": sorted(self.stages,
+                                 key=lambda record: record["start"])}
+
+    def trace(self):
+        """Returns recorded stages in the Chrome trace event format.
+
+        The trace can be viewed in chrome://tracing or Perfetto.
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = []
+        for record in self.report()["stages"]:
+            args = dict(record["counts"])
+            for key in ("cpu_seconds", "peak_bytes", "peak_increase_bytes",
+                        "allocated_bytes", "max_rss_bytes"):
+                if record.get(key) is not None:
+                    args[key] = record[key]
+            events.append({"name": record["name"],
+                           "cat": "stage",
+                           "ph": "X",
+                           "ts": record["start"] * 1e6,
+                           "dur": record["wall_seconds"] * 1e6,
+                           "pid": pid,
+                           "tid": tid,
+                           "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self):
+        """Writes report, trace and cProfile dumps to self.directory.
+
+        Returns:
+            list:
+                Names of the written files.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        filenames = []
+        for filename, content in ((self.REPORT, self.report()),
+                                  (self.TRACE, self.trace())):
+            filename = os.path.join(self.directory, filename)
+            with open(filename, "w", encoding="utf-8") as file:
+                json.dump(content, file, indent=2)
+            filenames.append(filename)
+        for index, name, profile in self._profiles:
+            filename = os.path.join(self.directory, "{:02d}_{}.prof".format(
+                index, re.sub(r"\W+", "_", name)))
+            profile.dump_stats(filename)
+            filenames.append(filename)
+        return filenames
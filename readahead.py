@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Reading files of a corpus ahead in background threads.
+"""
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+
+
+class ReadAhead:
+
+    DEPTH = 4
+    MEMORY = 64 * 1024 ** 2
+
+    """
+    A class that reads the next files of a plaintext corpus while the
+    current file is tokenized and counted.
+
+    Files are read in the order they will be used by a pool of threads,
+    which wait for the storage without holding the GIL. Tokens are the
+    same as those of the corpus reader, every line of a file is
+    tokenized by the tokenizer of the reader. All other attributes are
+    taken from the corpus, so a ReadAhead object can be used instead of
+    it.
+
+    Attributes:
+        corpus (PlaintextCorpusReader):
+            The corpus that is read.
+        depth (int):
+            Maximum number of files that are read ahead.
+        memory (int):
+            Maximum number of bytes of files that are read ahead and not
+            yet used. At least one file is always read ahead.
+
+    Methods:
+        supports(corpus):
+            Check if files of a corpus can be read ahead.
+        text(fileid):
+            Get the text of a file.
+        words(fileid):
+            Get the tokens of a file.
+        close():
+            Stop reading ahead.
+    """
+
+    def __init__(self, corpus, fileids, depth=None, memory=None):
+        """Construct a ReadAhead instance and start reading.
+
+        Args:
+            corpus (PlaintextCorpusReader):
+                The corpus that is read.
+            fileids:
+                Ids of files in the order they will be used.
+            depth (int):
+                Maximum number of files read ahead. If default is used,
+                DEPTH is used. Default is None.
+            memory (int):
+                Maximum number of bytes of files read ahead. If default
+                is used, MEMORY is used. Default is None.
+
+        Returns:
+            None.
+        """
+        self.corpus = corpus
+        self.depth = max(1, depth or self.DEPTH)
+        self.memory = memory or self.MEMORY
+        self._waiting = deque(fileids)
+        self._reading = OrderedDict()
+        # Bytes of files in self._reading.
+        self._sizes = dict()
+        self._pool = ThreadPoolExecutor(max_workers=self.depth)
+        self._fill()
+
+    @staticmethod
+    def supports(corpus):
+        """Returns True if files of corpus can be read ahead."""
+        return isinstance(corpus, PlaintextCorpusReader)
+
+    def _read(self, fileid):
+        """Reads and decodes a file, like the corpus reader does."""
+        with self.corpus.abspath(fileid).open() as stream:
+            text = stream.read().decode(self.corpus.encoding(fileid))
+        # The corpus reader skips a byte order mark.
+        if text.startswith("\ufeff"):
+            text = text[1:]
+        return text
+
+    def _size(self, fileid):
+        """Returns number of bytes of a file, 0 if it's unknown."""
+        path = getattr(self.corpus.abspath(fileid), "path", None)
+        try:
+            return os.path.getsize(path)
+        except (OSError, TypeError):
+            return 0
+
+    def _fill(self):
+        """Starts reading files until depth or memory are reached."""
+        while self._waiting and len(self._reading) < self.depth:
+            fileid = self._waiting[0]
+            if fileid in self._reading:
+                self._waiting.popleft()
+                continue
+            size = self._size(fileid)
+            if (self._reading
+                    and sum(self._sizes.values()) + size > self.memory):
+                break
+            self._waiting.popleft()
+            self._sizes[fileid] = size
+            self._reading[fileid] = self._pool.submit(self._read, fileid)
+
+    def text(self, fileid):
+        """Get the text of a file, waits until it was read.
+
+        Files that weren't read ahead are read right away. Files that
+        were read ahead of it and not used are dropped.
+
+        Args:
+            fileid (str):
+                Id of file in corpus.
+
+        Returns:
+            str:
+                Decoded text of the file.
+        """
+        future = None
+        if fileid in self._reading:
+            # Files read ahead of fileid were skipped.
+            while future is None:
+                skipped, future = self._reading.popitem(last=False)
+                del self._sizes[skipped]
+                if skipped != fileid:
+                    future.cancel()
+                    future = None
+            text = future.result()
+        else:
+            text = self._read(fileid)
+        self._fill()
+        return text
+
+    def words(self, fileid):
+        """Returns list of tokens of a file, see PlaintextCorpusReader."""
+        tokenizer = self.corpus._word_tokenizer
+        words = []
+        # The corpus reader tokenizes line by line.
+        for line in self.text(fileid).splitlines(True):
+            words.extend(tokenizer.tokenize(line))
+        return words
+
+    def __getattr__(self, name):
+        return getattr(self.corpus, name)
+
+    def close(self):
+        """Stops reading ahead, files not yet read are skipped."""
+        self._waiting.clear()
+        for future in self._reading.values():
+            future.cancel()
+        self._reading.clear()
+        self._sizes.clear()
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Counts of bigrams in a reference corpus, stored in a binary file.
+"""
+import hashlib
+import mmap
+from bisect import bisect_left
+
+import numpy as np
+
+from bigramtable import BigramTable, pack, unpack
+from cache import signature
+
+
+class _Words:
+
+    """
+    Sorted words of an index, read from the mapped file on demand.
+
+    Can be searched with bisect, a word is only read from the file when
+    it is compared.
+    """
+
+    def __init__(self, data, offsets, start):
+        self._data = data
+        self._offsets = offsets
+        self._start = start
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return self._data[self._start + int(self._offsets[index]):
+                          self._start + int(self._offsets[index + 1])]
+
+
+class ReferenceIndex:
+
+    MAGIC = b"TERMIDX1"
+
+    """
+    A class for looking up counts of bigrams in a prebuilt index file.
+
+    The file contains the vocabulary of the corpus, sorted by the utf-8
+    encoding of the words, and the counts of all bigrams, sorted by their
+    packed keys (see bigramtable.pack). The file is memory-mapped, words
+    and bigrams are found by binary search, so opening an index doesn't
+    read it into memory. Can be used as the reference corpus of a
+    Terminology object.
+
+    Layout of the file, all numbers are little-endian int64:
+        MAGIC, number of words, number of bytes of words, number of
+        bigrams, total count of all bigrams, offsets of words,
+        utf-8 encoded words (padded to a multiple of 8 bytes),
+        keys, counts.
+
+    Attributes:
+        filename (str):
+            Name of the index file.
+
+    Methods:
+        write(filename, bigrams):
+            Write an index file for counted bigrams.
+        get_frequency(bigram_list, fileid=None):
+            Get frequency of bigrams in the corpus.
+        N():
+            Total count of all bigrams.
+        fingerprint():
+            Digest that changes whenever the index file changes.
+        close():
+            Close the index file.
+    """
+
+    def __init__(self, filename):
+        """Open an index file.
+
+        Args:
+            filename (str):
+                Name of a file written by ReferenceIndex.write.
+
+        Raises:
+            ValueError:
+                If the file isn't an index file.
+
+        Returns:
+            None.
+        """
+        self.filename = filename
+        with open(filename, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(self.MAGIC)] != self.MAGIC:
+            self._map.close()
+            raise ValueError("'{}' is not an index file.".format(filename))
+        offset = len(self.MAGIC)
+        n_words, n_bytes, n_bigrams, self._total = (
+            int(number) for number in self._array(offset, 4))
+        offset += 4 * 8
+        self._offsets = self._array(offset, n_words + 1)
+        offset += (n_words + 1) * 8
+        self._words = _Words(self._map, self._offsets, offset)
+        offset += self._padded(n_bytes)
+        self._keys = self._array(offset, n_bigrams)
+        offset += n_bigrams * 8
+        self._counts = self._array(offset, n_bigrams)
+
+    def _array(self, offset, count):
+        """Returns a view of count int64 numbers in the mapped file."""
+        return np.frombuffer(self._map, dtype="<i8", count=count,
+                             offset=offset)
+
+    @staticmethod
+    def _padded(size):
+        """Returns size rounded up to a multiple of 8."""
+        return -(-size // 8) * 8
+
+    @classmethod
+    def write(cls, filename, bigrams):
+        """Write an index file.
+
+        Args:
+            filename (str):
+                Name of the index file.
+            bigrams:
+                A FreqDist, BigramTable or dict with bigrams as keys and
+                counts as values.
+
+        Returns:
+            None.
+        """
+        if isinstance(bigrams, BigramTable):
+            words = [word.encode("utf-8")
+                     for word in bigrams.vocabulary.words()]
+            order = sorted(range(len(words)), key=words.__getitem__)
+            # Position of every id in the sorted vocabulary.
+            rank = np.empty(len(words), dtype=np.int64)
+            rank[order] = np.arange(len(words))
+            words = [words[i] for i in order]
+            ids_i, ids_j = unpack(bigrams.keys)
+            keys = pack(rank[ids_i], rank[ids_j])
+            counts = bigrams.counts
+        else:
+            items = list(bigrams.items())
+            words = sorted({word.encode("utf-8")
+                            for bigram, _ in items for word in bigram})
+            ids = {word.decode("utf-8"): i for i, word in enumerate(words)}
+            keys = pack([ids[bigram[0]] for bigram, _ in items],
+                        [ids[bigram[1]] for bigram, _ in items])
+            counts = np.array([count for _, count in items], dtype=np.int64)
+        order = np.argsort(keys, kind="stable")
+        keys = np.asarray(keys[order], dtype="<i8")
+        counts = np.asarray(counts[order], dtype="<i8")
+        offsets = np.zeros(len(words) + 1, dtype="<i8")
+        offsets[1:] = np.cumsum([len(word) for word in words])
+        data = b"".join(words)
+        header = np.array([len(words), len(data), len(keys), counts.sum()],
+                          dtype="<i8")
+        with open(filename, "wb") as file:
+            file.write(cls.MAGIC)
+            file.write(header.tobytes())
+            file.write(offsets.tobytes())
+            file.write(data.ljust(cls._padded(len(data)), b"\0"))
+            file.write(keys.tobytes())
+            file.write(counts.tobytes())
+
+    def _id(self, word):
+        """Returns position of word in the sorted vocabulary or -1."""
+        word = word.encode("utf-8")
+        index = bisect_left(self._words, word)
+        if index < len(self._words) and self._words[index] == word:
+            return index
+        return -1
+
+    def get_frequency(self, bigram_list, fileid=None):
+        """Get the frequency of a list of bigrams in the corpus.
+
+        Same as Preprocess.get_frequency, only frequencies in the
+        whole corpus are stored.
+
+        Args:
+            bigram_list (list):
+                List with two-tuples of strings.
+            fileid:
+                Has to be None.
+
+        Raises:
+            ValueError:
+                If a fileid is given or a term is not a bigram.
+
+        Returns:
+            dict:
+                Keys are tuples of strings, values are frequencies in
+                corpus (int). Bigrams that don't occur are left out.
+        """
+        if fileid is not None:
+            raise ValueError("Index only contains counts of whole corpus.")
+        bigram_list = list(bigram_list)
+        if any(len(bigram) != 2 for bigram in bigram_list):
+            raise ValueError("Index only contains counts of bigrams.")
+        if not bigram_list or not len(self._keys):
+            return dict()
+        ids = dict()
+        for bigram in bigram_list:
+            for word in bigram:
+                if word not in ids:
+                    ids[word] = self._id(word)
+        ids_i = np.array([ids[bigram[0]] for bigram in bigram_list])
+        ids_j = np.array([ids[bigram[1]] for bigram in bigram_list])
+        known = (ids_i >= 0) & (ids_j >= 0)
+        keys = pack(np.where(known, ids_i, 0), np.where(known, ids_j, 0))
+        index = np.minimum(np.searchsorted(self._keys, keys),
+                           len(self._keys) - 1)
+        found = known & (self._keys[index] == keys)
+        counts = self._counts[index]
+        return {bigram_list[i]: int(counts[i])
+                for i in np.flatnonzero(found).tolist()}
+
+    def N(self):
+        """Returns the total count of all bigrams."""
+        return self._total
+
+    def __len__(self):
+        return len(self._keys)
+
+    def fingerprint(self):
+        """Returns a digest that changes whenever the index file changes."""
+        return hashlib.sha256("index\t{}".format(signature(
+            self.filename)).encode("utf-8")).hexdigest()
+
+    def close(self):
+        """Closes the index file."""
+        # Views of the map have to be released first.
+        self._offsets = self._keys = self._counts = self._words = None
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
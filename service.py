@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+A long-running service that keeps domain and reference corpus in memory
+and answers requests for extracting terminology over HTTP.
+
+Requests and responses are JSON. Terms are lists of words or strings of
+words separated by spaces.
+
+    GET  /health    {}
+    POST /score     {"candidates": [...], "alpha": 0.5, "theta": 1.0}
+    POST /top       {"candidates": [...], "alpha": 0.5, "k": 10}
+    POST /evaluate  {"candidates": [...], "golds": [...], "alpha": 0.5,
+                     "theta": 1.0}
+
+If "candidates" is left out, the candidates the service was started with
+are used.
+"""
+import json
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cache import LRUDict
+from evaluation import Evaluation
+from preprocess import Preprocess
+from terminology import Terminology
+
+
+def _term(term):
+    """Returns a term of a request as tuple of words."""
+    if isinstance(term, str):
+        return tuple(term.split())
+    if isinstance(term, list) and all(isinstance(word, str)
+                                      for word in term):
+        return tuple(term)
+    raise ValueError("Terms should be strings or lists of strings.")
+
+
+class TermService:
+
+    CACHE_SIZE = 32
+
+    """
+    A class that answers requests for extracting terminology with
+    corpora kept in memory.
+
+    Both corpora are counted once. Relevance and consensus are computed
+    once per set of candidates and kept for the CACHE_SIZE most recently
+    used sets. All methods can be called from many threads at once.
+    Different sets of candidates are computed at the same time, requests
+    for a set that is being computed wait for it.
+
+    Attributes:
+        domain (Preprocess):
+            The domain corpus.
+        reference:
+            The reference corpus, a Preprocess or ReferenceIndex object.
+        candidates (set):
+            Candidates used if a request doesn't contain any.
+
+    Methods:
+        terminology(candidates=None):
+            Get the Terminology object of candidates.
+        score(candidates=None, alpha=0.5, theta=1.0):
+            Weigh all candidates.
+        top(k, candidates=None, alpha=0.5):
+            Get the k highest weighted candidates.
+        evaluate(golds, candidates=None, alpha=0.5, theta=1.0):
+            Compare extracted terms with a gold standard.
+    """
+
+    def __init__(self, domain, reference, candidates=None, cache=None,
+                 workers=1, backend="freqdist"):
+        """Construct a TermService instance, counts both corpora.
+
+        Args:
+            domain:
+                A corpus with texts from a specific domain, see
+                Terminology.
+            reference:
+                A corpus with texts from a neutral domain, see
+                Terminology.
+            candidates:
+                Iterable of candidates used if a request doesn't contain
+                any. Default is None.
+            cache:
+                A CountCache object or the name of a directory for one.
+                Default is None.
+            workers (int):
+                Number of processes used for counting. Default is 1.
+            backend (str):
+                How bigrams are stored, see Preprocess.
+                Default is "freqdist".
+
+        Returns:
+            None.
+        """
+        self.domain = Terminology._preprocess(domain, cache, workers,
+                                              backend)
+        self.reference = Terminology._preprocess(reference, cache, workers,
+                                                 backend, per_file=False)
+        self.candidates = frozenset(candidates or ())
+        self._terminologies = LRUDict(self.CACHE_SIZE)
+        # Futures of sets of candidates that are being computed.
+        self._computing = dict()
+        # Guards both dicts, it's never held while computing.
+        self._lock = threading.Lock()
+        # N-gram indexes of the corpora are built on first use.
+        self._index_lock = threading.Lock()
+
+    def terminology(self, candidates=None):
+        """Get the Terminology object of a set of candidates.
+
+        Args:
+            candidates:
+                Iterable of candidates. If default is used,
+                self.candidates is used. Default is None.
+
+        Raises:
+            ValueError:
+                If there are no candidates.
+
+        Returns:
+            Terminology
+        """
+        if candidates is None:
+            candidates = self.candidates
+        candidates = frozenset(candidates)
+        if not candidates:
+            raise ValueError("No candidates given.")
+        with self._lock:
+            if candidates in self._terminologies:
+                return self._terminologies[candidates]
+            future = self._computing.get(candidates)
+            computing = future is None
+            if computing:
+                future = self._computing[candidates] = Future()
+        if not computing:
+            return future.result()
+        try:
+            term_obj = self._terminology(candidates)
+        except BaseException as error:
+            with self._lock:
+                del self._computing[candidates]
+            future.set_exception(error)
+            raise
+        with self._lock:
+            self._terminologies[candidates] = term_obj
+            del self._computing[candidates]
+        future.set_result(term_obj)
+        return term_obj
+
+    def _terminology(self, candidates):
+        """Returns a new Terminology object of candidates.
+
+        Only n-gram indexes are built while holding a lock, otherwise the
+        corpora are only read, so many sets can be computed at once.
+        """
+        lengths = [len(term) for term in candidates if len(term) != 2]
+        if lengths:
+            with self._index_lock:
+                for corpus in (self.domain, self.reference):
+                    if isinstance(corpus, Preprocess):
+                        corpus.ngram_index(max(lengths))
+        return Terminology(self.domain, self.reference, candidates,
+                           quiet=True)
+
+    def _ranked(self, candidates, alpha):
+        """Returns terms and their scores, highest score first."""
+        term_obj = self.terminology(candidates)
+        scores = term_obj.weigh_grid([alpha])[0]
+        ranking = term_obj._ranking(scores)
+        terms = term_obj.terms()
+        return [terms[i] for i in ranking.tolist()], scores[ranking]
+
+    def score(self, candidates=None, alpha=0.5, theta=1.0):
+        """Weigh candidates and extract terminology.
+
+        Args:
+            candidates:
+                Iterable of candidates. If default is used,
+                self.candidates is used. Default is None.
+            alpha (float):
+                Weight of relevance, see Terminology.weigh_candidates.
+                Default is 0.5.
+            theta (float):
+                Candidates weighted above theta are terms.
+                Default is 1.0.
+
+        Raises:
+            ValueError:
+                If alpha or theta have invalid values or there are no
+                candidates.
+
+        Returns:
+            list:
+                (candidate, value, is term) tuples, highest value first.
+        """
+        Terminology._check_theta(theta)
+        terms, values = self._ranked(candidates, alpha)
+        above = Terminology._above(values, theta)
+        return [(term, value, rank < above) for rank, (term, value)
+                in enumerate(zip(terms, values.tolist()))]
+
+    def top(self, k, candidates=None, alpha=0.5):
+        """Get the k highest weighted candidates.
+
+        Returns:
+            list:
+                (candidate, value) tuples, highest value first.
+        """
+        if k < 0:
+            raise ValueError("k should not be negative.")
+        terms, values = self._ranked(candidates, alpha)
+        return list(zip(terms[:k], values[:k].tolist()))
+
+    def evaluate(self, golds, candidates=None, alpha=0.5, theta=1.0):
+        """Extract terminology and compare it with a gold standard.
+
+        Args:
+            golds:
+                Iterable of terms that are considered the standard.
+            candidates, alpha, theta:
+                See score.
+
+        Raises:
+            ValueError:
+                If golds is empty, see also score.
+
+        Returns:
+            dict:
+                "precision", "recall", "f1" and "extracted", the number
+                of extracted terms.
+        """
+        extracted = {term: value
+                     for term, value, is_term in self.score(candidates,
+                                                            alpha, theta)
+                     if is_term}
+        evaluation = Evaluation(extracted, golds)
+        return {"precision": evaluation.precision(),
+                "recall": evaluation.recall(),
+                "f1": evaluation.f1(),
+                "extracted": len(extracted)}
+
+    def handle(self, path, request):
+        """Answers a request of the HTTP interface.
+
+        Args:
+            path (str):
+                Path of the request, e.g. "/score".
+            request (dict):
+                Parameters of the request.
+
+        Raises:
+            KeyError:
+                If path is unknown.
+            ValueError:
+                If a parameter is invalid.
+
+        Returns:
+            dict:
+                The response.
+        """
+        candidates = request.get("candidates")
+        if candidates is not None:
+            candidates = [_term(term) for term in candidates]
+        alpha = request.get("alpha", 0.5)
+        if path == "/score":
+            scored = self.score(candidates, alpha,
+                                request.get("theta", 1.0))
+            return {"terms": [{"term": " ".join(term), "value": value,
+                               "extracted": is_term}
+                              for term, value, is_term in scored]}
+        if path == "/top":
+            k = request.get("k", 10)
+            if not isinstance(k, int):
+                raise ValueError("k should be an integer.")
+            return {"terms": [{"term": " ".join(term), "value": value}
+                              for term, value in self.top(k, candidates,
+                                                          alpha)]}
+        if path == "/evaluate":
+            golds = [_term(term) for term in request.get("golds", [])]
+            return self.evaluate(golds, candidates, alpha,
+                                 request.get("theta", 1.0))
+        raise KeyError(path)
+
+    def health(self):
+        """Returns a short description of the loaded corpora."""
+        return {"status": "ok",
+                "documents": len(self.domain.fileids()),
+                "candidates": len(self.candidates)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    """Handler of HTTP requests, one instance per request."""
+
+    def _send(self, status, response):
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, self.server.service.health())
+        else:
+            self._send(404, {"error": "Unknown path."})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("Request should be a JSON object.")
+            response = self.server.service.handle(self.path, request)
+        except KeyError:
+            self._send(404, {"error": "Unknown path."})
+        except (ValueError, TypeError) as error:
+            self._send(400, {"error": str(error)})
+        else:
+            self._send(200, response)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(service, host="127.0.0.1", port=8000, verbose=False):
+    """Create a HTTP server for a service, every request gets a thread.
+
+    Args:
+        service (TermService):
+            The service that answers requests.
+        host (str):
+            Address the server listens on. Default is "127.0.0.1".
+        port (int):
+            Port the server listens on, 0 for any free port.
+            Default is 8000.
+        verbose (bool):
+            Whether every request is logged. Default is False.
+
+    Returns:
+        ThreadingHTTPServer:
+            The server, call serve_forever() to start it.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
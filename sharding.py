@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Counting a corpus in shards, e.g. on several hosts, and merging the
+partial counts.
+
+A shard is a subset of the files of a corpus. Its count file holds the
+bigrams of every file, the sum of them, first and last word and number of
+tokens of every file. Bigrams spanning the border of two files are added
+when shards are merged, so shards can be any subsets of the files.
+"""
+import os
+import pickle
+import zlib
+from collections import Counter
+
+from nltk.probability import FreqDist
+
+from bigramtable import TableBuilder, Vocabulary
+from parallel import shards
+
+# Version of the format of count files.
+VERSION = 1
+# Ways of selecting the files of a shard.
+SELECTIONS = ("range", "hash")
+
+
+def select(fileids, index, count, by="range"):
+    """Selects the files of a shard.
+
+    Args:
+        fileids (list):
+            Ids of all files of the corpus.
+        index (int):
+            Number of the shard, from 0 to count - 1.
+        count (int):
+            Number of shards.
+        by (str):
+            If "range", shards are consecutive files of about the same
+            number. If "hash", a file belongs to the shard given by a hash
+            of its id, so shards don't change when files are added.
+            Default is "range".
+
+    Raises:
+        ValueError:
+            If index isn't a shard or by is unknown.
+
+    Returns:
+        list:
+            Ids of the files of the shard, in the order of fileids.
+    """
+    if not 0 <= index < count:
+        raise ValueError("Shard should be between 0 and {}.".format(count - 1))
+    if by == "range":
+        parts = shards(list(fileids), count)
+        if index < len(parts):
+            return parts[index]
+        return []
+    if by == "hash":
+        # crc32 is the same in every process, unlike hash().
+        return [fileid for fileid in fileids
+                if zlib.crc32(fileid.encode("utf-8")) % count == index]
+    raise ValueError("Shards are selected by one of {}.".format(
+        ", ".join(SELECTIONS)))
+
+
+def write_counts(filename, state):
+    """Writes a count file.
+
+    The file is written to a temporary file first, so other hosts never
+    read an incomplete file.
+
+    Args:
+        filename (str):
+            Name of the file.
+        state (dict):
+            Counts of a shard or of merged shards.
+
+    Returns:
+        None.
+    """
+    temp = "{}.{}.tmp".format(filename, os.getpid())
+    with open(temp, "wb") as file:
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, filename)
+
+
+def read_counts(filename):
+    """Reads a count file.
+
+    Raises:
+        ValueError:
+            If the file isn't a count file of this version.
+
+    Returns:
+        dict:
+            "version", "backend" ("freqdist" or "array"), "corpus" (ids of
+            all files of the corpus), "fileids" (ids of counted files),
+            "shards" (number of merged shards, 0 for a single shard),
+            "bigrams" (sum of bigrams of files, without the bigrams
+            spanning borders of files unless shards are merged), "files"
+            (bigrams of every file), "edges" (first and last word of every
+            file) and "tokens" (number of tokens of every file).
+    """
+    try:
+        with open(filename, "rb") as file:
+            state = pickle.load(file)
+    except (EOFError, pickle.UnpicklingError):
+        state = None
+    if not isinstance(state, dict) or state.get("version") != VERSION:
+        raise ValueError("'{}' is not a count file.".format(filename))
+    return state
+
+
+def borders(fileids, edges):
+    """Returns a Counter of bigrams spanning the border of two files.
+
+    Args:
+        fileids (list):
+            Ids of files in the order of the corpus.
+        edges (dict):
+            First and last word of every file, None if a file is empty.
+    """
+    counts = Counter()
+    last = None
+    for fileid in fileids:
+        first, file_last = edges[fileid]
+        if first is not None:
+            if last is not None:
+                counts[last, first] += 1
+            last = file_last
+    return counts
+
+
+def merge_counts(states):
+    """Merges count files of shards into counts of the whole corpus.
+
+    The result is the same as counting the corpus on one host, no matter
+    how files were split into shards or in which order shards are given.
+
+    Args:
+        states:
+            Iterable of dicts read by read_counts. Every file of the
+            corpus should be in exactly one shard.
+
+    Raises:
+        ValueError:
+            If shards are of different corpora or backends, were already
+            merged, or don't cover every file exactly once.
+
+    Returns:
+        dict:
+            Counts of the whole corpus, see read_counts. "bigrams"
+            includes the bigrams spanning borders of files.
+    """
+    states = list(states)
+    if not states:
+        raise ValueError("No shards given.")
+    corpus = states[0]["corpus"]
+    backend = states[0]["backend"]
+    for state in states:
+        if state["shards"]:
+            raise ValueError("Shards were already merged.")
+        if state["corpus"] != corpus or state["backend"] != backend:
+            raise ValueError("Shards are of different corpora or were "
+                             "counted with different backends.")
+    position = {fileid: i for i, fileid in enumerate(corpus)}
+    counted = Counter(fileid for state in states
+                      for fileid in state["fileids"])
+    if (set(counted) != set(corpus)
+            or any(count > 1 for count in counted.values())):
+        raise ValueError("Every file should be in exactly one shard.")
+    # Shards are added in the order of the corpus, so words get the
+    # same ids every time.
+    states.sort(key=lambda state: min((position[fileid]
+                                       for fileid in state["fileids"]),
+                                      default=len(corpus)))
+    vocabulary = None
+    if backend == "array":
+        vocabulary = Vocabulary()
+        total = TableBuilder(vocabulary)
+    else:
+        total = FreqDist()
+    files, edges, tokens = dict(), dict(), dict()
+    for state in states:
+        bigrams, shard_files = state["bigrams"], state["files"]
+        if vocabulary is not None:
+            mapping = vocabulary.encode(bigrams.vocabulary.words())
+            bigrams = bigrams.remap(mapping, vocabulary)
+            shard_files = {fileid: table.remap(mapping, vocabulary)
+                           for fileid, table in shard_files.items()}
+        total.update(bigrams)
+        files.update(shard_files)
+        edges.update(state["edges"])
+        tokens.update(state["tokens"])
+    total.update(borders(corpus, edges))
+    if vocabulary is not None:
+        total = total.table()
+    return {"version": VERSION,
+            "backend": backend,
+            "corpus": list(corpus),
+            "fileids": list(corpus),
+            "shards": len(states),
+            "bigrams": total,
+            # Files in the order of the corpus.
+            "files": {fileid: files[fileid] for fileid in corpus},
+            "edges": {fileid: edges[fileid] for fileid in corpus},
+            "tokens": {fileid: tokens[fileid] for fileid in corpus}}
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Approximate bigram counts in bounded memory.
+
+A Count-Min sketch estimates the count of every bigram, a bounded set of
+heavy hitters keeps the bigrams with the highest estimates.
+"""
+import math
+
+import numpy as np
+
+from bigramtable import _reduce, pack, unpack
+
+# Bytes of one heavy hitter, its key and its estimate.
+_ENTRY = 16
+
+
+class CountMinSketch:
+
+    """
+    A class that estimates counts of int64 keys in a fixed table.
+
+    Every key is hashed once per row of the table. Estimates are never
+    smaller than the true counts. With probability 1 - delta, an estimate
+    is at most epsilon * N larger than the true count, where
+    epsilon = e / width, delta = e ** -depth and N is the total count.
+
+    Attributes:
+        table (numpy.ndarray):
+            Counts, one row for every hash function.
+        total (int):
+            Total count of all added keys.
+
+    Methods:
+        add(keys, counts):
+            Add counts of keys.
+        estimate(keys):
+            Get estimated counts of keys.
+    """
+
+    def __init__(self, width, depth=4, seed=0):
+        """Construct a CountMinSketch instance.
+
+        Args:
+            width (int):
+                Number of counters in a row, rounded down to a power
+                of two.
+            depth (int):
+                Number of rows. Default is 4.
+            seed (int):
+                Seed of the hash functions. Default is 0.
+
+        Returns:
+            None.
+        """
+        self._bits = max(1, int(width).bit_length() - 1)
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing, multipliers have to be odd.
+        self._multipliers = (rng.integers(0, 1 << 63, size=depth,
+                                          dtype=np.uint64) << np.uint64(1)
+                             | np.uint64(1))
+        self._offsets = rng.integers(0, 1 << 63, size=depth, dtype=np.uint64)
+        self.table = np.zeros((depth, 1 << self._bits), dtype=np.int64)
+        self.total = 0
+
+    @property
+    def width(self):
+        return self.table.shape[1]
+
+    @property
+    def depth(self):
+        return self.table.shape[0]
+
+    def _hashes(self, keys, row):
+        """Returns the columns of keys in a row."""
+        keys = np.asarray(keys, dtype=np.int64).view(np.uint64)
+        return ((keys * self._multipliers[row] + self._offsets[row])
+                >> np.uint64(64 - self._bits)).astype(np.intp)
+
+    def add(self, keys, counts):
+        """Adds counts of keys, counts may be negative.
+
+        Args:
+            keys (numpy.ndarray):
+                Array of int64 keys.
+            counts (numpy.ndarray):
+                Array of counts of keys.
+
+        Returns:
+            None.
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            np.add.at(self.table[row], self._hashes(keys, row), counts)
+        self.total += int(counts.sum())
+
+    def estimate(self, keys):
+        """Returns array of estimated counts of keys."""
+        estimates = self.table[0][self._hashes(keys, 0)]
+        for row in range(1, self.depth):
+            estimates = np.minimum(estimates,
+                                   self.table[row][self._hashes(keys, row)])
+        return estimates
+
+    def epsilon(self):
+        """Returns the relative error of estimates."""
+        return math.e / self.width
+
+    def delta(self):
+        """Returns the probability that an error is larger than epsilon."""
+        return math.exp(-self.depth)
+
+    def copy(self):
+        """Returns an independent copy of the sketch."""
+        other = CountMinSketch.__new__(CountMinSketch)
+        other.__dict__.update(self.__dict__)
+        other.table = self.table.copy()
+        return other
+
+
+class SketchTable:
+
+    """
+    A class for approximate counts of bigrams in bounded memory.
+
+    Implements the parts of a BigramTable that Preprocess needs. Counts
+    of single bigrams are estimated by a Count-Min sketch. Iterating
+    gives only the heavy hitters, at most capacity bigrams with the
+    highest estimates. Every bigram whose true count is larger than
+    threshold is a heavy hitter.
+
+    Attributes:
+        sketch (CountMinSketch):
+            Estimates of all bigrams.
+        keys (numpy.ndarray):
+            Sorted keys of heavy hitters.
+        counts (numpy.ndarray):
+            Estimated counts of heavy hitters.
+        capacity (int):
+            Maximum number of heavy hitters.
+        threshold (int):
+            Largest estimate of a bigram that was dropped from the heavy
+            hitters.
+        vocabulary (Vocabulary):
+            Vocabulary used to encode words.
+
+    Methods:
+        error_bounds():
+            Get the guarantees of the estimates.
+        frequent(min_count, allowed=None):
+            Get heavy hitters with a minimum estimate.
+        frequencies(bigram_list):
+            Get estimated counts of bigrams.
+        merge(other):
+            Get a table with the counts of a BigramTable added.
+    """
+
+    def __init__(self, sketch, capacity, vocabulary):
+        """Construct an empty SketchTable instance.
+
+        Args:
+            sketch (CountMinSketch):
+                An empty sketch.
+            capacity (int):
+                Maximum number of heavy hitters.
+            vocabulary (Vocabulary):
+                Vocabulary used to encode words.
+
+        Returns:
+            None.
+        """
+        self.sketch = sketch
+        self.capacity = max(1, capacity)
+        self.vocabulary = vocabulary
+        self.keys = np.zeros(0, np.int64)
+        self.counts = np.zeros(0, np.int64)
+        self.threshold = 0
+
+    def add(self, keys, counts):
+        """Adds counts of unique keys and updates the heavy hitters.
+
+        Args:
+            keys (numpy.ndarray):
+                Array of unique int64 keys.
+            counts (numpy.ndarray):
+                Array of counts of keys.
+
+        Returns:
+            None.
+        """
+        self.sketch.add(keys, counts)
+        # Estimates of heavy hitters change too, because of collisions.
+        keys = np.union1d(self.keys, keys[counts > 0])
+        estimates = self.sketch.estimate(keys)
+        keep = estimates > 0
+        keys, estimates = keys[keep], estimates[keep]
+        if len(keys) > self.capacity:
+            top = np.argpartition(-estimates, self.capacity - 1)
+            dropped = estimates[top[self.capacity:]]
+            self.threshold = max(self.threshold, int(dropped.max()))
+            top = np.sort(top[:self.capacity])
+            keys, estimates = keys[top], estimates[top]
+        self.keys = keys
+        self.counts = estimates
+
+    def error_bounds(self):
+        """Get the guarantees of the estimates.
+
+        Returns:
+            dict:
+                "epsilon" and "delta": with probability 1 - delta, an
+                estimate exceeds the true count by at most
+                epsilon * N, which is "overestimate". Every bigram with a
+                true count above "threshold" is a heavy hitter. "width",
+                "depth" and "capacity" are the sizes of sketch and heavy
+                hitters.
+        """
+        return {"epsilon": self.sketch.epsilon(),
+                "delta": self.sketch.delta(),
+                "overestimate": self.sketch.epsilon() * self.N(),
+                "threshold": self.threshold,
+                "width": self.sketch.width,
+                "depth": self.sketch.depth,
+                "capacity": self.capacity}
+
+    def _keys(self, bigram_list):
+        """Returns keys of bigrams and mask of bigrams with known words."""
+        ids_i = self.vocabulary.encode((b[0] for b in bigram_list), add=False)
+        ids_j = self.vocabulary.encode((b[1] for b in bigram_list), add=False)
+        known = (ids_i >= 0) & (ids_j >= 0)
+        return pack(np.where(known, ids_i, 0),
+                    np.where(known, ids_j, 0)), known
+
+    def get(self, bigram, default=None):
+        count = self.frequencies([bigram]).get(tuple(bigram))
+        if count is None:
+            return default
+        return count
+
+    def __getitem__(self, bigram):
+        return self.get(bigram, 0)
+
+    def __contains__(self, bigram):
+        return self.get(bigram) is not None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _decode(self, keys):
+        """Returns a list of bigrams for an array of keys."""
+        words = self.vocabulary.words()
+        ids_i, ids_j = unpack(keys)
+        return [(words[i], words[j])
+                for i, j in zip(ids_i.tolist(), ids_j.tolist())]
+
+    def __iter__(self):
+        return iter(self._decode(self.keys))
+
+    def items(self):
+        """Returns list of (bigram, estimate) tuples of heavy hitters."""
+        return list(zip(self._decode(self.keys), self.counts.tolist()))
+
+    def N(self):
+        """Returns the total count of all bigrams, which is exact."""
+        return self.sketch.total
+
+    def most_common(self, n=None):
+        """Returns heavy hitters as (bigram, estimate) tuples, highest
+        estimate first."""
+        order = np.argsort(-self.counts, kind="mergesort")[:n]
+        return list(zip(self._decode(self.keys[order]),
+                        self.counts[order].tolist()))
+
+    def frequent(self, min_count, allowed=None):
+        """Get heavy hitters with a minimum estimate, see
+        BigramTable.frequent.
+        """
+        keep = self.counts >= min_count
+        if allowed is not None:
+            ids_i, ids_j = unpack(self.keys)
+            keep &= allowed[ids_i] & allowed[ids_j]
+        index = np.flatnonzero(keep)
+        index = index[np.argsort(-self.counts[index], kind="mergesort")]
+        return list(zip(self._decode(self.keys[index]),
+                        self.counts[index].tolist()))
+
+    def frequencies(self, bigram_list):
+        """Get estimated counts of bigrams.
+
+        Args:
+            bigram_list:
+                Iterable of two-tuples of strings.
+
+        Returns:
+            dict:
+                Keys are bigrams with an estimate above zero, values are
+                estimates.
+        """
+        bigram_list = list(bigram_list)
+        if not bigram_list:
+            return dict()
+        keys, known = self._keys(bigram_list)
+        estimates = self.sketch.estimate(keys)
+        found = known & (estimates > 0)
+        return {bigram_list[i]: int(estimates[i])
+                for i in np.flatnonzero(found).tolist()}
+
+    def merge(self, other):
+        """Returns a table with the counts of other added.
+
+        Args:
+            other (BigramTable):
+                A table with the same vocabulary, counts may be
+                negative.
+
+        Returns:
+            SketchTable
+        """
+        table = SketchTable(self.sketch.copy(), self.capacity,
+                            self.vocabulary)
+        table.keys, table.counts = self.keys, self.counts
+        table.threshold = self.threshold
+        table.add(other.keys, other.counts)
+        return table
+
+
+class SketchBuilder:
+
+    """
+    A class that sums up many BigramTables into one SketchTable.
+
+    Counts are buffered and added to the sketch in batches. Sketch,
+    heavy hitters and buffer together use about the given number of
+    bytes, the vocabulary is not included.
+
+    Methods:
+        update(bigrams):
+            Add counts of a BigramTable or a dict.
+        table():
+            Get the SketchTable.
+    """
+
+    def __init__(self, vocabulary, memory, depth=4, seed=0):
+        """Construct a SketchBuilder instance.
+
+        Args:
+            vocabulary (Vocabulary):
+                Vocabulary used to encode words.
+            memory (int):
+                Number of bytes for counting. Half of them is used for
+                the sketch, a quarter for heavy hitters and a quarter for
+                the buffer.
+            depth (int):
+                Number of rows of the sketch. Default is 4.
+            seed (int):
+                Seed of the hash functions. Default is 0.
+
+        Returns:
+            None.
+        """
+        self.vocabulary = vocabulary
+        width = max(2, memory // 2 // (depth * 8))
+        capacity = max(1, memory // 4 // _ENTRY)
+        self._table = SketchTable(CountMinSketch(width, depth, seed),
+                                  capacity, vocabulary)
+        self._limit = capacity
+        self._keys = []
+        self._counts = []
+        self._size = 0
+
+    def update(self, bigrams):
+        """Adds counts of a BigramTable or a dict of bigram counts."""
+        if hasattr(bigrams, "keys") and hasattr(bigrams, "vocabulary"):
+            keys, counts = bigrams.keys, bigrams.counts
+        else:
+            items = list(bigrams.items())
+            ids = self.vocabulary.encode(w for bigram, _ in items
+                                         for w in bigram)
+            keys = pack(ids[0::2], ids[1::2])
+            counts = np.array([count for _, count in items], dtype=np.int64)
+        self._keys.append(keys)
+        self._counts.append(counts)
+        self._size += len(keys)
+        if self._size >= self._limit:
+            self._flush()
+
+    def _flush(self):
+        """Adds buffered counts to the sketch."""
+        if not self._keys:
+            return
+        keys, counts = _reduce(np.concatenate(self._keys),
+                               np.concatenate(self._counts))
+        self._keys, self._counts, self._size = [], [], 0
+        self._table.add(keys, counts)
+
+    def table(self):
+        """Returns the SketchTable with all counts added."""
+        self._flush()
+        return self._table
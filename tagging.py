@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tagging bigrams and other n-grams with part-of-speech tags in batches.
+"""
+from nltk.tag import PerceptronTagger
+
+from parallel import process_pool, shared, shards
+from profiling import stage
+
+# Tagger of the current process, loaded on first use.
+_TAGGER = None
+
+
+def _tagger():
+    """Returns the tagger of the current process, loads it only once."""
+    global _TAGGER
+    if _TAGGER is None:
+        # Same tagger nltk.pos_tag uses for english.
+        _TAGGER = PerceptronTagger()
+    return _TAGGER
+
+
+def _batches(iterable, size):
+    """Splits an iterable into lists with at most size elements."""
+    batch = []
+    for element in iterable:
+        batch.append(element)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _tag_isolated(batch):
+    """Tags every bigram in batch on its own.
+
+    Returns:
+        list:
+            Sets of tags, in the same order as batch.
+    """
+    tagged = _tagger().tag_sents([list(bigram) for bigram in batch])
+    return [{tag for word, tag in bigram} for bigram in tagged]
+
+
+def _tag_context(corpus, fileids, wanted, batch_size):
+    """Tags sentences of files and collects tags of wanted n-grams.
+
+    Wanted n-grams are usually bigrams, but can have any length.
+
+    Returns:
+        dict:
+            Keys are lowercased n-grams, values are sets of tags the
+            words of the n-gram had in any sentence.
+    """
+    tags = dict()
+    lengths = sorted({len(ngram) for ngram in wanted})
+    sents = (sent for fileid in fileids for sent in corpus.sents(fileid))
+    for batch in _batches(sents, batch_size):
+        for sent in _tagger().tag_sents(batch):
+            lowered = [word.lower() for word, tag in sent]
+            for n in lengths:
+                for start in range(len(sent) - n + 1):
+                    ngram = tuple(lowered[start:start + n])
+                    if ngram in wanted:
+                        tags.setdefault(ngram, set()).update(
+                            tag for word, tag in sent[start:start + n])
+    return tags
+
+
+def _tag_context_shared(fileids):
+    """Like _tag_context, with the other arguments shared by the pool."""
+    return _tag_context(shared("corpus"), fileids, shared("wanted"),
+                        shared("batch_size"))
+
+
+class BigramTagger:
+
+    BATCH_SIZE = 1000
+
+    """
+    A class that tags many bigrams at once.
+
+    The tagger is loaded only once per process and whole batches are
+    tagged with tag_sents. Batches can be spread across several processes.
+
+    Attributes:
+        context (bool):
+            If True, bigrams are tagged within the sentences they occur in.
+            If False, every bigram is tagged on its own, like
+            nltk.pos_tag(bigram) does.
+        workers (int):
+            Number of processes used for tagging.
+        batch_size (int):
+            Number of bigrams or sentences tagged in one call.
+
+    Methods:
+        tag(bigrams, corpus=None):
+            Get the tags of a collection of bigrams.
+    """
+
+    def __init__(self, context=False, workers=1, batch_size=None):
+        """Construct a BigramTagger instance.
+
+        Args:
+            context (bool):
+                Whether bigrams are tagged in the sentences of the corpus
+                instead of on their own. Default is False.
+            workers (int):
+                Number of processes used for tagging. Default is 1.
+            batch_size (int):
+                Number of bigrams or sentences per batch. If default is
+                used, BATCH_SIZE is used.
+
+        Returns:
+            None.
+        """
+        self.context = context
+        self.workers = max(1, workers)
+        self.batch_size = batch_size or self.BATCH_SIZE
+
+    def tag(self, bigrams, corpus=None):
+        """Get the tags of bigrams.
+
+        Args:
+            bigrams:
+                Iterable of lowercased bigrams (two-tuples of strings).
+                Tuples of other lengths are tagged the same way.
+            corpus:
+                A nltk corpus object, needed if bigrams are tagged in
+                context. Default is None.
+
+        Raises:
+            ValueError:
+                If bigrams should be tagged in context and no corpus
+                is given.
+
+        Returns:
+            dict:
+                Keys are bigrams, values are sets of tags. In context,
+                bigrams that only span the border of two sentences
+                have no tags.
+        """
+        bigrams = list(bigrams)
+        if self.context and corpus is None:
+            raise ValueError("Tagging in context needs a corpus.")
+        with stage("BigramTagger.tag") as counts:
+            counts["bigrams"] = len(bigrams)
+            if self.context:
+                return self._tag_in_context(set(bigrams), corpus)
+            batches = list(_batches(bigrams, self.batch_size))
+            counts["batches"] = len(batches)
+            if self.workers == 1 or len(batches) < 2:
+                tagged = map(_tag_isolated, batches)
+                return self._merge_isolated(batches, tagged)
+            with process_pool(self.workers) as pool:
+                tagged = pool.map(_tag_isolated, batches)
+                return self._merge_isolated(batches, tagged)
+
+    @staticmethod
+    def _merge_isolated(batches, tagged):
+        """Combines batches of bigrams with their tags to a dict."""
+        tags = dict()
+        for batch, batch_tags in zip(batches, tagged):
+            tags.update(zip(batch, batch_tags))
+        return tags
+
+    def _tag_in_context(self, wanted, corpus):
+        """Tags sentences of corpus, see tag()."""
+        fileids = list(corpus.fileids())
+        if self.workers == 1 or len(fileids) < 2:
+            return _tag_context(corpus, fileids, wanted, self.batch_size)
+        tags = dict()
+        with process_pool(self.workers, corpus=corpus, wanted=wanted,
+                          batch_size=self.batch_size) as pool:
+            for shard_tags in pool.map(_tag_context_shared,
+                                       shards(fileids, self.workers)):
+                for bigram, bigram_tags in shard_tags.items():
+                    tags.setdefault(bigram, set()).update(bigram_tags)
+        return tags
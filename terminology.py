@@ -5,10 +5,46 @@
 Extracting terminolgy from a corpus.
 """
 import csv
-import math
+import hashlib
+import json
 import os
 
-from preprocess import Preprocess
+import numpy as np
+
+from evaluation import Evaluation
+from parallel import process_pool, shared
+from profiling import stage
+
+
+def _evaluate_alpha(alpha, terms, relevance, consensus, thetas, golds):
+    """Evaluates the terms extracted with alpha and every theta.
+
+    Returns:
+        list:
+            One dict per theta with keys "alpha", "theta", "extracted"
+            (number of extracted terms), "precision", "recall" and "f1".
+    """
+    scores = alpha * relevance + (1 - alpha) * consensus
+    ranking = Terminology._ranking(scores)
+    sorted_scores = scores[ranking]
+    results = []
+    for theta in thetas:
+        top = ranking[:Terminology._above(sorted_scores, theta)].tolist()
+        evaluation = Evaluation({terms[i]: scores[i] for i in top}, golds)
+        results.append({"alpha": alpha,
+                        "theta": theta,
+                        "extracted": len(top),
+                        "precision": evaluation.precision(),
+                        "recall": evaluation.recall(),
+                        "f1": evaluation.f1()})
+    return results
+
+
+def _evaluate_alpha_shared(alpha):
+    """Like _evaluate_alpha, with other arguments shared by the pool."""
+    return _evaluate_alpha(alpha, shared("terms"), shared("relevance"),
+                           shared("consensus"), shared("thetas"),
+                           shared("golds"))
 
 
 class Terminology:
@@ -21,6 +57,8 @@ class Terminology:
                            ('speech', 'recognition'),
                            ('machine', 'learning')}
             }
+    # Version of the format of files written by save.
+    SCORES_VERSION = 1
 
     """
     A class for extracting terminolgy from a domain corpus.
@@ -29,13 +67,15 @@ class Terminology:
         domain:
             a Preprocess object of the domain corpus
         reference:
-            a Preprocess object of the reference corpus
+            a Preprocess or ReferenceIndex object of the reference corpus
         candidates:
             a set of bigrams (two-tuples of str) that could be terminology
         domain_relevance:
             a dict that contains relevance for each term in candidates
         domain_consensus:
             a dict that contains consensus for each term in candidates.
+        quiet:
+            whether progress messages are left out.
 
     Methods:
         weigh_candidates(alpha):
@@ -46,42 +86,151 @@ class Terminology:
         write_csv(alpha, theta, filename):
             Write a csv file with each candidate, its value
             when weighed by alpha and whether its terminology or not.
+        weigh_grid(alphas):
+            Weighs all candidates by many alphas at once.
+        grid(alphas, thetas):
+            Weighs, ranks and extracts terms for many settings at once.
+        write_csv_grid(alphas, thetas, pattern):
+            Write a csv file for every setting.
+        evaluate_grid(alphas, thetas, golds, workers=1):
+            Evaluate extracted terms of every setting against gold terms.
+        terms():
+            Candidates in the order used by arrays.
+        add_documents(fileids):
+            Add files to the domain corpus and update weights.
+        remove_documents(fileids):
+            Remove files from the domain corpus and update weights.
+        key():
+            Digest of both corpora and the candidates.
+        save(filename):
+            Write relevance, consensus and counts to a file.
+        load(filename, key=None):
+            Read a Terminology object written by save.
         demo():
             Get a demo of key methods.
     """
 
-    def __init__(self, domain, reference, candidates):
+    def __init__(self, domain, reference, candidates, cache=None,
+                 workers=1, backend="freqdist", quiet=False):
         """Construct a Terminolgy instance.
 
         Args:
             domain:
                 A corpus with texts from a specific domain.
-                Can either be a path to a directory with text files or
-                a nltk corpus object.
+                Can either be a path to a directory with text files,
+                a nltk corpus object or a Preprocess object.
             reference:
                 A corpus with texts from a neutral domain.
-                Can either be a path to a directory with text files or
-                a nltk corpus object.
+                Can either be a path to a directory with text files,
+                a nltk corpus object, a Preprocess object or a
+                ReferenceIndex object.
             candidates:
                 A set of bigrams (two-tuples of strings) that could be
-                considered terminology.
+                considered terminology. N-grams of other lengths can be
+                mixed in, see Preprocess.get_frequency.
+            cache:
+                A CountCache object or the name of a directory for one,
+                used for both corpora. Default is None, no cache is used.
+            workers (int):
+                Number of processes used for counting the corpora.
+                Default is 1.
+            backend (str):
+                How bigrams of both corpora are stored, see Preprocess.
+                Default is "freqdist".
+            quiet (bool):
+                If True, no progress messages are printed.
+                Default is False.
 
         Returns:
             None.
         """
-        self.domain = Preprocess(domain)
-        self.reference = Preprocess(reference)
+        self.quiet = quiet
+        self.domain = self._preprocess(domain, cache, workers, backend)
+        # Only frequencies in the whole reference corpus are needed.
+        self.reference = self._preprocess(reference, cache, workers,
+                                          backend, per_file=False)
         self.candidates = set(candidates)
+        # Fixed order of candidates, for arrays of values.
+        self._terms = list(self.candidates)
         self.domain_relevance = self._domain_relevance()
         self.domain_consensus = self._domain_consensus()
 
+    @staticmethod
+    def _preprocess(corpus, cache, workers, backend, per_file=True):
+        """Returns corpus as a Preprocess object.
+
+        ReferenceIndex objects are returned as they are.
+        """
+        # Only needed for corpora, loading saved scores doesn't import
+        # nltk.
+        from preprocess import Preprocess
+        from refindex import ReferenceIndex
+        if isinstance(corpus, (Preprocess, ReferenceIndex)):
+            return corpus
+        return Preprocess(corpus, cache=cache, per_file=per_file,
+                          workers=workers, backend=backend)
+
     @staticmethod
     def _probability(freq, freq_sum):
-        """Returns probabilty by dividing freq by freq_sum"""
+        """Returns array of probabilities by dividing freq by freq_sum"""
         if freq_sum == 0:
-            return 0
+            return np.zeros(len(freq))
         return freq / freq_sum
 
+    @classmethod
+    def _relevance_vector(cls, freq_dom, freq_ref):
+        """Computes domain relevance for arrays of frequencies.
+
+        Args:
+            freq_dom (numpy.ndarray):
+                Frequency of terms in domain corpus.
+            freq_ref (numpy.ndarray):
+                Frequency of terms in reference corpus.
+
+        Returns:
+            numpy.ndarray:
+                Domain relevance of terms, 0 if a term occurs in neither
+                corpus.
+        """
+        prob_dom = cls._probability(freq_dom, freq_dom.sum())
+        prob_ref = cls._probability(freq_ref, freq_ref.sum())
+        prob_sum = prob_dom + prob_ref
+        relevance = np.zeros(len(freq_dom))
+        np.divide(prob_dom, prob_sum, out=relevance, where=prob_sum != 0)
+        return relevance
+
+    @staticmethod
+    def _consensus_vector(rows, counts, size):
+        """Computes domain consensus from a sparse matrix of frequencies.
+
+        Args:
+            rows (numpy.ndarray):
+                Row (term) of every entry of the matrix.
+            counts (numpy.ndarray):
+                Frequency of the term in a file for every entry.
+            size (int):
+                Number of terms.
+
+        Returns:
+            numpy.ndarray:
+                Entropy of the distribution of each term over files.
+        """
+        if len(rows) == 0:
+            return np.zeros(size)
+        # Sum of frequency of a term.
+        row_sums = np.bincount(rows, weights=counts, minlength=size)
+        # Divide frequency of a term in a file by sum of freq.
+        probs = counts / row_sums[rows]
+        # Entries are summed up per term in order of files.
+        return np.bincount(rows, weights=probs * np.log(1 / probs),
+                           minlength=size)
+
+    def _frequency_vector(self, corpus):
+        """Returns array of frequencies of self._terms in corpus."""
+        freq = corpus.get_frequency(self._terms)
+        return np.array([freq.get(term, 0) for term in self._terms],
+                        dtype=np.int64)
+
     def _domain_relevance(self):
         """
         Computes domain relevance for each term in self.candidates.
@@ -90,31 +239,25 @@ class Terminology:
         divided by sum of probability in domain corpus and its probability in
         reference corpus.
 
+        Frequencies of all candidates are looked up once and relevance
+        is computed for all of them at once.
+
         Returns:
             dict:
                 Keys are bigrams, values are domain relevance of that term.
                 1 means bigram only occurs in domain, <0.5 means bigrams
                 occurs more often in reference.
         """
-        print("Computing domain relevance...")
-        domain_relevance = dict()
-        # Get frequency of candidates in domain and reference.
-        freq_dom = self.domain.get_frequency(self.candidates)
-        freq_ref = self.reference.get_frequency(self.candidates)
-        # Sum of frequency of all candidate in corpora.
-        sum_dom = sum(freq_dom[bigram] for bigram in freq_dom)
-        sum_ref = sum(freq_ref[bigram] for bigram in freq_ref)
-        for candidate in self.candidates:
-            # Get probabilty of a term.
-            prob_ref = self._probability(freq_ref.get(candidate, 0), sum_ref)
-            prob_dom = self._probability(freq_dom.get(candidate, 0), sum_dom)
-            # Set relevance.
-            if prob_dom == 0 and prob_ref == 0:
-                term_relevance = 0
-            else:
-                term_relevance = prob_dom / (prob_dom + prob_ref)
-            domain_relevance[candidate] = term_relevance
-        return domain_relevance
+        if not self.quiet:
+            print("Computing domain relevance...")
+        with stage("Terminology.domain_relevance") as counts:
+            counts["candidates"] = len(self._terms)
+            # Get frequency of candidates in domain and reference.
+            self._freq_dom = self._frequency_vector(self.domain)
+            self._freq_ref = self._frequency_vector(self.reference)
+            self._relevance = self._relevance_vector(self._freq_dom,
+                                                     self._freq_ref)
+        return dict(zip(self._terms, self._relevance.tolist()))
 
     def _domain_consensus(self):
         """
@@ -123,32 +266,122 @@ class Terminology:
         Domain consensus of a term is defined as entropy of
         probabilty of distribution of term over all documents.
 
+        Frequencies of candidates in files are collected once in a sparse
+        candidate by document matrix, see Preprocess.frequency_matrix.
+
         Returns:
             dict:
                 keys are the bigrams, values is the domain consensus.
         """
-        print("Computing domain consensus...")
-        domain_consensus = dict()
-        files = {term: dict() for term in self.candidates}
-        for file in self.domain.corpus.fileids():
-            # Get frequency of candidates in file.
-            cand_freq = self.domain.get_frequency(self.candidates, file)
-            # For each candidate set frequency in file.
-            for term in cand_freq:
-                files[term][file] = cand_freq[term]
-        for term in files:
-            # Sum of frequency of a term.
-            sum_files = sum(files[term][file] for file in files[term])
-            for file in files[term]:
-                # Divide frequency of a term in a file by sum of freq.
-                files[term][file] = self._probability(files[term][file],
-                                                      sum_files)
-            # Compute entropy of distribution for a term.
-            cons = sum(files[term][doc] * math.log(1/files[term][doc])
-                       if files[term][doc] != 0 else 0
-                       for doc in files[term])
-            domain_consensus[term] = cons
-        return domain_consensus
+        if not self.quiet:
+            print("Computing domain consensus...")
+        with stage("Terminology.domain_consensus") as stats:
+            # Files of the columns of the matrix.
+            self._columns = self.domain.fileids()
+            self._matrix = self.domain.frequency_matrix(self._terms,
+                                                        self._columns)
+            rows, _, counts = self._matrix
+            self._consensus = self._consensus_vector(rows, counts,
+                                                     len(self._terms))
+            stats["candidates"] = len(self._terms)
+            stats["documents"] = len(self._columns)
+            stats["matrix_entries"] = len(rows)
+        return dict(zip(self._terms, self._consensus.tolist()))
+
+    def add_documents(self, fileids):
+        """Add files to the domain corpus and update relevance and consensus.
+
+        Only the new files are counted, see Preprocess.add_documents.
+        Consensus is computed again only for candidates that occur in
+        the new files.
+
+        Args:
+            fileids (list):
+                Ids of files, relative to the root of the domain corpus.
+
+        Raises:
+            ValueError:
+                If a file is already in the domain corpus.
+
+        Returns:
+            None.
+        """
+        fileids = list(fileids)
+        self.domain.add_documents(fileids)
+        self._update(added=fileids)
+
+    def remove_documents(self, fileids):
+        """Remove files from the domain corpus and update relevance and
+        consensus.
+
+        Consensus is computed again only for candidates that occured in
+        the removed files, see Preprocess.remove_documents.
+
+        Args:
+            fileids (list):
+                Ids of files in the domain corpus.
+
+        Raises:
+            ValueError:
+                If a file is not in the domain corpus or its bigrams
+                weren't kept, see Preprocess.remove_documents.
+
+        Returns:
+            None.
+        """
+        self.domain.remove_documents(fileids)
+        self._update()
+
+    def _update(self, added=()):
+        """Updates relevance and consensus after files of domain changed.
+
+        Args:
+            added (list):
+                Ids of files that were added to domain.
+
+        Returns:
+            None.
+        """
+        self._freq_dom = self._frequency_vector(self.domain)
+        self._relevance = self._relevance_vector(self._freq_dom,
+                                                 self._freq_ref)
+        self.domain_relevance = dict(zip(self._terms,
+                                         self._relevance.tolist()))
+        fileids = self.domain.fileids()
+        position = {fileid: column for column, fileid in enumerate(fileids)}
+        # New column of every old column, -1 for removed files.
+        mapping = np.array([position.get(fileid, -1)
+                            for fileid in self._columns], dtype=np.int64)
+        rows, columns, counts = self._matrix
+        columns = mapping[columns]
+        kept = columns >= 0
+        touched = [rows[~kept]]
+        rows, columns, counts = rows[kept], columns[kept], counts[kept]
+        # Files keep their order, so columns are still sorted.
+        new_rows, new_columns, new_counts = self.domain.frequency_matrix(
+            self._terms, added)
+        new_columns = np.array([position[fileid] for fileid in added],
+                               dtype=np.int64)[new_columns]
+        order = np.argsort(new_columns, kind="stable")
+        new_rows = new_rows[order]
+        new_columns = new_columns[order]
+        new_counts = new_counts[order]
+        touched.append(new_rows)
+        index = np.searchsorted(columns, new_columns)
+        self._matrix = (np.insert(rows, index, new_rows),
+                        np.insert(columns, index, new_columns),
+                        np.insert(counts, index, new_counts))
+        self._columns = fileids
+        # Consensus of a term only depends on its own row.
+        touched = np.unique(np.concatenate(touched))
+        rows, _, counts = self._matrix
+        mask = np.isin(rows, touched)
+        consensus = self._consensus_vector(rows[mask], counts[mask],
+                                           len(self._terms))
+        self._consensus = self._consensus.copy()
+        self._consensus[touched] = consensus[touched]
+        self.domain_consensus = dict(zip(self._terms,
+                                         self._consensus.tolist()))
 
     def weigh_candidates(self, alpha):
         """
@@ -171,19 +404,112 @@ class Terminology:
                 Keys are candidates, values is value of weighing consensus
                 and relevance.
         """
+        self._check_alpha(alpha)
+        # Get value by weighing relevance and consensus of each candidate.
+        values = self.weigh_grid([alpha])[0]
+        return dict(zip(self._terms, values.tolist()))
+
+    @staticmethod
+    def _check_alpha(alpha):
+        """Raises ValueError if alpha isn't between 0 and 1."""
         try:
             # Make sure alpha has appropiate value.
             assert alpha >= 0 and alpha <= 1, "Alpha should range from 0 to 1"
         except AssertionError as err:
             raise ValueError(err)
-        terms = dict()
-        for candidate in self.candidates:
-            # Get value by weighing relevance and consensus of
-            # each candidate.
-            value = (alpha * self.domain_relevance[candidate]
-                     + (1-alpha)*self.domain_consensus[candidate])
-            terms[candidate] = value
-        return terms
+
+    @staticmethod
+    def _check_theta(theta):
+        """Raises ValueError if theta is negative."""
+        try:
+            assert theta >= 0, "Theta needs to be positive."
+        except AssertionError as err:
+            raise ValueError(err)
+
+    def weigh_grid(self, alphas):
+        """Weighs relevance and consensus of all candidates by many alphas.
+
+        Args:
+            alphas:
+                Iterable of floats between 0 and 1, see weigh_candidates.
+
+        Raises:
+            ValueError:
+                If an alpha isn't between 0 and 1.
+
+        Returns:
+            numpy.ndarray:
+                Array with one row for every alpha and one column for every
+                candidate, in the order of self.terms().
+        """
+        alphas = np.asarray(list(alphas), dtype=float)
+        for alpha in alphas:
+            self._check_alpha(alpha)
+        alphas = alphas[:, np.newaxis]
+        return alphas * self._relevance + (1 - alphas) * self._consensus
+
+    def terms(self):
+        """Returns list of candidates in the order used by arrays."""
+        return list(self._terms)
+
+    @staticmethod
+    def _ranking(scores):
+        """Returns indices that sort scores in descending order.
+
+        Equal scores keep their order, like sorted(..., reverse=True).
+        """
+        return np.argsort(-scores, kind="stable")
+
+    @staticmethod
+    def _above(sorted_scores, theta):
+        """Returns how many of the descending scores exceed theta."""
+        return int(np.searchsorted(-sorted_scores, -theta, side="left"))
+
+    def grid(self, alphas, thetas):
+        """Weighs and extracts terminology for many settings at once.
+
+        Candidates are sorted once per alpha, the terms extracted for a
+        theta are the candidates ranked before the first score that doesn't
+        exceed theta.
+
+        Args:
+            alphas:
+                Iterable of floats between 0 and 1.
+            thetas:
+                Iterable of positive floats.
+
+        Raises:
+            ValueError:
+                If an alpha isn't between 0 and 1 or
+                if a theta is negative.
+
+        Returns:
+            dict:
+                "terms": list of candidates, the order of columns,
+                "scores": array of weighted values, one row per alpha,
+                "rankings": array of column indices, each row sorts
+                the scores of an alpha in descending order,
+                "extracted": dict with (alpha, theta) tuples as keys and
+                sets of extracted terms as values.
+        """
+        alphas = list(alphas)
+        thetas = list(thetas)
+        for theta in thetas:
+            self._check_theta(theta)
+        scores = self.weigh_grid(alphas)
+        rankings = np.empty(scores.shape, dtype=np.int64)
+        extracted = dict()
+        for row, alpha in enumerate(alphas):
+            rankings[row] = self._ranking(scores[row])
+            sorted_scores = scores[row][rankings[row]]
+            for theta in thetas:
+                top = rankings[row][:self._above(sorted_scores, theta)]
+                extracted[alpha, theta] = {self._terms[i]
+                                           for i in top.tolist()}
+        return {"terms": self.terms(),
+                "scores": scores,
+                "rankings": rankings,
+                "extracted": extracted}
 
     @staticmethod
     def extract_terminology(theta, weighted_candidates):
@@ -235,28 +561,252 @@ class Terminology:
                 Keys are the final extraced terminology, values are value of
                 decision function.
         """
+        self._check_theta(theta)
+        scores = self.weigh_grid([alpha])[0]
+        self._write_setting(filename, alpha, theta, scores,
+                            self._ranking(scores))
+
+    def _write_setting(self, filename, alpha, theta, scores, ranking):
+        """Writes weighted candidates of one setting to a csv file.
+
+        Args:
+            filename (str):
+                Name of the output file.
+            alpha (float):
+                Value of alpha, written to the first line.
+            theta (float):
+                Value of theta, written to the second line.
+            scores (numpy.ndarray):
+                Weighted values of candidates, in the order of self.terms().
+            ranking (numpy.ndarray):
+                Indices that sort scores in descending order.
+
+        Returns:
+            None.
+        """
         filename = os.path.join(filename)
-        weighted = self.weigh_candidates(alpha)
-        terms = self.extract_terminology(theta, weighted)
-        sort_weighted = sorted(weighted,
-                               key=lambda x: weighted[x],
-                               reverse=True)
-        with open(filename, "w", encoding="utf-8", newline="") as file:
+        values = scores[ranking]
+        # Is bigram considered terminology or not.
+        above = self._above(values, theta)
+        with stage("Terminology.write_csv") as counts, \
+                open(filename, "w", encoding="utf-8", newline="") as file:
+            counts["candidates"] = len(values)
+            counts["extracted"] = above
             csv_writer = csv.writer(file, delimiter=";")
             csv_writer.writerow(["alpha", alpha])
             csv_writer.writerow(["theta", theta])
-            for wordi, wordj in sort_weighted:
-                bigram = "{} {}".format(wordi, wordj)
-                value = weighted[wordi, wordj]
-                extracted = False
-                # Is bigram considered terminology or not.
-                if (wordi, wordj) in terms:
-                    extracted = True
-                csv_writer.writerow([bigram,
+            for rank, (index, value) in enumerate(zip(ranking.tolist(),
+                                                      values.tolist())):
+                csv_writer.writerow([" ".join(self._terms[index]),
                                      value,
-                                     extracted])
+                                     rank < above])
         print("Success: Terms written to '{}'".format(filename))
 
+    def write_csv_grid(self, alphas, thetas, pattern):
+        """Write one csv file for every combination of alpha and theta.
+
+        Files have the same format as files written by write_csv.
+        Candidates are weighed and sorted only once per alpha.
+
+        Args:
+            alphas:
+                Iterable of floats between 0 and 1.
+            thetas:
+                Iterable of positive floats.
+            pattern (str):
+                Name of the output files, "{alpha}" and "{theta}" are
+                replaced by the values of a setting,
+                e.g. "out/terms_{alpha}_{theta}.csv".
+
+        Raises:
+            ValueError:
+                If an alpha isn't between 0 and 1,
+                if a theta is negative or
+                if pattern doesn't contain both placeholders.
+
+        Returns:
+            list:
+                Names of the written files.
+        """
+        if "{alpha}" not in pattern or "{theta}" not in pattern:
+            raise ValueError("Pattern needs placeholders "
+                             "'{alpha}' and '{theta}'.")
+        alphas = list(alphas)
+        thetas = list(thetas)
+        for theta in thetas:
+            self._check_theta(theta)
+        filenames = []
+        for alpha, scores in zip(alphas, self.weigh_grid(alphas)):
+            ranking = self._ranking(scores)
+            for theta in thetas:
+                filename = pattern.format(alpha=alpha, theta=theta)
+                self._write_setting(filename, alpha, theta, scores,
+                                    ranking)
+                filenames.append(filename)
+        return filenames
+
+    def evaluate_grid(self, alphas, thetas, golds, workers=1):
+        """Evaluate the extracted terms of every setting.
+
+        Terms are extracted and compared to the gold standard in memory,
+        see Evaluation. Alphas can be spread across several processes.
+
+        Args:
+            alphas:
+                Iterable of floats between 0 and 1.
+            thetas:
+                Iterable of positive floats.
+            golds:
+                Iterable of gold standard bigrams (two-tuples of strings).
+            workers (int):
+                Number of processes. Default is 1.
+
+        Raises:
+            ValueError:
+                If an alpha isn't between 0 and 1,
+                if a theta is negative or
+                if golds are empty.
+
+        Returns:
+            list:
+                One dict per setting, ordered by alpha and then by theta.
+                Keys are "alpha", "theta", "extracted" (number of
+                extracted terms), "precision", "recall" and "f1".
+        """
+        alphas = list(alphas)
+        thetas = list(thetas)
+        golds = set(golds)
+        for alpha in alphas:
+            self._check_alpha(alpha)
+        for theta in thetas:
+            self._check_theta(theta)
+        if not golds:
+            raise ValueError("Gold standard must contain at least one element")
+        if workers <= 1 or len(alphas) < 2:
+            per_alpha = [_evaluate_alpha(alpha, self._terms, self._relevance,
+                                         self._consensus, thetas, golds)
+                         for alpha in alphas]
+        else:
+            with process_pool(workers,
+                              terms=self._terms,
+                              relevance=self._relevance,
+                              consensus=self._consensus,
+                              thetas=thetas,
+                              golds=golds) as pool:
+                per_alpha = list(pool.map(_evaluate_alpha_shared, alphas))
+        return [result for results in per_alpha for result in results]
+
+    @staticmethod
+    def _candidates_hash(terms):
+        """Returns a digest of a set of candidates, order doesn't matter."""
+        digest = hashlib.sha256()
+        for term in sorted(" ".join(term) for term in terms):
+            digest.update("{}\n".format(term).encode("utf-8"))
+        return digest.hexdigest()
+
+    def key(self):
+        """Get a digest of both corpora and the candidates.
+
+        The key changes whenever a file of a corpus changes, the corpora
+        are counted with other settings or the candidates change, see
+        Preprocess.fingerprint.
+
+        Returns:
+            str:
+                Hexadecimal digest or None if a corpus can't be
+                fingerprinted.
+        """
+        if self.domain is None:
+            return self._key
+        fingerprints = [self.domain.fingerprint(),
+                        self.reference.fingerprint()]
+        if None in fingerprints:
+            return None
+        fingerprints.append(self._candidates_hash(self._terms))
+        return hashlib.sha256("\n".join(fingerprints).encode(
+            "utf-8")).hexdigest()
+
+    def save(self, filename):
+        """Write relevance, consensus and the counts behind them to a file.
+
+        The file is a numpy .npz archive with the key of the corpora and
+        candidates, see key(). A Terminology object read with load can
+        weigh candidates and write csv files without the corpora.
+
+        Args:
+            filename (str):
+                Name of the file.
+
+        Returns:
+            None.
+        """
+        rows, columns, counts = self._matrix
+        meta = {"version": self.SCORES_VERSION,
+                "key": self.key(),
+                "terms": [list(term) for term in self._terms],
+                "columns": list(self._columns)}
+        with stage("Terminology.save") as stats, \
+                open(filename, "wb") as file:
+            stats["candidates"] = len(self._terms)
+            np.savez(file,
+                     meta=np.array(json.dumps(meta)),
+                     relevance=self._relevance,
+                     consensus=self._consensus,
+                     freq_dom=self._freq_dom,
+                     freq_ref=self._freq_ref,
+                     rows=rows, columns=columns, counts=counts)
+        print("Success: Scores written to '{}'".format(filename))
+
+    @classmethod
+    def load(cls, filename, key=None):
+        """Read a Terminology object written by save.
+
+        The object has no corpora, domain and reference are None. All
+        methods that weigh, extract, write or evaluate candidates can be
+        used, documents can't be added or removed.
+
+        Args:
+            filename (str):
+                Name of a file written by save.
+            key (str):
+                If given, the key the file should have, see key().
+                Default is None, any file is read.
+
+        Raises:
+            ValueError:
+                If the file has another format version or key.
+
+        Returns:
+            Terminology
+        """
+        with np.load(filename, allow_pickle=False) as archive:
+            meta = json.loads(str(archive["meta"]))
+            if meta["version"] != cls.SCORES_VERSION:
+                raise ValueError("'{}' was written by another version."
+                                 .format(filename))
+            if key is not None and meta["key"] != key:
+                raise ValueError("'{}' was written for other corpora or "
+                                 "candidates.".format(filename))
+            term_obj = cls.__new__(cls)
+            term_obj.quiet = False
+            term_obj.domain = None
+            term_obj.reference = None
+            term_obj._key = meta["key"]
+            term_obj._terms = [tuple(term) for term in meta["terms"]]
+            term_obj.candidates = set(term_obj._terms)
+            term_obj._columns = meta["columns"]
+            term_obj._relevance = archive["relevance"]
+            term_obj._consensus = archive["consensus"]
+            term_obj._freq_dom = archive["freq_dom"]
+            term_obj._freq_ref = archive["freq_ref"]
+            term_obj._matrix = (archive["rows"], archive["columns"],
+                                archive["counts"])
+        term_obj.domain_relevance = dict(zip(term_obj._terms,
+                                             term_obj._relevance.tolist()))
+        term_obj.domain_consensus = dict(zip(term_obj._terms,
+                                             term_obj._consensus.tolist()))
+        return term_obj
+
     @classmethod
     def demo(cls):
         """Demo for key functionalities of Terminology class"""
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for the benchmarks.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmark import generate_corpus, main, run_scale
+
+
+class TestCaseBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+        self.settings = {"documents": 3, "tokens": 600, "vocabulary": 50}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp)
+
+    def _read(self, filenames):
+        contents = []
+        for filename in filenames:
+            with open(filename, encoding="utf-8") as file:
+                contents.append(file.read())
+        return contents
+
+    def test_generate_corpus_seeded(self):
+        first = generate_corpus(os.path.join(self.temp, "a"), seed=3,
+                                **self.settings)
+        second = generate_corpus(os.path.join(self.temp, "b"), seed=3,
+                                 **self.settings)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(self._read(first), self._read(second))
+
+    def test_run_scale_stages(self):
+        stages = run_scale(self.temp, self.settings, tags=(), memory=True)
+        self.assertEqual(list(stages), ["Preprocess._count", "candidates",
+                                        "bigrams(fileid)",
+                                        "_domain_relevance",
+                                        "_domain_consensus",
+                                        "weigh_candidates", "write_csv",
+                                        "Evaluation.from_file"])
+        for stats in stages.values():
+            self.assertGreaterEqual(stats["seconds"], 0)
+            self.assertGreater(stats["peak_bytes"], 0)
+
+    def test_main_writes_json(self):
+        out = os.path.join(self.temp, "results.json")
+        main(["--tags", "--no-memory", "--out", out])
+        with open(out, encoding="utf-8") as file:
+            results = json.load(file)
+        self.assertEqual(results["scales"][0]["scale"], "small")
+        self.assertIsNone(results["scales"][0]["stages"]["candidates"]
+                          ["peak_bytes"])
+
+    def test_main_overrides_scale(self):
+        out = os.path.join(self.temp, "results.json")
+        main(["--tags", "--no-memory", "--out", out, "--documents", "3",
+              "--tokens", "600", "--vocabulary", "50"])
+        with open(out, encoding="utf-8") as file:
+            results = json.load(file)
+        self.assertEqual(results["scales"][0]["scale"], "small")
+        self.assertEqual(results["scales"][0]["settings"], self.settings)
+
+    def test_main_error_non_positive_override(self):
+        with self.assertRaises(SystemExit):
+            main(["--documents", "0",
+                  "--out", os.path.join(self.temp, "results.json")])
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Unittests for the Vocabulary, BigramTable and TableBuilder classes.
+"""
+import unittest
+
+import numpy as np
+from nltk import bigrams
+from nltk.probability import FreqDist
+
+from bigramtable import BigramTable, TableBuilder, Vocabulary
+
+
+class TestCaseBigramTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.words = "the text mining of the text is the text".split()
+        cls.vocabulary = Vocabulary()
+        cls.table = BigramTable.from_ids(cls.vocabulary.encode(cls.words),
+                                         cls.vocabulary)
+        cls.freq = FreqDist(bigrams(cls.words))
+
+    def test_vocabulary_ids_in_order(self):
+        vocabulary = Vocabulary()
+        self.assertListEqual(vocabulary.encode(["b", "a", "b"]).tolist(),
+                             [0, 1, 0])
+        self.assertListEqual(vocabulary.words(), ["b", "a"])
+
+    def test_vocabulary_unknown_word(self):
+        self.assertEqual(self.vocabulary.encode(["unknown"],
+                                                add=False).tolist(),
+                         [-1])
+
+    def test_same_counts_as_freqdist(self):
+        self.assertEqual(self.table, self.freq)
+        self.assertEqual(len(self.table), len(self.freq))
+
+    def test_getitem_missing_bigram(self):
+        self.assertEqual(self.table["text", "the"], 0)
+        self.assertEqual(self.table["unknown", "the"], 0)
+
+    def test_contains(self):
+        self.assertIn(("the", "text"), self.table)
+        self.assertNotIn(("text", "the"), self.table)
+
+    def test_frequencies(self):
+        self.assertDictEqual(self.table.frequencies([("the", "text"),
+                                                     ("text", "the"),
+                                                     ("unknown", "text")]),
+                             {("the", "text"): 3})
+
+    def test_most_common(self):
+        self.assertEqual(self.table.most_common(1), [(("the", "text"), 3)])
+
+    def test_frequent(self):
+        self.assertEqual(self.table.frequent(2), [(("the", "text"), 3)])
+        allowed = np.array([word in {"mining", "of"}
+                            for word in self.vocabulary.words()])
+        self.assertEqual(self.table.frequent(1, allowed),
+                         [(("mining", "of"), 1)])
+
+    def test_n(self):
+        self.assertEqual(self.table.N(), len(self.words) - 1)
+
+    def test_builder_sums_tables(self):
+        builder = TableBuilder(self.vocabulary)
+        builder.update(self.table)
+        builder.update(self.table)
+        builder.update({("text", "the"): 1})
+        summed = builder.table()
+        self.assertEqual(summed["the", "text"], 6)
+        self.assertEqual(summed["text", "the"], 1)
+
+    def test_builder_subtract_drops_zero_counts(self):
+        builder = TableBuilder(self.vocabulary)
+        builder.update(self.table)
+        builder.subtract(self.table)
+        self.assertEqual(len(builder.table()), 0)
+
+    def test_builder_compactions_grow_geometrically(self):
+        class Builder(TableBuilder):
+            LIMIT = 64
+            compactions = 0
+
+            def _compact(self):
+                Builder.compactions += 1
+                super()._compact()
+
+        vocabulary = Vocabulary()
+        builder = Builder(vocabulary)
+        # Every table has new bigrams, merged tables keep growing.
+        for start in range(0, 64000, 32):
+            keys = np.arange(start, start + 32, dtype=np.int64)
+            builder.update(BigramTable(keys, np.ones(32, dtype=np.int64),
+                                       vocabulary))
+        self.assertLessEqual(Builder.compactions, 12)
+        self.assertEqual(len(builder.table()), 64000)
+
+    def test_merge(self):
+        builder = TableBuilder(self.vocabulary)
+        builder.update({("text", "the"): 2})
+        builder.subtract(self.table)
+        builder.update({("the", "text"): 1})
+        merged = self.table.merge(builder.table())
+        self.assertDictEqual(dict(merged.items()),
+                             {("the", "text"): 1, ("text", "the"): 2})
+
+    def test_remap(self):
+        vocabulary = Vocabulary()
+        vocabulary.encode(["is", "text"])
+        mapping = vocabulary.encode(self.vocabulary.words())
+        self.assertEqual(self.table.remap(mapping, vocabulary), self.freq)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Unittests for the CountCache class.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+
+from cache import CountCache, LRUDict
+
+
+class TestCaseCountCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+        self.corpus_dir = os.path.join(self.temp, "corpus")
+        shutil.copytree("demo/domain", self.corpus_dir)
+        self.corpus = PlaintextCorpusReader(self.corpus_dir, r".*\.txt")
+        self.cache = CountCache(os.path.join(self.temp, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp)
+
+    def test_key_stable(self):
+        self.assertEqual(self.cache.key(self.corpus),
+                         self.cache.key(self.corpus))
+
+    def test_key_depends_on_settings(self):
+        self.assertNotEqual(self.cache.key(self.corpus, lowercase=True),
+                            self.cache.key(self.corpus, lowercase=False))
+
+    def test_key_changes_with_file(self):
+        before = self.cache.key(self.corpus)
+        with open(os.path.join(self.corpus_dir, "domain1.txt"), "a",
+                  encoding="utf-8") as file:
+            file.write("more text\n")
+        self.assertNotEqual(before, self.cache.key(self.corpus))
+
+    def test_key_hash_contents_ignores_mtime(self):
+        cache = CountCache(self.cache.directory, hash_contents=True)
+        before = cache.key(self.corpus)
+        os.utime(os.path.join(self.corpus_dir, "domain1.txt"), (0, 0))
+        self.assertEqual(before, cache.key(self.corpus))
+
+    def test_load_missing_entry(self):
+        self.assertIsNone(self.cache.load("missing"))
+
+    def test_save_and_load(self):
+        self.cache.save("key", {"bigrams": {("a", "b"): 1}})
+        self.assertDictEqual(self.cache.load("key"),
+                             {"bigrams": {("a", "b"): 1}})
+
+    def test_clear(self):
+        self.cache.save("key", {})
+        self.cache.clear()
+        self.assertIsNone(self.cache.load("key"))
+
+
+class TestCaseLRUDict(unittest.TestCase):
+
+    def test_maxsize_not_positive(self):
+        self.assertRaises(ValueError, LRUDict, 0)
+
+    def test_least_recently_used_removed(self):
+        lru = LRUDict(2)
+        lru["a"] = 1
+        lru["b"] = 2
+        lru["a"]
+        lru["c"] = 3
+        self.assertListEqual(list(lru), ["a", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -49,6 +49,30 @@ class TestCaseEvaluation(unittest.TestCase):
         self.assertEqual(len(self.eval.lowest_scored(n=1)),
                          1)
 
+    def test_scored_mixed_lengths(self):
+        evaluation = Evaluation(terms={("translation",): 0.9,
+                                       ("machine", "translation"): 0.4,
+                                       ("statistical", "machine",
+                                        "translation"): 0.1},
+                                golds={("translation",)})
+        self.assertListEqual(evaluation.highest_scored(n=2),
+                             [("translation",),
+                              ("machine", "translation")])
+        self.assertListEqual(evaluation.lowest_scored(n=1),
+                             [("statistical", "machine", "translation")])
+
+    def test_scored_ties_same_as_sorted(self):
+        terms = {("a", str(i)): (i * 7) % 5 for i in range(40)}
+        evaluation = Evaluation(terms, golds={("a", "1")})
+        descending = sorted(terms, key=terms.get, reverse=True)
+        ascending = sorted(terms, key=terms.get)
+        # First query uses a heap, the others a cached order.
+        for n in (3, 3, 10, 0, 40, 100, -5):
+            self.assertListEqual(evaluation.highest_scored(n),
+                                 descending[:n])
+            self.assertListEqual(evaluation.lowest_scored(n),
+                                 ascending[:n])
+
     def test_correct_terms_type(self):
         self.assertIsInstance(self.eval.correct_terms, set)
 
@@ -90,6 +114,33 @@ class TestCaseEvaluation(unittest.TestCase):
                           goldfile=self.gold_file)
         os.remove(temp)
 
+    def test_from_file_without_terms_same_metrics(self):
+        kept = Evaluation.from_file(self.gold_file, self.terms_file)
+        counted = Evaluation.from_file(self.gold_file, self.terms_file,
+                                       keep_terms=False)
+        self.assertEqual(counted.n_terms, len(kept.terms))
+        self.assertEqual(counted.correct_terms, kept.correct_terms)
+        self.assertEqual(counted.precision(), kept.precision())
+        self.assertEqual(counted.f1(), kept.f1())
+
+    def test_from_file_in_chunks(self):
+        temp = "test_chunks.csv"
+        with open(temp, "w", encoding="utf-8") as tempfile:
+            tempfile.write("alpha;0.5\ntheta;1\n")
+            for i in range(1000):
+                tempfile.write("w{} x;{};{}\n".format(i, i, i % 2 == 0))
+            tempfile.write('"w ""quoted""";1.5;True\n')
+        chunk_size = Evaluation.CHUNK_SIZE
+        try:
+            Evaluation.CHUNK_SIZE = 100
+            eval_file = Evaluation.from_file(self.gold_file, temp)
+        finally:
+            Evaluation.CHUNK_SIZE = chunk_size
+            os.remove(temp)
+        self.assertEqual(len(eval_file.terms), 501)
+        self.assertEqual(eval_file.terms["w998", "x"], 998)
+        self.assertEqual(eval_file.terms["w", '"quoted"'], 1.5)
+
 
 if __name__ == "__main__":
     unittest.main(buffer=True)
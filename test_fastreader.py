@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for tokenizing plaintext corpora with a FastReader.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+from nltk.tokenize import WhitespaceTokenizer
+
+from fastreader import FastReader
+from preprocess import Preprocess
+
+
+class SmallBlocks(FastReader):
+
+    """Splits files into many blocks."""
+
+    BLOCK = 16
+
+
+class TestCaseFastReader(unittest.TestCase):
+
+    TEXTS = {"ascii.txt": "Text Mining, e.g. of 3.5 GB!\nIt's  fun...\n",
+             "unicode.txt": "İstanbul ÖL straße\r\nΣΊΣΥΦΟΣ naïve — ok\n",
+             "bom.txt": "\ufeffFirst word\fafter form feed line",
+             "long.txt": "a" * 100 + " b\n" + "word " * 50,
+             "empty.txt": ""}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp = tempfile.mkdtemp()
+        for name, text in cls.TEXTS.items():
+            with open(os.path.join(cls.temp, name), "w",
+                      encoding="utf-8", newline="") as file:
+                file.write(text)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp)
+
+    def assertSameTokens(self, corpus, reader):
+        for fileid in corpus.fileids():
+            words = list(corpus.words(fileid))
+            self.assertListEqual(reader.words(fileid), words)
+            self.assertListEqual(reader.lowered_words(fileid),
+                                 [word.lower() for word in words])
+
+    def test_same_tokens_demo_corpora(self):
+        for root in ("demo/domain", "demo/reference"):
+            corpus = PlaintextCorpusReader(root, r".*\.txt")
+            self.assertSameTokens(corpus, FastReader(corpus))
+            self.assertSameTokens(corpus, SmallBlocks(corpus))
+
+    def test_same_tokens_special_characters(self):
+        corpus = PlaintextCorpusReader(self.temp, r".*\.txt")
+        self.assertSameTokens(corpus, FastReader(corpus))
+        self.assertSameTokens(corpus, SmallBlocks(corpus))
+
+    def test_other_encoding_read_by_corpus(self):
+        corpus = PlaintextCorpusReader(self.temp, r".*\.txt",
+                                       encoding="latin-1")
+        self.assertSameTokens(corpus, FastReader(corpus))
+
+    def test_other_tokenizer_not_supported(self):
+        corpus = PlaintextCorpusReader(self.temp, r".*\.txt",
+                                       word_tokenizer=WhitespaceTokenizer())
+        self.assertFalse(FastReader.supports(corpus))
+        self.assertRaises(ValueError, FastReader, corpus)
+
+    def test_preprocess_same_counts(self):
+        for backend in ("freqdist", "array"):
+            process = Preprocess("demo/domain", backend=backend)
+            fast = Preprocess("demo/domain", backend=backend,
+                              reader="fast", per_file=False)
+            self.assertEqual(dict(fast.bigrams().items()),
+                             dict(process.bigrams().items()))
+            for fileid in process.fileids():
+                self.assertEqual(dict(fast.bigrams(fileid).items()),
+                                 dict(process.bigrams(fileid).items()))
+            self.assertEqual(fast.ngrams(3), process.ngrams(3))
+
+    def test_preprocess_error_reader(self):
+        self.assertRaises(ValueError, Preprocess, "demo/domain",
+                          reader="other")
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for the load test of the extraction service.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from loadtest import main
+
+
+class TestCaseLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp)
+
+    def test_local_service(self):
+        out = os.path.join(self.temp, "load.json")
+        report = main(["--domain", "demo/domain",
+                       "--reference", "demo/reference",
+                       "--candidates", "demo/demo_candidates.txt",
+                       "--requests", "20", "--concurrency", "4",
+                       "--out", out])
+        self.assertEqual(report["errors"], 0)
+        self.assertLessEqual(report["p50"], report["p99"])
+        with open(out, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["requests"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for the command line interface.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+# Seconds a command may take to start, at most.
+STARTUP_BUDGET = 0.5
+
+# Prints the modules that were loaded while running a command.
+RUN = ("import sys\n"
+       "import main\n"
+       "sys.argv = ['main.py'] + sys.argv[1:]\n"
+       "main.main()\n"
+       "print(' '.join(sys.modules))\n")
+
+
+class TestCaseMain(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.evaluate = ["evaluate",
+                        "--extracted", "demo/demo_out.csv",
+                        "--gold", "demo/demo_gold.txt",
+                        "--high", "1"]
+        cls.temp = tempfile.mkdtemp()
+        scores = os.path.join(cls.temp, "scores.npz")
+        # Scores are written in this process, only rescoring is timed.
+        from terminology import Terminology
+        Terminology("demo/domain", "demo/reference",
+                    Terminology.DEMO["candidates"]).save(scores)
+        cls.rescore = ["rescore", scores, "--alpha", "0.6", "--theta", "0.5",
+                       os.path.join(cls.temp, "rescored.csv")]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp)
+
+    @staticmethod
+    def _run(args):
+        """Runs main with args, returns output and seconds it took."""
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", RUN] + args,
+                                capture_output=True, text=True, check=True)
+        return output.stdout, time.perf_counter() - start
+
+    def _fastest(self, args, runs=3):
+        """Returns seconds of the fastest of some runs."""
+        return min(self._run(args)[1] for _ in range(runs))
+
+    def test_evaluate_doesnt_import_nltk(self):
+        output, _ = self._run(self.evaluate)
+        modules = output.splitlines()[-1].split()
+        self.assertIn("evaluation", modules)
+        for module in ("nltk", "numpy", "preprocess", "terminology"):
+            self.assertNotIn(module, modules)
+
+    def test_rescore_doesnt_import_nltk(self):
+        output, _ = self._run(self.rescore)
+        self.assertIn("Success", output)
+        modules = output.splitlines()[-1].split()
+        self.assertIn("terminology", modules)
+        for module in ("nltk", "preprocess", "refindex"):
+            self.assertNotIn(module, modules)
+
+    def test_help_doesnt_import_nltk(self):
+        output, _ = self._run(["--help"])
+        self.assertIn("evaluate -h", output)
+        self.assertNotIn("nltk", output.splitlines()[-1].split())
+
+    def test_evaluate_startup_budget(self):
+        self.assertLess(self._fastest(self.evaluate), STARTUP_BUDGET)
+
+    def test_rescore_startup_budget(self):
+        self.assertLess(self._fastest(self.rescore), STARTUP_BUDGET)
+
+    def test_help_startup_budget(self):
+        self.assertLess(self._fastest(["--help"]), STARTUP_BUDGET)
+
+    def test_evaluate_mixed_lengths(self):
+        temp = tempfile.mkdtemp()
+        try:
+            extracted = os.path.join(temp, "out.csv")
+            with open(extracted, "w", encoding="utf-8") as file:
+                file.write("alpha;0.5\ntheta;1.5\n"
+                           "translation;0.9;True\n"
+                           "machine translation;0.4;True\n"
+                           "statistical machine translation;0.1;True\n")
+            output, _ = self._run(["evaluate", "--extracted", extracted,
+                                   "--gold", "demo/demo_gold.txt",
+                                   "--high", "2", "--low", "1"])
+            self.assertNotIn("Failure", output)
+            self.assertIn("translation\nmachine translation\n", output)
+            self.assertIn("statistical machine translation", output)
+        finally:
+            shutil.rmtree(temp)
+
+    def test_extract_reference_index_mixed_lengths(self):
+        temp = tempfile.mkdtemp()
+        try:
+            index = os.path.join(temp, "reference.index")
+            self._run(["index", index, "--corpus", "demo/reference",
+                       "--no-cache"])
+            candidates = os.path.join(temp, "candidates.txt")
+            with open(candidates, "w", encoding="utf-8") as file:
+                file.write("computational linguistics\ntext mining\n"
+                           "linguistics\nthe field of\n")
+            out = os.path.join(temp, "out.csv")
+            output, _ = self._run(["extract", "--no-cache",
+                                   "--reference-index", index,
+                                   "demo/domain", candidates, out])
+            self.assertNotIn("Failure", output)
+            self.assertIn("2 candidates that aren't bigrams are skipped",
+                          output)
+            with open(out, encoding="utf-8") as file:
+                terms = [line.split(";")[0] for line in file][2:]
+            self.assertCountEqual(terms, ["computational linguistics",
+                                          "text mining"])
+        finally:
+            shutil.rmtree(temp)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
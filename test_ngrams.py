@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for the n-gram index.
+"""
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from bigramtable import Vocabulary
+from ngrams import NgramIndex
+
+
+def _count(words, n):
+    """Counts n-grams of a list of words."""
+    return Counter(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+
+
+class TestCaseNgramIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        # Files of Zipf distributed words, one of them empty.
+        cls.files = [[str(word) for word in rng.zipf(1.6, size)]
+                     for size in (200, 0, 1, 150, 300)]
+        cls.words = [word for words in cls.files for word in words]
+        cls.vocabulary = Vocabulary()
+        cls.index = NgramIndex.from_files(
+            [cls.vocabulary.encode(words) for words in cls.files],
+            cls.vocabulary)
+
+    def test_frequent_corpus(self):
+        for n in range(1, NgramIndex.MAX_N + 1):
+            self.assertDictEqual(dict(self.index.frequent(n)),
+                                 _count(self.words, n))
+
+    def test_frequent_document(self):
+        for n in range(1, NgramIndex.MAX_N + 1):
+            for document, words in enumerate(self.files):
+                self.assertDictEqual(
+                    dict(self.index.frequent(n, document=document)),
+                    _count(words, n))
+
+    def test_frequent_min_count_and_order(self):
+        frequent = self.index.frequent(2, min_count=3)
+        counts = [count for _, count in frequent]
+        self.assertListEqual(counts, sorted(counts, reverse=True))
+        self.assertEqual(len(frequent),
+                         sum(count >= 3
+                             for count in _count(self.words, 2).values()))
+
+    def test_frequencies_mixed_lengths(self):
+        ngrams = [ngram for n in (1, 2, 3)
+                  for ngram in list(_count(self.words, n))[:20]]
+        ngrams += [("unknown",), ("1", "unknown", "1")]
+        expected = {ngram: _count(self.words, len(ngram))[ngram]
+                    for ngram in ngrams[:-2]}
+        self.assertDictEqual(self.index.frequencies(ngrams), expected)
+
+    def test_frequency_matrix(self):
+        ngrams = list(_count(self.words, 3))[:30] + list(
+            _count(self.words, 1))[:10]
+        rows, columns, counts = self.index.frequency_matrix(ngrams)
+        self.assertListEqual(columns.tolist(), sorted(columns.tolist()))
+        for document, words in enumerate(self.files):
+            expected = {ngram: count
+                        for ngram, count in _count(words, 3).items()
+                        if ngram in ngrams}
+            expected.update({ngram: count
+                             for ngram, count in _count(words, 1).items()
+                             if ngram in ngrams})
+            found = {ngrams[row]: count for row, column, count
+                     in zip(rows.tolist(), columns.tolist(), counts.tolist())
+                     if column == document}
+            self.assertDictEqual(found, expected)
+
+    def test_error_too_long(self):
+        with self.assertRaises(ValueError):
+            self.index.frequent(NgramIndex.MAX_N + 1)
+        with self.assertRaises(ValueError):
+            self.index.frequencies([("1",) * (NgramIndex.MAX_N + 1)])
+
+    def test_empty_corpus(self):
+        index = NgramIndex.from_files([], Vocabulary())
+        self.assertEqual(index.frequent(2), [])
+        self.assertEqual(index.frequencies([("a", "b")]), dict())
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -5,9 +5,15 @@
 Unittests for the Preprocess class.
 """
 import os
+import shutil
+import tempfile
 import unittest
 
-from preprocess import Preprocess
+from nltk import ngrams
+from nltk.probability import FreqDist
+
+from preprocess import Preprocess, _lowered_bigrams
+from tokenstore import TokenStore
 
 
 class TestCasePreprocess(unittest.TestCase):
@@ -51,6 +57,72 @@ class TestCasePreprocess(unittest.TestCase):
         self.assertNotIn(self.bigram3,
                          self.process.bigrams(self.fileid))
 
+    def test_bigrams_for_file_without_per_file(self):
+        process = Preprocess("demo/domain", per_file=False)
+        self.assertEqual(process.bigrams(self.fileid),
+                         self.process.bigrams(self.fileid))
+
+    def test_bigrams_for_file_bounded_per_file(self):
+        process = Preprocess("demo/domain", per_file=1)
+        for fileid in process.fileids():
+            self.assertEqual(process.bigrams(fileid),
+                             self.process.bigrams(fileid))
+        self.assertEqual(len(process._file_bigrams), 1)
+
+    def test_count_with_workers(self):
+        process = Preprocess("demo/domain", workers=2)
+        self.assertEqual(process.bigrams(), self.process.bigrams())
+        for fileid in process.fileids():
+            self.assertEqual(process.bigrams(fileid),
+                             self.process.bigrams(fileid))
+
+    def test_lowered_bigrams_from_iterator(self):
+        edges = []
+        words = iter(["Text", "Mining", "is", "Fun"])
+        self.assertListEqual(list(_lowered_bigrams(words, edges)),
+                             [("text", "mining"),
+                              ("mining", "is"),
+                              ("is", "fun")])
+        self.assertListEqual(edges, ["text", "fun"])
+
+    def test_lowered_bigrams_empty(self):
+        edges = []
+        self.assertListEqual(list(_lowered_bigrams([], edges)), [])
+        self.assertListEqual(edges, [None, None])
+
+    def test_array_backend_same_bigrams(self):
+        process = Preprocess("demo/domain", backend="array", workers=2)
+        self.assertEqual(process.bigrams(), self.process.bigrams())
+        self.assertDictEqual(process.get_frequency([self.bigram1,
+                                                    self.bigram2],
+                                                   fileid=self.fileid),
+                             {self.bigram1: 1})
+
+    def test_frequency_matrix(self):
+        terms = [self.bigram2, self.bigram1, self.bigram3]
+        rows, columns, counts = self.process.frequency_matrix(terms)
+        fileids = self.process.fileids()
+        for row, column, count in zip(rows, columns, counts):
+            self.assertEqual(self.process.bigrams(fileids[column])[
+                terms[row]], count)
+        self.assertEqual(counts.sum(), 6)
+        self.assertNotIn(0, rows)
+
+    def test_frequency_matrix_array_backend(self):
+        terms = [self.bigram2, self.bigram1, self.bigram3]
+        process = Preprocess("demo/domain", backend="array")
+        expected = self.process.frequency_matrix(terms)
+        for got, want in zip(process.frequency_matrix(terms), expected):
+            self.assertListEqual(got.tolist(), want.tolist())
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, Preprocess, "demo/domain",
+                          backend="unknown")
+
+    def test_fileids(self):
+        self.assertListEqual(self.process.fileids(),
+                             self.process.corpus.fileids())
+
     def test_get_frequency_with_nonexisting_bigram(self):
         self.assertNotIn(self.bigram2,
                          self.process.get_frequency([self.bigram2]))
@@ -78,6 +150,77 @@ class TestCasePreprocess(unittest.TestCase):
         cand = self.process.candidates(min_count=3)
         self.assertSetEqual(cand, {self.bigram1, self.bigram3})
 
+    def test_candidates_same_as_isolated_tagging(self):
+        tags = {"NN"}
+        expected = set()
+        for bigram in self.process.candidates(min_count=1, tags=[]):
+            if self.process.has_relevant_tag(bigram, tags):
+                expected.add(bigram)
+        self.assertSetEqual(self.process.candidates(min_count=1, tags=tags),
+                            expected)
+
+    def test_candidates_array_backend_same(self):
+        process = Preprocess("demo/domain", backend="array")
+        for stops in (None, {"the", "of"}):
+            self.assertSetEqual(process.candidates(1, stops=stops, tags=[]),
+                                self.process.candidates(1, stops=stops,
+                                                        tags=[]))
+
+    def test_frequent_most_frequent_first(self):
+        frequent = self.process._frequent(2, frozenset(["of"]))
+        counts = [count for _, count in frequent]
+        self.assertListEqual(counts, sorted(counts, reverse=True))
+        self.assertTrue(all(count >= 2 for count in counts))
+        self.assertTrue(all("of" not in bigram for bigram, _ in frequent))
+
+    def test_ngrams(self):
+        words = [word.lower() for word in self.process.corpus.words()]
+        self.assertEqual(self.process.ngrams(3), FreqDist(ngrams(words, 3)))
+        words = [word.lower()
+                 for word in self.process.corpus.words(self.fileid)]
+        self.assertEqual(self.process.ngrams(1, self.fileid),
+                         FreqDist(ngrams(words, 1)))
+
+    def test_get_frequency_mixed_lengths(self):
+        trigram = ("the", "field", "of")
+        terms = [self.bigram1, trigram, ("linguistics",),
+                 ("no", "such", "trigram")]
+        frequency = self.process.get_frequency(terms)
+        self.assertEqual(len(frequency), 3)
+        self.assertEqual(frequency[self.bigram1], 3)
+        self.assertEqual(frequency[trigram], 1)
+        self.assertEqual(frequency[("linguistics",)],
+                         self.process.ngrams(1)[("linguistics",)])
+
+    def test_frequency_matrix_mixed_lengths(self):
+        terms = [self.bigram1, ("the", "field", "of"), self.bigram3,
+                 ("text",)]
+        rows, columns, counts = self.process.frequency_matrix(terms)
+        self.assertListEqual(columns.tolist(), sorted(columns.tolist()))
+        for column, fileid in enumerate(self.process.fileids()):
+            expected = self.process.get_frequency(terms, fileid=fileid)
+            found = {terms[row]: count for row, col, count
+                     in zip(rows.tolist(), columns.tolist(), counts.tolist())
+                     if col == column}
+            self.assertDictEqual(found, expected)
+
+    def test_candidates_mixed_lengths(self):
+        cand = self.process.candidates(2, tags=[], n=(1, 2, 3))
+        self.assertSetEqual({c for c in cand if len(c) == 2},
+                            self.process.candidates(2, tags=[]))
+        self.assertIn(("computational", "linguistics"), cand)
+        self.assertIn(("linguistics",), cand)
+        self.assertTrue(all(len(c) in (1, 2, 3) for c in cand))
+
+    def test_candidates_trigrams_in_context(self):
+        cand = self.process.candidates(1, tags={"NN"}, n=3, context=True)
+        self.assertTrue(cand)
+        self.assertTrue(all(len(c) == 3 for c in cand))
+
+    def test_candidates_in_context(self):
+        cand = self.process.candidates(min_count=3, context=True, workers=2)
+        self.assertTrue(cand.issubset({self.bigram1, self.bigram3}))
+
     def test_write_candidates_file_exists(self):
         temp = "test_candidates.txt"
         self.process.write_candidates_file(min_count=1,
@@ -99,6 +242,130 @@ class TestCasePreprocess(unittest.TestCase):
                 self.assertEqual(len(line), 2)
         os.remove(temp)
 
+    def test_cache_reuses_counts(self):
+        temp = tempfile.mkdtemp()
+        try:
+            Preprocess("demo/domain", cache=temp)
+            cached = Preprocess("demo/domain", cache=temp)
+            self.assertEqual(len(os.listdir(temp)), 1)
+            self.assertEqual(cached.bigrams(), self.process.bigrams())
+            self.assertEqual(cached.bigrams(self.fileid),
+                             self.process.bigrams(self.fileid))
+        finally:
+            shutil.rmtree(temp)
+
+    def test_cache_invalidated_by_changed_file(self):
+        temp = tempfile.mkdtemp()
+        try:
+            corpus = os.path.join(temp, "corpus")
+            shutil.copytree("demo/domain", corpus)
+            Preprocess(corpus, cache=os.path.join(temp, "cache"))
+            with open(os.path.join(corpus, self.fileid), "a",
+                      encoding="utf-8") as file:
+                file.write("\nspeech recognition\n")
+            changed = Preprocess(corpus, cache=os.path.join(temp, "cache"))
+            self.assertEqual(changed.bigrams()["speech", "recognition"],
+                             self.process.bigrams()["speech",
+                                                    "recognition"] + 1)
+        finally:
+            shutil.rmtree(temp)
+
+    def _assert_same_as_rebuild(self, process, corpus, backend):
+        rebuilt = Preprocess(corpus, backend=backend)
+        self.assertEqual(process.fileids(), rebuilt.fileids())
+        self.assertEqual(dict(process.bigrams().items()),
+                         dict(rebuilt.bigrams().items()))
+        for fileid in rebuilt.fileids():
+            self.assertEqual(process.bigrams(fileid),
+                             rebuilt.bigrams(fileid))
+
+    def test_add_and_remove_documents(self):
+        for backend in Preprocess.BACKENDS:
+            temp = tempfile.mkdtemp()
+            try:
+                corpus = os.path.join(temp, "corpus")
+                shutil.copytree("demo/domain", corpus)
+                os.rename(os.path.join(corpus, "domain2.txt"),
+                          os.path.join(temp, "domain2.txt"))
+                process = Preprocess(corpus, backend=backend)
+                shutil.move(os.path.join(temp, "domain2.txt"), corpus)
+                process.add_documents(["domain2.txt"])
+                self._assert_same_as_rebuild(process, corpus, backend)
+                if backend == "sketch":
+                    # Bigrams of files aren't kept.
+                    with self.assertRaises(ValueError):
+                        process.remove_documents([self.fileid])
+                    continue
+                process.remove_documents([self.fileid])
+                os.remove(os.path.join(corpus, self.fileid))
+                self._assert_same_as_rebuild(process, corpus, backend)
+            finally:
+                shutil.rmtree(temp)
+
+    def test_add_documents_error_existing_file(self):
+        with self.assertRaises(ValueError):
+            self.process.add_documents([self.fileid])
+
+    def test_add_and_remove_documents_updates_corpus(self):
+        temp = tempfile.mkdtemp()
+        try:
+            corpus = os.path.join(temp, "corpus")
+            shutil.copytree("demo/domain", corpus)
+            process = Preprocess(corpus, cache=os.path.join(temp, "cache"),
+                                 reader="fast")
+            process.remove_documents([self.fileid])
+            os.remove(os.path.join(corpus, self.fileid))
+            self.assertEqual(process.corpus.fileids(), process.fileids())
+            self.assertEqual(process._words.corpus, process.corpus)
+            # Only the first count was written to the cache.
+            self.assertEqual(len(os.listdir(os.path.join(temp, "cache"))),
+                             1)
+            counted = Preprocess(corpus, cache=os.path.join(temp, "cache"))
+            self.assertEqual(dict(counted.bigrams().items()),
+                             dict(process.bigrams().items()))
+        finally:
+            shutil.rmtree(temp)
+
+    def test_add_documents_twice(self):
+        temp = tempfile.mkdtemp()
+        try:
+            corpus = os.path.join(temp, "corpus")
+            shutil.copytree("demo/domain", corpus)
+            fileids = self.process.fileids()[1:]
+            for fileid in fileids:
+                os.rename(os.path.join(corpus, fileid),
+                          os.path.join(temp, fileid))
+            process = Preprocess(corpus)
+            for fileid in fileids:
+                shutil.move(os.path.join(temp, fileid), corpus)
+                process.add_documents([fileid])
+            self._assert_same_as_rebuild(process, corpus, "freqdist")
+        finally:
+            shutil.rmtree(temp)
+
+    def test_add_and_remove_documents_token_store(self):
+        temp = tempfile.mkdtemp()
+        try:
+            store = TokenStore.write(temp, self.process.corpus)
+            process = Preprocess(store)
+            process.remove_documents([self.fileid])
+            self.assertNotIn(self.fileid, process.corpus.fileids())
+            process.add_documents([self.fileid])
+            self.assertEqual(dict(process.bigrams().items()),
+                             dict(self.process.bigrams().items()))
+        finally:
+            shutil.rmtree(temp)
+
+    def test_remove_documents_error_not_kept(self):
+        process = Preprocess("demo/domain", per_file=False)
+        with self.assertRaises(ValueError):
+            process.remove_documents([self.fileid])
+        self.assertIn(self.fileid, process.fileids())
+
+    def test_remove_documents_error_nonexisting_file(self):
+        with self.assertRaises(ValueError):
+            self.process.remove_documents(["nonexisting.txt"])
+
 
 if __name__ == "__main__":
     unittest.main(buffer=True)
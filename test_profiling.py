@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for profiling stages of a run.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import profiling
+from preprocess import Preprocess
+from profiling import Profiler, stage
+
+
+class TestCaseProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp)
+
+    def test_stage_without_profiler(self):
+        self.assertIsNone(profiling._ACTIVE)
+        with stage("nothing") as counts:
+            counts["items"] = 1
+        self.assertIsNone(profiling._ACTIVE)
+
+    def test_nested_stages(self):
+        with Profiler() as profiler:
+            with stage("outer") as counts:
+                counts["items"] = 3
+                with stage("inner"):
+                    data = [0] * 100000
+                    del data
+        self.assertIsNone(profiling._ACTIVE)
+        stages = profiler.report()["stages"]
+        self.assertEqual([record["name"] for record in stages],
+                         ["outer", "inner"])
+        outer, inner = stages
+        self.assertEqual(outer["depth"], 0)
+        self.assertEqual(inner["depth"], 1)
+        self.assertEqual(outer["counts"], {"items": 3})
+        self.assertGreaterEqual(outer["peak_bytes"], inner["peak_bytes"])
+        self.assertGreaterEqual(inner["peak_increase_bytes"], 700000)
+        self.assertGreaterEqual(outer["wall_seconds"], inner["wall_seconds"])
+
+    def test_counts_of_preprocess(self):
+        with Profiler(memory=False) as profiler:
+            process = Preprocess("demo/domain")
+            process.candidates(1, tags={"NN"})
+        names = [record["name"] for record in profiler.report()["stages"]]
+        self.assertEqual(names, ["Preprocess.count",
+                                 "Preprocess.candidates",
+                                 "BigramTagger.tag"])
+        counts = profiler.stages[0]["counts"]
+        self.assertEqual(counts["documents"], len(process.fileids()))
+        self.assertEqual(counts["bigram_types"], len(process.bigrams()))
+        self.assertNotIn("peak_bytes", profiler.stages[0])
+
+    def test_write(self):
+        directory = os.path.join(self.temp, "profile")
+        with Profiler(directory, cprofile=True):
+            with stage("first"):
+                with stage("nested"):
+                    pass
+            with stage("second"):
+                pass
+        files = sorted(os.listdir(directory))
+        self.assertEqual(files, ["00_first.prof", "01_second.prof",
+                                 Profiler.REPORT, Profiler.TRACE])
+        with open(os.path.join(directory, Profiler.TRACE)) as file:
+            trace = json.load(file)
+        self.assertEqual([event["name"] for event in trace["traceEvents"]],
+                         ["first", "nested", "second"])
+        self.assertTrue(all(event["ph"] == "X"
+                            for event in trace["traceEvents"]))
+        with open(os.path.join(directory, Profiler.REPORT)) as file:
+            self.assertEqual(len(json.load(file)["stages"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
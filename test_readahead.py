@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for reading files of a corpus ahead.
+"""
+import threading
+import time
+import unittest
+
+from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+
+from preprocess import Preprocess
+from readahead import ReadAhead
+
+
+class SlowReadAhead(ReadAhead):
+
+    """Records how many files are read at once."""
+
+    def __init__(self, *args, **kwargs):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.most_active = 0
+        self.read = []
+        super().__init__(*args, **kwargs)
+
+    def _read(self, fileid):
+        with self.lock:
+            self.active += 1
+            self.most_active = max(self.most_active, self.active)
+            self.read.append(fileid)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return super()._read(fileid)
+
+
+class TestCaseReadAhead(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.corpus = PlaintextCorpusReader("demo/domain", r".*\.txt")
+        cls.fileids = cls.corpus.fileids()
+        cls.process = Preprocess("demo/domain")
+
+    def test_words_like_corpus(self):
+        with ReadAhead(self.corpus, self.fileids, depth=3) as reader:
+            for fileid in self.fileids:
+                self.assertEqual(reader.words(fileid),
+                                 list(self.corpus.words(fileid)))
+
+    def test_files_out_of_order(self):
+        first, second, third = self.fileids[:3]
+        with ReadAhead(self.corpus, [first, second, third],
+                       depth=3) as reader:
+            # Files read ahead of the requested one are dropped.
+            self.assertEqual(reader.text(second),
+                             self.corpus.raw(second))
+            self.assertNotIn(first, reader._reading)
+            self.assertEqual(reader.text(first), self.corpus.raw(first))
+            self.assertEqual(reader.text(third), self.corpus.raw(third))
+            self.assertFalse(reader._reading)
+
+    def test_depth(self):
+        with SlowReadAhead(self.corpus, self.fileids, depth=2) as reader:
+            for fileid in self.fileids:
+                reader.text(fileid)
+        self.assertLessEqual(reader.most_active, 2)
+        self.assertEqual(reader.read, self.fileids)
+
+    def test_memory(self):
+        # Every file is larger than one byte, one file is read ahead.
+        with SlowReadAhead(self.corpus, self.fileids, depth=3,
+                           memory=1) as reader:
+            self.assertEqual(list(reader._reading), self.fileids[:1])
+            reader.text(self.fileids[0])
+            self.assertEqual(list(reader._reading), self.fileids[1:2])
+        self.assertEqual(reader.most_active, 1)
+
+    def test_same_counts(self):
+        for backend in ("freqdist", "array"):
+            process = Preprocess("demo/domain", backend=backend, prefetch=3)
+            self.assertEqual(dict(process.bigrams().items()),
+                             dict(self.process.bigrams().items()))
+            fileid = self.fileids[1]
+            self.assertEqual(dict(process.bigrams(fileid).items()),
+                             dict(self.process.bigrams(fileid).items()))
+
+    def test_same_counts_workers(self):
+        process = Preprocess("demo/domain", workers=2, prefetch=2,
+                             prefetch_memory=10000)
+        self.assertEqual(process.bigrams(), self.process.bigrams())
+
+    def test_same_matrix(self):
+        process = Preprocess("demo/domain", per_file=False, prefetch=2)
+        terms = [bigram for bigram, _ in
+                 self.process.bigrams().most_common(50)]
+        for expected, found in zip(self.process.frequency_matrix(terms),
+                                   process.frequency_matrix(terms)):
+            self.assertEqual(expected.tolist(), found.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for the reference index.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from preprocess import Preprocess
+from refindex import ReferenceIndex
+from terminology import Terminology
+
+
+class TestCaseReferenceIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.temp, "reference.idx")
+        cls.process = Preprocess("demo/reference", per_file=False)
+        ReferenceIndex.write(cls.filename, cls.process.bigrams())
+        cls.index = ReferenceIndex(cls.filename)
+        cls.bigrams = list(cls.process.bigrams()) + [("unknown", "the"),
+                                                     ("the", "unknown")]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.index.close()
+        shutil.rmtree(cls.temp)
+
+    def test_get_frequency_same_as_preprocess(self):
+        self.assertDictEqual(self.index.get_frequency(self.bigrams),
+                             self.process.get_frequency(self.bigrams))
+
+    def test_n(self):
+        self.assertEqual(self.index.N(), self.process.bigrams().N())
+        self.assertEqual(len(self.index), len(self.process.bigrams()))
+
+    def test_write_array_backend(self):
+        filename = os.path.join(self.temp, "array.idx")
+        process = Preprocess("demo/reference", per_file=False,
+                             backend="array")
+        ReferenceIndex.write(filename, process.bigrams())
+        with ReferenceIndex(filename) as index:
+            self.assertDictEqual(index.get_frequency(self.bigrams),
+                                 self.process.get_frequency(self.bigrams))
+
+    def test_non_ascii_words(self):
+        filename = os.path.join(self.temp, "utf8.idx")
+        bigrams = {("über", "straße"): 2, ("zebra", "ärger"): 1,
+                   ("a", "z"): 3}
+        ReferenceIndex.write(filename, bigrams)
+        with ReferenceIndex(filename) as index:
+            self.assertDictEqual(index.get_frequency(list(bigrams)),
+                                 bigrams)
+
+    def test_get_frequency_error_fileid(self):
+        with self.assertRaises(ValueError):
+            self.index.get_frequency(self.bigrams, fileid="reference1.txt")
+
+    def test_get_frequency_error_trigram(self):
+        with self.assertRaises(ValueError):
+            self.index.get_frequency([("the", "text", "is")])
+
+    def test_error_no_index_file(self):
+        with self.assertRaises(ValueError):
+            ReferenceIndex("demo/demo_gold.txt")
+
+    def test_terminology_with_index(self):
+        candidates = Terminology.DEMO["candidates"]
+        term_obj = Terminology("demo/domain", self.index, candidates)
+        expected = Terminology("demo/domain", "demo/reference", candidates)
+        self.assertDictEqual(term_obj.domain_relevance,
+                             expected.domain_relevance)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for the extraction service.
+"""
+import contextlib
+import io
+import json
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from service import TermService, make_server
+from terminology import Terminology
+
+
+class TestCaseService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.candidates = Terminology.DEMO["candidates"]
+        cls.service = TermService("demo/domain", "demo/reference",
+                                  cls.candidates)
+        cls.server = make_server(cls.service, port=0)
+        cls.thread = threading.Thread(target=cls.server.serve_forever,
+                                      daemon=True)
+        cls.thread.start()
+        cls.url = "http://{}:{}".format(*cls.server.server_address[:2])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def _post(self, path, request):
+        data = json.dumps(request).encode("utf-8")
+        message = urllib.request.Request(self.url + path, data=data,
+                                         method="POST")
+        with urllib.request.urlopen(message) as response:
+            return json.loads(response.read())
+
+    def _status(self, path, data):
+        message = urllib.request.Request(self.url + path, data=data,
+                                         method="POST")
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(message)
+        return context.exception.code
+
+    def test_health(self):
+        with urllib.request.urlopen(self.url + "/health") as response:
+            health = json.loads(response.read())
+        self.assertEqual(health["status"], "ok")
+        self.assertEqual(health["documents"], 3)
+
+    def test_score_same_as_terminology(self):
+        term_obj = Terminology("demo/domain", "demo/reference",
+                               self.candidates)
+        expected = term_obj.weigh_candidates(0.5)
+        response = self._post("/score", {"alpha": 0.5, "theta": 0.6})
+        scored = {tuple(term["term"].split()): term["value"]
+                  for term in response["terms"]}
+        self.assertEqual(scored.keys(), expected.keys())
+        for term, value in expected.items():
+            self.assertAlmostEqual(scored[term], value)
+        extracted = {tuple(term["term"].split())
+                     for term in response["terms"] if term["extracted"]}
+        self.assertSetEqual(extracted,
+                            term_obj.extract_terminology(0.6, expected))
+
+    def test_top_with_candidates(self):
+        response = self._post("/top", {"k": 1, "candidates":
+                                       [["text", "mining"],
+                                        "computational linguistics"]})
+        self.assertEqual([term["term"] for term in response["terms"]],
+                         ["computational linguistics"])
+
+    def test_evaluate(self):
+        response = self._post("/evaluate", {"golds":
+                                            ["computational linguistics"],
+                                            "theta": 0.6})
+        self.assertEqual(response["recall"], 1.0)
+        self.assertEqual(response["precision"], 1 / response["extracted"])
+
+    def test_errors(self):
+        self.assertEqual(self._status("/score", b'{"alpha": 2}'), 400)
+        self.assertEqual(self._status("/score", b"no json"), 400)
+        self.assertEqual(self._status("/evaluate", b"{}"), 400)
+        self.assertEqual(self._status("/top", b'{"candidates": []}'), 400)
+        self.assertEqual(self._status("/unknown", b"{}"), 404)
+
+    def test_concurrent_requests(self):
+        request = {"k": 3, "candidates": ["machine learning", "text mining",
+                                          "speech recognition"]}
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(lambda _: self._post("/top", request),
+                                      range(32)))
+        self.assertTrue(all(response == responses[0]
+                            for response in responses))
+        self.assertEqual(len(responses[0]["terms"]), 3)
+
+    def test_same_candidates_computed_once(self):
+        service = TermService("demo/domain", "demo/reference")
+        computed = []
+        compute = service._terminology
+
+        def slow(candidates):
+            computed.append(candidates)
+            time.sleep(0.2)
+            return compute(candidates)
+
+        service._terminology = slow
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            terminologies = list(pool.map(
+                lambda _: service.terminology(self.candidates), range(8)))
+        self.assertEqual(len(computed), 1)
+        self.assertTrue(all(term_obj is terminologies[0]
+                            for term_obj in terminologies))
+
+    def test_cached_candidates_dont_wait(self):
+        service = TermService("demo/domain", "demo/reference")
+        cached = service.terminology(self.candidates)
+        started, release = threading.Event(), threading.Event()
+        compute = service._terminology
+
+        def blocked(candidates):
+            started.set()
+            release.wait(10)
+            return compute(candidates)
+
+        service._terminology = blocked
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(service.terminology,
+                                  [("machine", "learning")])
+            self.assertTrue(started.wait(10))
+            self.assertIs(service.terminology(self.candidates), cached)
+            self.assertFalse(pending.done())
+            release.set()
+            self.assertEqual(pending.result().terms(),
+                             [("machine", "learning")])
+
+    def test_no_progress_messages(self):
+        service = TermService("demo/domain", "demo/reference")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            service.terminology([("machine", "learning"),
+                                 ("machine", "learning", "research")])
+        self.assertEqual(output.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
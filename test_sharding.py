@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for counting a corpus in shards and merging them.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from preprocess import Preprocess, count_shard
+from sharding import merge_counts, read_counts, select, write_counts
+
+
+class TestCaseSharding(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.process = Preprocess("demo/domain")
+        cls.fileids = cls.process.fileids()
+
+    def setUp(self):
+        self.temp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp)
+
+    def _merge(self, by, count, backend="freqdist"):
+        """Counts every shard, writes and merges the count files."""
+        names = []
+        # Shards in reverse order, merging doesn't depend on the order.
+        for index in reversed(range(count)):
+            state = count_shard("demo/domain",
+                                select(self.fileids, index, count, by),
+                                backend)
+            names.append(os.path.join(self.temp, "{}.counts".format(index)))
+            write_counts(names[-1], state)
+        merged = os.path.join(self.temp, "merged.counts")
+        write_counts(merged, merge_counts(read_counts(name)
+                                          for name in names))
+        return merged
+
+    def test_select_covers_all_files(self):
+        for by in ("range", "hash"):
+            selected = [fileid for index in range(4)
+                        for fileid in select(self.fileids, index, 4, by)]
+            self.assertCountEqual(selected, self.fileids)
+
+    def test_select_range_consecutive(self):
+        self.assertEqual(select(self.fileids, 0, 2), self.fileids[:2])
+        self.assertEqual(select(self.fileids, 1, 2), self.fileids[2:])
+
+    def test_select_errors(self):
+        self.assertRaises(ValueError, select, self.fileids, 2, 2)
+        self.assertRaises(ValueError, select, self.fileids, 0, 2, "random")
+
+    def test_merged_same_as_one_host(self):
+        for by in ("range", "hash"):
+            process = Preprocess("demo/domain",
+                                 counts_file=self._merge(by, 3))
+            self.assertEqual(process.bigrams(), self.process.bigrams())
+            for fileid in self.fileids:
+                self.assertEqual(process.bigrams(fileid),
+                                 self.process.bigrams(fileid))
+
+    def test_merged_array_backend(self):
+        process = Preprocess("demo/domain",
+                             counts_file=self._merge("hash", 2, "array"))
+        self.assertEqual(process.backend, "array")
+        self.assertEqual(dict(process.bigrams().items()),
+                         dict(self.process.bigrams().items()))
+
+    def test_merge_deterministic(self):
+        with open(self._merge("hash", 2), "rb") as file:
+            first = file.read()
+        with open(self._merge("hash", 2), "rb") as file:
+            self.assertEqual(file.read(), first)
+
+    def test_tokens(self):
+        state = read_counts(self._merge("range", 2))
+        words = self.process.corpus.words
+        self.assertEqual(state["tokens"],
+                         {fileid: len(words(fileid))
+                          for fileid in self.fileids})
+
+    def test_merge_errors(self):
+        first = count_shard("demo/domain", select(self.fileids, 0, 2))
+        second = count_shard("demo/domain", select(self.fileids, 1, 2))
+        # A file is missing.
+        self.assertRaises(ValueError, merge_counts, [first])
+        # A file is counted twice.
+        self.assertRaises(ValueError, merge_counts, [first, first, second])
+        other = count_shard("demo/domain", select(self.fileids, 1, 2),
+                            backend="array")
+        self.assertRaises(ValueError, merge_counts, [first, other])
+
+    def test_unmerged_shard_not_loaded(self):
+        name = os.path.join(self.temp, "shard.counts")
+        write_counts(name, count_shard("demo/domain", self.fileids))
+        self.assertRaises(ValueError, Preprocess, "demo/domain",
+                          counts_file=name)
+
+    def test_not_a_count_file(self):
+        name = os.path.join(self.temp, "other")
+        with open(name, "wb") as file:
+            file.write(b"not counts")
+        self.assertRaises(ValueError, read_counts, name)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for approximate counting with a Count-Min sketch.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from bigramtable import BigramTable, Vocabulary
+from preprocess import Preprocess
+from sketch import CountMinSketch, SketchBuilder
+
+
+class TestCaseSketch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.process = Preprocess("demo/domain", backend="array")
+        cls.sketch = Preprocess("demo/domain", backend="sketch")
+        rng = np.random.default_rng(0)
+        cls.words = [str(word) for word in rng.zipf(1.5, 5000)]
+        cls.vocabulary = Vocabulary()
+        cls.table = BigramTable.from_ids(cls.vocabulary.encode(cls.words),
+                                         cls.vocabulary)
+
+    def test_estimates_never_too_low(self):
+        sketch = CountMinSketch(64, depth=3)
+        keys = np.arange(1000, dtype=np.int64) * 7919
+        counts = np.arange(1, 1001, dtype=np.int64)
+        sketch.add(keys, counts)
+        self.assertTrue(np.all(sketch.estimate(keys) >= counts))
+        self.assertEqual(sketch.total, int(counts.sum()))
+
+    def test_exact_with_enough_memory(self):
+        self.assertEqual(dict(self.sketch.bigrams().items()),
+                         dict(self.process.bigrams().items()))
+        self.assertEqual(self.sketch.bigrams().N(),
+                         self.process.bigrams().N())
+        self.assertEqual(self.sketch.bigrams().threshold, 0)
+
+    def test_heavy_hitters_above_threshold(self):
+        builder = SketchBuilder(self.vocabulary, memory=4096)
+        builder.update(self.table)
+        table = builder.table()
+        self.assertLessEqual(len(table), table.capacity)
+        heavy = set(table)
+        for bigram, count in self.table.items():
+            if count > table.threshold:
+                self.assertIn(bigram, heavy)
+            self.assertGreaterEqual(table[bigram], count)
+
+    def test_error_bounds(self):
+        builder = SketchBuilder(self.vocabulary, memory=4096)
+        builder.update(self.table)
+        table = builder.table()
+        bounds = table.error_bounds()
+        self.assertEqual(bounds["width"] * bounds["depth"] * 8, 2048)
+        self.assertAlmostEqual(bounds["overestimate"],
+                               bounds["epsilon"] * self.table.N())
+
+    def test_candidates_exact_pass(self):
+        process = Preprocess("demo/domain", backend="sketch", memory=256)
+        expected = self.process.candidates(1, tags=[])
+        estimated = process.candidates(1, tags=[])
+        self.assertSetEqual(process.candidates(1, tags=[], exact=True),
+                            expected & estimated)
+
+    def test_exact_frequency(self):
+        bigrams = list(self.process.bigrams())
+        self.assertDictEqual(self.sketch.exact_frequency(bigrams),
+                             dict(self.process.bigrams().items()))
+
+    def test_add_and_remove_documents(self):
+        temp = tempfile.mkdtemp()
+        try:
+            corpus = os.path.join(temp, "corpus")
+            shutil.copytree("demo/domain", corpus)
+            fileid = self.process.fileids()[-1]
+            os.rename(os.path.join(corpus, fileid),
+                      os.path.join(temp, fileid))
+            process = Preprocess(corpus, backend="sketch")
+            shutil.move(os.path.join(temp, fileid), corpus)
+            process.add_documents([fileid])
+            self.assertEqual(dict(process.bigrams().items()),
+                             dict(self.process.bigrams().items()))
+            # Bigrams of files aren't kept.
+            with self.assertRaises(ValueError):
+                process.remove_documents([fileid])
+        finally:
+            shutil.rmtree(temp)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
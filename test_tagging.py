@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Unittests for the BigramTagger class.
+"""
+import unittest
+
+from nltk import pos_tag
+from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+
+from tagging import BigramTagger
+
+
+class TestCaseBigramTagger(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.corpus = PlaintextCorpusReader("demo/domain", r".*\.txt")
+        cls.bigrams = [("text", "mining"),
+                       ("is", "difficult"),
+                       ("computational", "linguistics"),
+                       ("speech", "recognition")]
+
+    def test_isolated_same_as_pos_tag(self):
+        tags = BigramTagger(batch_size=3).tag(self.bigrams)
+        for bigram in self.bigrams:
+            self.assertSetEqual(tags[bigram],
+                                {tag for word, tag in pos_tag(bigram)})
+
+    def test_isolated_with_workers(self):
+        self.assertDictEqual(BigramTagger(workers=2,
+                                          batch_size=1).tag(self.bigrams),
+                             BigramTagger().tag(self.bigrams))
+
+    def test_context_needs_corpus(self):
+        tagger = BigramTagger(context=True)
+        self.assertRaises(ValueError, tagger.tag, self.bigrams)
+
+    def test_context_only_wanted_bigrams(self):
+        tags = BigramTagger(context=True).tag([("text", "mining")],
+                                              corpus=self.corpus)
+        self.assertListEqual(list(tags), [("text", "mining")])
+
+    def test_context_with_workers(self):
+        self.assertDictEqual(BigramTagger(context=True,
+                                          workers=2).tag(self.bigrams,
+                                                         self.corpus),
+                             BigramTagger(context=True).tag(self.bigrams,
+                                                            self.corpus))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -6,8 +6,11 @@ Unittests for the Terminology class
 """
 import math
 import os
+import shutil
+import tempfile
 import unittest
 
+from evaluation import Evaluation
 from terminology import Terminology
 
 
@@ -84,6 +87,44 @@ class TestCaseTerminology(unittest.TestCase):
                                0.6365141683,
                                places=5)
 
+    def test_array_backend_same_values(self):
+        term_obj = Terminology(domain="demo/domain/",
+                               reference="demo/reference/",
+                               candidates=self.term_obj.candidates,
+                               backend="array")
+        self.assertDictEqual(term_obj.domain_relevance,
+                             self.term_obj.domain_relevance)
+        self.assertDictEqual(term_obj.domain_consensus,
+                             self.term_obj.domain_consensus)
+
+    def test_add_and_remove_documents_same_as_rebuild(self):
+        temp = tempfile.mkdtemp()
+        try:
+            corpus = os.path.join(temp, "corpus")
+            shutil.copytree("demo/domain", corpus)
+            os.rename(os.path.join(corpus, "domain1.txt"),
+                      os.path.join(temp, "domain1.txt"))
+            term_obj = Terminology(domain=corpus,
+                                   reference="demo/reference/",
+                                   candidates=self.term_obj.candidates)
+            shutil.move(os.path.join(temp, "domain1.txt"), corpus)
+            term_obj.add_documents(["domain1.txt"])
+            self.assertDictEqual(term_obj.domain_relevance,
+                                 self.term_obj.domain_relevance)
+            self.assertDictEqual(term_obj.domain_consensus,
+                                 self.term_obj.domain_consensus)
+            term_obj.remove_documents(["domain3.txt"])
+            os.remove(os.path.join(corpus, "domain3.txt"))
+            rebuilt = Terminology(domain=corpus,
+                                  reference="demo/reference/",
+                                  candidates=self.term_obj.candidates)
+            self.assertDictEqual(term_obj.domain_relevance,
+                                 rebuilt.domain_relevance)
+            self.assertDictEqual(term_obj.domain_consensus,
+                                 rebuilt.domain_consensus)
+        finally:
+            shutil.rmtree(temp)
+
     def test_weigh_candidates_error_alpha_above_one(self):
         weighted = self.term_obj.weigh_candidates
         self.assertRaises(ValueError, weighted, alpha=2)
@@ -126,6 +167,17 @@ class TestCaseTerminology(unittest.TestCase):
         self.assertNotIn(("language", "learning"), terms)
         self.assertIn(("computational", "linguistics"), terms)
 
+    def test_write_csv_mixed_lengths(self):
+        trigram = ("field", "of", "computational")
+        candidates = {self.bigr_equally_only_domain, trigram, ("text",)}
+        term_obj = Terminology("demo/domain", "demo/reference", candidates)
+        self.assertEqual(term_obj.domain_relevance[trigram], 1)
+        testfile = "test_mixed.csv"
+        term_obj.write_csv(alpha=0.5, theta=0, filename=testfile)
+        evaluation = Evaluation.from_file("demo/demo_gold.txt", testfile)
+        os.remove(testfile)
+        self.assertSetEqual(set(evaluation.terms), candidates)
+
     def test_write_csv_file_exists(self):
         testfile = "test.csv"
         self.term_obj.write_csv(alpha=0.5, theta=1, filename=testfile)
@@ -160,6 +212,116 @@ class TestCaseTerminology(unittest.TestCase):
                 self.assertEqual(len(line), 3)
         os.remove(testfile)
 
+    def test_weigh_grid_same_as_weigh_candidates(self):
+        scores = self.term_obj.weigh_grid([0, 0.5, 1])
+        for row, alpha in enumerate([0, 0.5, 1]):
+            weighted = self.term_obj.weigh_candidates(alpha)
+            self.assertDictEqual(dict(zip(self.term_obj.terms(),
+                                          scores[row].tolist())),
+                                 weighted)
+
+    def test_weigh_grid_error_alpha(self):
+        self.assertRaises(ValueError, self.term_obj.weigh_grid, [0.5, 2])
+
+    def test_grid_extracted_same_as_extract_terminology(self):
+        grid = self.term_obj.grid([0.2, 0.6], [0, 0.5, 1])
+        for alpha in [0.2, 0.6]:
+            weighted = self.term_obj.weigh_candidates(alpha)
+            for theta in [0, 0.5, 1]:
+                self.assertSetEqual(
+                    grid["extracted"][alpha, theta],
+                    self.term_obj.extract_terminology(theta, weighted))
+
+    def test_grid_rankings_descending(self):
+        grid = self.term_obj.grid([0.5], [1])
+        ranked = grid["scores"][0][grid["rankings"][0]]
+        self.assertTrue(all(ranked[:-1] >= ranked[1:]))
+
+    def test_grid_error_theta(self):
+        self.assertRaises(ValueError, self.term_obj.grid, [0.5], [-1])
+
+    def test_write_csv_grid(self):
+        temp = tempfile.mkdtemp()
+        try:
+            pattern = os.path.join(temp, "{alpha}_{theta}.csv")
+            files = self.term_obj.write_csv_grid([0.5, 1], [1], pattern)
+            self.assertEqual(len(files), 2)
+            single = os.path.join(temp, "single.csv")
+            self.term_obj.write_csv(alpha=0.5, theta=1, filename=single)
+            with open(files[0], encoding="utf-8") as grid_file:
+                with open(single, encoding="utf-8") as single_file:
+                    self.assertEqual(grid_file.read(), single_file.read())
+        finally:
+            shutil.rmtree(temp)
+
+    def test_evaluate_grid_same_as_evaluation(self):
+        golds = {self.bigr_equally_only_domain, self.bigr_more_domain}
+        results = self.term_obj.evaluate_grid([0.5], [0.5], golds)
+        weighted = self.term_obj.weigh_candidates(0.5)
+        terms = self.term_obj.extract_terminology(0.5, weighted)
+        evaluation = Evaluation({term: weighted[term] for term in terms},
+                                golds)
+        self.assertEqual(results[0]["extracted"], len(terms))
+        self.assertEqual(results[0]["f1"], evaluation.f1())
+        self.assertEqual(results[0]["precision"], evaluation.precision())
+
+    def test_evaluate_grid_with_workers(self):
+        golds = {self.bigr_equally_only_domain}
+        self.assertListEqual(self.term_obj.evaluate_grid([0, 0.5, 1],
+                                                         [0.5, 1], golds,
+                                                         workers=2),
+                             self.term_obj.evaluate_grid([0, 0.5, 1],
+                                                         [0.5, 1], golds))
+
+    def test_evaluate_grid_error_empty_golds(self):
+        self.assertRaises(ValueError, self.term_obj.evaluate_grid,
+                          [0.5], [1], set())
+
+    def test_write_csv_grid_error_pattern(self):
+        self.assertRaises(ValueError, self.term_obj.write_csv_grid,
+                          [0.5], [1], "out.csv")
+
+    def test_save_and_load_same_csv(self):
+        temp = tempfile.mkdtemp()
+        try:
+            scores = os.path.join(temp, "scores.npz")
+            self.term_obj.save(scores)
+            loaded = Terminology.load(scores, key=self.term_obj.key())
+            self.assertIsNone(loaded.domain)
+            self.assertEqual(loaded.domain_relevance,
+                             self.term_obj.domain_relevance)
+            self.assertEqual(loaded.domain_consensus,
+                             self.term_obj.domain_consensus)
+            self.assertEqual(loaded.key(), self.term_obj.key())
+            original = os.path.join(temp, "original.csv")
+            rescored = os.path.join(temp, "rescored.csv")
+            self.term_obj.write_csv(alpha=0.3, theta=0.5, filename=original)
+            loaded.write_csv(alpha=0.3, theta=0.5, filename=rescored)
+            with open(original, encoding="utf-8") as expected:
+                with open(rescored, encoding="utf-8") as found:
+                    self.assertEqual(expected.read(), found.read())
+        finally:
+            shutil.rmtree(temp)
+
+    def test_load_error_other_key(self):
+        other = Terminology(self.term_obj.domain, self.term_obj.reference,
+                            {self.bigr_more_domain})
+        self.assertNotEqual(other.key(), self.term_obj.key())
+        temp = tempfile.mkdtemp()
+        try:
+            scores = os.path.join(temp, "scores.npz")
+            other.save(scores)
+            self.assertRaises(ValueError, Terminology.load, scores,
+                              self.term_obj.key())
+        finally:
+            shutil.rmtree(temp)
+
+    def test_key_same_for_same_corpora(self):
+        other = Terminology("demo/domain/", "demo/reference/",
+                            set(self.term_obj.terms()))
+        self.assertIsNotNone(other.key())
+        self.assertEqual(other.key(), self.term_obj.key())
+
 
 if __name__ == "__main__":
     unittest.main(buffer=True)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tests for the token store.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from nltk.corpus.reader.plaintext import PlaintextCorpusReader
+
+from cache import CountCache
+from preprocess import Preprocess
+from tokenstore import TokenStore
+
+
+class TestCaseTokenStore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp = tempfile.mkdtemp()
+        cls.directory = os.path.join(cls.temp, "store")
+        cls.corpus = PlaintextCorpusReader("demo/domain", r".*\.txt")
+        cls.store = TokenStore.write(cls.directory, cls.corpus)
+        cls.process = Preprocess("demo/domain")
+        cls.fileid = "domain1.txt"
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp)
+
+    def test_fileids(self):
+        self.assertEqual(self.store.fileids(), self.corpus.fileids())
+
+    def test_words(self):
+        self.assertEqual(self.store.words(self.fileid),
+                         list(self.corpus.words(self.fileid)))
+        self.assertEqual(self.store.words(), list(self.corpus.words()))
+
+    def test_sents(self):
+        self.assertEqual(self.store.sents(self.fileid),
+                         [list(sent) for sent in
+                          self.corpus.sents(self.fileid)])
+
+    def test_subset(self):
+        fileids = self.corpus.fileids()[::-1][:2]
+        subset = self.store.subset(fileids)
+        self.assertEqual(subset.fileids(), fileids)
+        self.assertEqual(subset.words(fileids[0]),
+                         self.store.words(fileids[0]))
+        self.assertEqual(self.store.fileids(), self.corpus.fileids())
+        removed = self.corpus.fileids()[0]
+        with self.assertRaises(KeyError):
+            subset.abspath(removed)
+        self.assertEqual(subset.subset([removed]).fileids(), [removed])
+        with self.assertRaises(ValueError):
+            self.store.subset(["nonexisting.txt"])
+
+    def test_is_store(self):
+        self.assertTrue(TokenStore.is_store(self.directory))
+        self.assertFalse(TokenStore.is_store("demo/domain"))
+        with self.assertRaises(ValueError):
+            TokenStore("demo/domain")
+
+    def test_preprocess_same_bigrams(self):
+        for backend in Preprocess.BACKENDS:
+            process = Preprocess(self.directory, backend=backend)
+            self.assertIsInstance(process.corpus, TokenStore)
+            self.assertEqual(dict(process.bigrams().items()),
+                             dict(self.process.bigrams().items()))
+            self.assertEqual(process.bigrams(self.fileid),
+                             self.process.bigrams(self.fileid))
+
+    def test_preprocess_with_workers(self):
+        process = Preprocess(self.store, workers=2, backend="array")
+        self.assertEqual(dict(process.bigrams().items()),
+                         dict(self.process.bigrams().items()))
+
+    def test_candidates_in_context(self):
+        process = Preprocess(self.store)
+        self.assertEqual(process.candidates(1, tags={"NN"}, context=True),
+                         self.process.candidates(1, tags={"NN"},
+                                                 context=True))
+
+    def test_cache_key(self):
+        cache = CountCache(os.path.join(self.temp, "cache"))
+        self.assertIsNotNone(cache.key(self.store))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+# Katja Konermann
+# 802658
+"""
+Tokenized corpora, stored as arrays of word ids on disk.
+"""
+import copy
+import json
+import os
+
+import numpy as np
+
+from bigramtable import Vocabulary
+
+
+class TokenStore:
+
+    VERSION = 1
+    FILES = {"tokens": "tokens.npy",
+             "offsets": "offsets.npy",
+             "sents": "sents.npy",
+             "lower": "lower.npy"}
+    STORE = "store.json"
+
+    """
+    A class for a corpus that was tokenized once and stored on disk.
+
+    All tokens of the corpus are stored as one contiguous array of word
+    ids, files are slices of that array. Arrays are memory-mapped, so
+    reading a file neither tokenizes nor decodes text. Implements the
+    parts of a nltk corpus reader that Preprocess needs and can be used
+    as its corpus.
+
+    A store is a directory with these files:
+        store.json: fileids, vocabulary and vocabulary of lowercased words,
+        tokens.npy: ids of all tokens, file after file,
+        offsets.npy: start of every file in tokens and end of last file,
+        sents.npy: end of every sentence in tokens,
+        lower.npy: id of the lowercased word for every word id.
+
+    Attributes:
+        directory (str):
+            Directory of the store.
+        vocabulary (Vocabulary):
+            Vocabulary of lowercased words.
+
+    Methods:
+        write(directory, corpus):
+            Tokenize a corpus and store it.
+        is_store(directory):
+            Check if a directory contains a store.
+        fileids():
+            Ids of files in corpus.
+        subset(fileids):
+            A store with only some of the files.
+        words(fileids=None):
+            Tokens of files.
+        sents(fileids=None):
+            Sentences of files.
+        lowered_ids(fileid, vocabulary=None):
+            Ids of lowercased tokens of a file.
+    """
+
+    def __init__(self, directory):
+        """Open a store.
+
+        Args:
+            directory (str):
+                Directory written by TokenStore.write.
+
+        Raises:
+            ValueError:
+                If the directory doesn't contain a store.
+
+        Returns:
+            None.
+        """
+        if not self.is_store(directory):
+            raise ValueError("'{}' is not a token store.".format(directory))
+        self.directory = directory
+        with open(os.path.join(directory, self.STORE),
+                  encoding="utf-8") as file:
+            store = json.load(file)
+        if store["version"] != self.VERSION:
+            raise ValueError("Token store '{}' has version {}, "
+                             "expected {}.".format(directory,
+                                                   store["version"],
+                                                   self.VERSION))
+        self._files = store["fileids"]
+        self._position = {fileid: i for i, fileid in enumerate(self._files)}
+        # Positions of all files of the directory, also of files left
+        # out by subset.
+        self._stored = self._position
+        self._words = store["words"]
+        self.vocabulary = Vocabulary()
+        self.vocabulary.encode(store["lowered"])
+        arrays = {name: np.load(os.path.join(directory, filename),
+                                mmap_mode="r")
+                  for name, filename in self.FILES.items()}
+        self._tokens = arrays["tokens"]
+        self._offsets = arrays["offsets"]
+        self._sents = arrays["sents"]
+        self._lower = arrays["lower"]
+        # Lowercased ids translated to the last vocabulary used.
+        self._mapping = (None, None)
+
+    @classmethod
+    def is_store(cls, directory):
+        """Returns True if directory contains a store."""
+        return os.path.isfile(os.path.join(directory, cls.STORE))
+
+    @classmethod
+    def write(cls, directory, corpus):
+        """Tokenize every file of a corpus and store the tokens.
+
+        Tokens are the words of the corpus reader, sentences are the
+        lengths of its sentences.
+
+        Args:
+            directory (str):
+                Directory for the store, is created if it doesn't exist.
+            corpus:
+                A nltk corpus object.
+
+        Returns:
+            TokenStore:
+                The written store.
+        """
+        os.makedirs(directory, exist_ok=True)
+        vocabulary = Vocabulary()
+        fileids = list(corpus.fileids())
+        tokens = []
+        offsets = [0]
+        sents = []
+        for fileid in fileids:
+            ids = vocabulary.encode(corpus.words(fileid))
+            ends = np.cumsum([len(sent) for sent in corpus.sents(fileid)],
+                             dtype=np.int64)
+            # Tokenizers of words and sentences might not agree.
+            ends = np.minimum(ends, len(ids))
+            if len(ids) and (not len(ends) or ends[-1] != len(ids)):
+                ends = np.append(ends, len(ids))
+            sents.append(ends + offsets[-1])
+            tokens.append(ids)
+            offsets.append(offsets[-1] + len(ids))
+        words = vocabulary.words()
+        lowered = Vocabulary()
+        lower = lowered.encode(word.lower() for word in words)
+        arrays = {"tokens": np.concatenate(tokens or [np.zeros(0, np.int32)]),
+                  "offsets": np.array(offsets, dtype=np.int64),
+                  "sents": np.concatenate(sents or [np.zeros(0, np.int64)]),
+                  "lower": lower}
+        for name, filename in cls.FILES.items():
+            np.save(os.path.join(directory, filename), arrays[name])
+        # Written last, marks the store as complete.
+        with open(os.path.join(directory, cls.STORE), "w",
+                  encoding="utf-8") as file:
+            json.dump({"version": cls.VERSION,
+                       "fileids": fileids,
+                       "words": words,
+                       "lowered": lowered.words()}, file, ensure_ascii=False)
+        return cls(directory)
+
+    def fileids(self):
+        """Returns list of ids of files in corpus."""
+        return list(self._files)
+
+    def subset(self, fileids):
+        """Get a store with only some of the files of the directory.
+
+        The arrays are shared, nothing is read from disk.
+
+        Args:
+            fileids (list):
+                Ids of files of the directory, in the order they should
+                have. They don't need to be files of this object.
+
+        Raises:
+            ValueError:
+                If a file isn't in the directory of the store.
+
+        Returns:
+            TokenStore
+        """
+        fileids = list(fileids)
+        for fileid in fileids:
+            if fileid not in self._stored:
+                raise ValueError("File '{}' not in token store '{}'."
+                                 .format(fileid, self.directory))
+        store = copy.copy(self)
+        store._files = fileids
+        store._position = {fileid: self._stored[fileid]
+                           for fileid in fileids}
+        return store
+
+    def abspath(self, fileid):
+        """Returns the file that changes whenever the store changes.
+
+        Raises:
+            KeyError:
+                If file is not in corpus.
+        """
+        if fileid not in self._position:
+            raise KeyError(fileid)
+        return os.path.abspath(os.path.join(self.directory, self.STORE))
+
+    def _span(self, fileid):
+        """Returns start and end of a file in tokens."""
+        position = self._position[fileid]
+        return int(self._offsets[position]), int(self._offsets[position + 1])
+
+    def _fileid_list(self, fileids):
+        """Returns fileids as list, all files if None."""
+        if fileids is None:
+            return self._files
+        if isinstance(fileids, str):
+            return [fileids]
+        return fileids
+
+    def words(self, fileids=None):
+        """Returns list of tokens of files.
+
+        Args:
+            fileids:
+                Id or list of ids of files. If default is used, tokens of
+                all files are returned.
+        """
+        words = self._words
+        return [words[i] for fileid in self._fileid_list(fileids)
+                for i in self._tokens[slice(*self._span(fileid))].tolist()]
+
+    def sents(self, fileids=None):
+        """Returns list of sentences of files, lists of tokens.
+
+        Args:
+            fileids:
+                Id or list of ids of files. If default is used, sentences
+                of all files are returned.
+        """
+        words = self._words
+        sents = []
+        for fileid in self._fileid_list(fileids):
+            start, end = self._span(fileid)
+            first = int(np.searchsorted(self._sents, start, side="right"))
+            last = int(np.searchsorted(self._sents, end, side="right"))
+            for sent_end in self._sents[first:last].tolist():
+                sents.append([words[i]
+                              for i in self._tokens[start:sent_end].tolist()])
+                start = sent_end
+        return sents
+
+    def lowered_ids(self, fileid, vocabulary=None):
+        """Get ids of the lowercased tokens of a file.
+
+        Args:
+            fileid (str):
+                Id of file in corpus.
+            vocabulary (Vocabulary):
+                Vocabulary the ids should belong to, all lowercased words
+                of the store are added to it. If default is used,
+                self.vocabulary is used.
+
+        Returns:
+            numpy.ndarray:
+                Array of ids.
+        """
+        start, end = self._span(fileid)
+        ids = self._lower[self._tokens[start:end]]
+        if vocabulary is None or vocabulary is self.vocabulary:
+            return ids
+        if self._mapping[0] is not vocabulary:
+            self._mapping = (vocabulary,
+                             vocabulary.encode(self.vocabulary.words()))
+        return self._mapping[1][ids]